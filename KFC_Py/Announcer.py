@@ -1,7 +1,6 @@
 # Announcer.py
 import time
 import cv2
-from PubSub import pubsub 
 
 
 class Announcer:
@@ -16,6 +15,16 @@ class Announcer:
         self.start_image = None
         self.start_image_time = None
         self.waiting_for_key = False
+        # (id(image), size) -> image resized to the board area, built once
+        self._scaled = {}
+
+    def _scaled_to(self, image, size):
+        key = (id(image), size)
+        scaled = self._scaled.get(key)
+        if scaled is None:
+            self._scaled.clear()  # only the image currently on screen is kept
+            scaled = self._scaled[key] = cv2.resize(image, size)
+        return scaled
         
     def show_start(self, data):
         self.message = "welcome to Kung Fu Chess!"
@@ -74,7 +83,7 @@ class Announcer:
             board_end_y = min(board_start_y + board_height, h)
             
             # שינוי גודל תמונת הפתיחה לגודל הלוח
-            start_resized = cv2.resize(self.start_image, (board_end_x - board_start_x, board_end_y - board_start_y))
+            start_resized = self._scaled_to(self.start_image, (board_end_x - board_start_x, board_end_y - board_start_y))
             
             # הצגת תמונת הפתיחה על אזור הלוח
             img[board_start_y:board_end_y, board_start_x:board_end_x] = start_resized
@@ -108,7 +117,7 @@ class Announcer:
             board_end_y = min(board_start_y + board_height, h)
             
             # שינוי גודל תמונת הניצחון לגודל הלוח
-            victory_resized = cv2.resize(self.victory_image, (board_end_x - board_start_x, board_end_y - board_start_y))
+            victory_resized = self._scaled_to(self.victory_image, (board_end_x - board_start_x, board_end_y - board_start_y))
             
             # הצגת תמונת הניצחון על אזור הלוח
             img[board_start_y:board_end_y, board_start_x:board_end_x] = victory_resized
@@ -126,6 +135,11 @@ class Announcer:
             self.victory_image = None
             self.victory_start_time = None
     
+    def is_active(self) -> bool:
+        """True while a message or start/victory image is painted over the board."""
+        return (self.message is not None or self.start_image is not None
+                or self.victory_image is not None)
+
     def handle_key_press(self):
         """נקרא כשלוחצים על מקש כלשהו - לא משמש יותר לתמונת הסיום"""
         return False
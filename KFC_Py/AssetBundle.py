@@ -0,0 +1,273 @@
+# AssetBundle.py
+"""Offline compiler and memory-mapped reader for the ``pieces/`` asset tree.
+
+``compile_assets`` walks ``<pieces_root>/*/states/*`` once and packs every
+``config.json`` (the per-piece one included), ``moves.txt``,
+``transitions.csv`` and pre-resized sprite into a single file::
+
+    python AssetBundle.py ../pieces            # -> ../pieces/assets.kfcb
+
+Layout: an 8-byte magic, a little-endian ``uint32`` version and ``uint32``
+metadata length, the metadata as UTF-8 JSON, zero padding up to
+``_ALIGN`` bytes, then the raw BGRA/BGR pixel blob.  ``AssetBundle`` opens the
+blob with ``numpy.memmap`` so every frame is a zero-copy, read-only view and
+several match processes on one host share the same page cache.
+
+The metadata records the size and mtime of every source file, so a bundle
+that no longer matches its tree (a sprite or ``moves.txt`` edited since it
+was compiled) is detected – see ``load_current_bundle``.
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import logging
+import pathlib
+import struct
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from img import Img
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"KFCASSET"
+VERSION = 1
+DEFAULT_NAME = "assets.kfcb"
+_HEADER = struct.Struct("<8sII")
+_ALIGN = 64
+
+
+def _parse_moves(path: pathlib.Path) -> Dict[str, str]:
+    """Same grammar as ``Moves``; keys are ``"dr,dc"`` so they survive JSON."""
+    table: Dict[str, str] = {}
+    for line in path.read_text().splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        move, _, tag = line.partition(":")
+        dr, dc = map(int, move.strip().split(","))
+        table[f"{dr},{dc}"] = tag.strip()
+    return table
+
+
+def _parse_transitions(path: pathlib.Path) -> Dict[str, Dict[str, str]]:
+    trans: Dict[str, Dict[str, str]] = {}
+    if not path.exists():
+        return trans
+    with path.open(newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            trans.setdefault(row["from_state"], {})[row["event"]] = row["to_state"]
+    return trans
+
+
+def _source_files(pieces_root: pathlib.Path):
+    """Every file ``compile_assets`` reads."""
+    for name in ("background.jpg", "board.png", "board.csv"):
+        yield pieces_root / name
+    for piece_dir in sorted(pieces_root.iterdir()):
+        states_dir = piece_dir / "states"
+        if not states_dir.is_dir():
+            continue
+        yield piece_dir / "config.json"
+        yield states_dir / "transitions.csv"
+        for state_dir in sorted(states_dir.iterdir()):
+            if not state_dir.is_dir():
+                continue
+            yield state_dir / "config.json"
+            yield state_dir / "moves.txt"
+            yield from sorted((state_dir / "sprites").glob("*.png"))
+
+
+def source_stamp(pieces_root: str | pathlib.Path) -> Dict[str, list]:
+    """``{relative path: [size, mtime_ns]}`` of the existing source files."""
+    pieces_root = pathlib.Path(pieces_root)
+    stamp = {}
+    for path in _source_files(pieces_root):
+        if path.exists():
+            st = path.stat()
+            stamp[path.relative_to(pieces_root).as_posix()] = [st.st_size, st.st_mtime_ns]
+    return stamp
+
+
+def _as_bgra(arr: np.ndarray) -> np.ndarray:
+    if arr.ndim == 2:
+        arr = arr[..., None].repeat(3, axis=2)
+    if arr.shape[2] == 3:
+        alpha = np.full(arr.shape[:2] + (1,), 255, dtype=arr.dtype)
+        arr = np.concatenate([arr, alpha], axis=2)
+    return np.ascontiguousarray(arr, dtype=np.uint8)
+
+
+def compile_assets(pieces_root: str | pathlib.Path,
+                   out_path: str | pathlib.Path | None = None,
+                   cell_size: Tuple[int, int] = (64, 64)) -> pathlib.Path:
+    """Pack the asset tree under *pieces_root* into one bundle file."""
+    from BackgroundBoardFactory import create_background_board
+
+    pieces_root = pathlib.Path(pieces_root)
+    out_path = pathlib.Path(out_path) if out_path else pieces_root / DEFAULT_NAME
+    sources = source_stamp(pieces_root)         # before reading, so edits made meanwhile count as stale
+
+    blobs: list[bytes] = []
+    offset = 0
+
+    def _add(arr: np.ndarray) -> list[int]:
+        nonlocal offset
+        entry = [offset, *arr.shape]
+        data = arr.tobytes()
+        blobs.append(data)
+        offset += len(data)
+        return entry
+
+    pieces: Dict[str, dict] = {}
+    for piece_dir in sorted(pieces_root.iterdir()):
+        states_dir = piece_dir / "states"
+        if not states_dir.is_dir():
+            continue
+        states: Dict[str, dict] = {}
+        for state_dir in sorted(states_dir.iterdir()):
+            if not state_dir.is_dir():
+                continue
+            cfg_path = state_dir / "config.json"
+            moves_path = state_dir / "moves.txt"
+            frames = [_add(_as_bgra(Img().read(p, cell_size).img))
+                      for p in sorted((state_dir / "sprites").glob("*.png"))]
+            states[state_dir.name] = {
+                "config": json.loads(cfg_path.read_text()) if cfg_path.exists() else {},
+                "moves": _parse_moves(moves_path) if moves_path.exists() else None,
+                "frames": frames,
+            }
+        piece_cfg = piece_dir / "config.json"
+        pieces[piece_dir.name] = {
+            "config": json.loads(piece_cfg.read_text()) if piece_cfg.exists() else {},
+            "states": states,
+            "transitions": _parse_transitions(states_dir / "transitions.csv"),
+        }
+
+    board = create_background_board(str(pieces_root / "background.jpg"),
+                                    str(pieces_root / "board.png"))
+    meta = {
+        "cell_size": list(cell_size),
+        "board_csv": (pieces_root / "board.csv").read_text(),
+        "background": _add(np.ascontiguousarray(board.img.img)),
+        "pieces": pieces,
+        "sources": sources,
+    }
+
+    meta_bytes = json.dumps(meta, separators=(",", ":")).encode("utf-8")
+    head_len = _HEADER.size + len(meta_bytes)
+    padding = -head_len % _ALIGN
+    with out_path.open("wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, len(meta_bytes)))
+        f.write(meta_bytes)
+        f.write(b"\0" * padding)
+        for data in blobs:
+            f.write(data)
+    return out_path
+
+
+class AssetBundle:
+    """Read-only view over a compiled bundle; frames are views into one memmap."""
+
+    def __init__(self, path: str | pathlib.Path):
+        self.path = pathlib.Path(path)
+        with self.path.open("rb") as f:
+            magic, version, meta_len = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"Not an asset bundle: {self.path}")
+            if version != VERSION:
+                raise ValueError(f"Unsupported asset bundle version {version} in {self.path}")
+            meta = json.loads(f.read(meta_len).decode("utf-8"))
+
+        head_len = _HEADER.size + meta_len
+        data_offset = head_len + (-head_len % _ALIGN)
+        self._data = np.memmap(self.path, dtype=np.uint8, mode="r", offset=data_offset)
+        self._meta = meta
+        self._frames: Dict[Tuple[str, str], tuple[Img, ...]] = {}
+
+        self.cell_size: Tuple[int, int] = tuple(meta["cell_size"])
+        self.board_csv: str = meta["board_csv"]
+
+    def is_current(self, pieces_root: str | pathlib.Path) -> bool:
+        """True when no source file under *pieces_root* was added, removed or
+        changed since the bundle was compiled."""
+        return self._meta.get("sources") == source_stamp(pieces_root)
+
+    def __contains__(self, piece_type: str) -> bool:
+        return piece_type in self._meta["pieces"]
+
+    def _view(self, entry) -> np.ndarray:
+        offset, *shape = entry
+        size = int(np.prod(shape))
+        return self._data[offset:offset + size].reshape(shape)
+
+    def _img(self, entry) -> Img:
+        img = Img()
+        img.img = self._view(entry)
+        return img
+
+    def background(self) -> Img:
+        return self._img(self._meta["background"])
+
+    def states(self, piece_type: str) -> Dict[str, dict]:
+        """``{state: {"config": dict, "moves": {(dr, dc): tag} | None}}``."""
+        out = {}
+        for name, st in self._meta["pieces"][piece_type]["states"].items():
+            moves = st["moves"]
+            if moves is not None:
+                moves = {tuple(map(int, k.split(","))): tag for k, tag in moves.items()}
+            out[name] = {"config": st["config"], "moves": moves}
+        return out
+
+    def piece_config(self, piece_type: str) -> dict:
+        """``<piece>/config.json`` – descriptor overrides such as ``royal``."""
+        return self._meta["pieces"][piece_type].get("config", {})
+
+    def transitions(self, piece_type: str) -> Dict[str, Dict[str, str]]:
+        return self._meta["pieces"][piece_type]["transitions"]
+
+    def frames(self, piece_type: str, state: str) -> tuple[Img, ...]:
+        key = (piece_type, state)
+        frames = self._frames.get(key)
+        if frames is None:
+            entries = self._meta["pieces"][piece_type]["states"][state]["frames"]
+            if not entries:
+                raise ValueError(f"No frames found for {piece_type}/{state} in {self.path}")
+            frames = self._frames[key] = tuple(self._img(e) for e in entries)
+        return frames
+
+
+def load_current_bundle(pieces_root: str | pathlib.Path,
+                        path: str | pathlib.Path | None = None) -> Optional[AssetBundle]:
+    """The compiled bundle for *pieces_root*, or None when there is none or
+    it is stale – the caller then loads the tree itself.  Logs which one is used."""
+    pieces_root = pathlib.Path(pieces_root)
+    path = pathlib.Path(path) if path else pieces_root / DEFAULT_NAME
+    if not path.exists():
+        logger.info("No asset bundle at %s; loading assets from %s", path, pieces_root)
+        return None
+    try:
+        bundle = AssetBundle(path)
+    except ValueError as e:
+        logger.warning("Ignoring asset bundle: %s; loading assets from %s", e, pieces_root)
+        return None
+    if not bundle.is_current(pieces_root):
+        logger.warning("Asset bundle %s is older than %s; loading assets from the tree "
+                       "(re-run `python AssetBundle.py` to rebuild it)", path, pieces_root)
+        return None
+    logger.info("Using asset bundle %s", path)
+    return bundle
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compile the pieces/ tree into one asset bundle.")
+    parser.add_argument("pieces_root", nargs="?", default="../pieces")
+    parser.add_argument("-o", "--out", default=None, help=f"output file (default <pieces_root>/{DEFAULT_NAME})")
+    parser.add_argument("--cell", type=int, default=64, help="cell size in pixels")
+    args = parser.parse_args()
+
+    out = compile_assets(args.pieces_root, args.out, (args.cell, args.cell))
+    print(f"Wrote {out} ({out.stat().st_size / 1024:.0f} KiB)")
@@ -17,7 +17,11 @@ def create_background_board(background_path: str, board_img_path: str) -> Board:
     # לדוגמה: מיקום (384, 104) (נקודה זו תלויה בתמונה שלך!)
     board.draw_on(background, 384, 104)
 
+    return board_from_background(background)
 
+
+def board_from_background(background: Img) -> Board:
+    """Wrap an already composed 1280x720 background (e.g. from an asset bundle)."""
     # יצירת אובייקט Board עם הרקע הזה
     return Board(
         cell_H_pix=64,
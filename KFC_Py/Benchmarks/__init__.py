@@ -0,0 +1,3 @@
+"""
+Micro-benchmarks for KungFu Chess hot paths (run as scripts, not collected by pytest).
+"""
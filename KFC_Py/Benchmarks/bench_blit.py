@@ -0,0 +1,74 @@
+"""Per-blit cost of ``Img.draw_on`` at the 64x64 cell size.
+
+    python Benchmarks/bench_blit.py
+
+Compares the original float/per-channel blend (``legacy_draw_on``) with the
+premultiplied-alpha path, for a sprite with a real alpha gradient and for an
+opaque sprite, onto the 1280x720 BGR board and a BGRA canvas.  On a
+3-channel board both paths drop alpha and copy the colour channels, so the
+BGR rows are like for like; only BGRA canvases blend.
+"""
+import os, sys, timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import cv2
+import numpy as np
+
+from img import Img
+
+CELL = 64
+N = 20_000
+
+
+def legacy_draw_on(src, dst, x, y):
+    """The pre-premultiplied implementation, kept here for comparison."""
+    if src.img.shape[2] != dst.img.shape[2]:
+        if src.img.shape[2] == 3 and dst.img.shape[2] == 4:
+            src.img = cv2.cvtColor(src.img, cv2.COLOR_BGR2BGRA)
+        elif src.img.shape[2] == 4 and dst.img.shape[2] == 3:
+            src.img = cv2.cvtColor(src.img, cv2.COLOR_BGRA2BGR)
+    h, w = src.img.shape[:2]
+    roi = dst.img[y:y + h, x:x + w]
+    if src.img.shape[2] == 4:
+        b, g, r, a = cv2.split(src.img)
+        mask = a / 255.0
+        for c in range(3):
+            roi[..., c] = (1 - mask) * roi[..., c] + mask * src.img[..., c]
+    else:
+        dst.img[y:y + h, x:x + w] = src.img
+
+
+def _img(arr):
+    img = Img()
+    img.img = arr
+    return img
+
+
+def _sprite(alpha: bool):
+    rng = np.random.default_rng(0)
+    pix = rng.integers(0, 256, (CELL, CELL, 4), dtype=np.uint8)
+    pix[..., 3] = np.linspace(0, 255, CELL, dtype=np.uint8)[None, :] if alpha else 255
+    return pix
+
+
+def _bench(fn):
+    return min(timeit.repeat(fn, number=N, repeat=3)) / N * 1e6
+
+
+def main():
+    print(f"{'case':34s} {'legacy µs':>10s} {'premul µs':>10s} {'speed-up':>9s}")
+    for dst_ch in (3, 4):
+        for alpha in (True, False):
+            canvas = np.full((720, 1280, dst_ch), 90, dtype=np.uint8)
+            old_dst, new_dst = _img(canvas.copy()), _img(canvas.copy())
+            old_src, new_src = _img(_sprite(alpha)), _img(_sprite(alpha))
+
+            legacy = _bench(lambda: legacy_draw_on(old_src, old_dst, 384, 104))
+            premul = _bench(lambda: new_src.draw_on(new_dst, 384, 104))
+            name = f"{'alpha' if alpha else 'opaque'} sprite -> {dst_ch}-channel board"
+            print(f"{name:34s} {legacy:10.2f} {premul:10.2f} {legacy / premul:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Spectator fan-out cost per tick as the audience grows.
+
+    python Benchmarks/bench_broadcast.py
+
+Plays the same headless game (virtual clock, 20 ms ticks, pawns moving on
+both sides) once per audience size and times only the fan-out stage:
+
+  broadcaster   ``Broadcast.Broadcaster`` – one Wire encoding per tick,
+                shared by every spectator's bounded outbox
+  per-client    what ``Server.Match.broadcast_state`` does today – the JSON
+                state frame encoded again for every connection
+
+Spectators are local socket stand-ins that drain a fixed number of bytes
+per tick; one in ten stalls for six seconds at a time, so the outbox limit
+and keyframe coalescing are exercised too.
+"""
+import os, sys, time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from Broadcast import Broadcaster
+from Clock import VirtualClock
+from Command import Command
+from GameFactory import create_game
+from GraphicsFactory import MockImgFactory
+from Server import encode_frame
+
+PIECES_ROOT = os.path.join(os.path.dirname(__file__), '..', '..', 'pieces')
+TICK_MS = 20
+TICKS = 1500
+AUDIENCES = (1, 10, 100, 1000)
+STALL_TICKS = 300
+
+
+class SocketStandIn:
+    """A connection whose peer reads *rate* bytes per tick; one that *stalls*
+    stops reading every other STALL_TICKS and then reports a full buffer."""
+
+    def __init__(self, rate, stalls=False):
+        self.rate = rate
+        self.stalls = stalls
+        self.stalled = False
+        self.buffered = 0
+        self.written = 0
+        self.transport = self
+
+    def get_write_buffer_size(self):
+        return 1 << 30 if self.stalled else self.buffered
+
+    def write(self, data):
+        self.buffered += len(data)
+        self.written += len(data)
+
+    def is_closing(self):
+        return False
+
+    def drain(self, tick):
+        self.stalled = self.stalls and (tick // STALL_TICKS) % 2 == 1
+        if not self.stalled:
+            self.buffered = max(0, self.buffered - self.rate)
+
+
+def play(n, fan_out):
+    """Seconds spent in the fan-out stage over TICKS ticks, the stage, and the sockets."""
+    game = create_game(PIECES_ROOT, MockImgFactory(), headless=True, clock=VirtualClock())
+    sockets = [SocketStandIn(1 << 16, stalls=i % 10 == 9) for i in range(n)]
+    stage = fan_out(game, sockets)
+    moves = [("PW_(6, %d)" % c, (6, c), (5, c)) for c in range(8)] + \
+            [("PB_(1, %d)" % c, (1, c), (2, c)) for c in range(8)]
+    spent = 0.0
+    for i in range(TICKS):
+        if i % 40 == 0 and moves:
+            pid, src, dst = moves.pop(0)
+            game.user_input_queue.put(Command(game.game_time_ms(), pid, "move", [src, dst]))
+        game.clock.advance(TICK_MS)
+        game.tick()
+        t0 = time.perf_counter()
+        stage.tick()
+        spent += time.perf_counter() - t0
+        for s in sockets:
+            s.drain(i)
+    return spent, stage, sockets
+
+
+def broadcaster(game, sockets):
+    b = Broadcaster(game, match_id=1, max_frames=8, buffer_limit=4096)
+    for s in sockets:
+        b.add(s)
+    return b
+
+
+class PerClientJson:
+    """``Server.Match.broadcast_state``: skip unchanged boards, encode once per connection."""
+
+    def __init__(self, game, sockets):
+        self.game, self.sockets = game, sockets
+        self._last = None
+
+    def tick(self):
+        pieces = [[p.id, *p.current_cell(), p.state.name] for p in self.game.pieces]
+        if pieces == self._last:
+            return
+        self._last = pieces
+        msg = {"type": "state", "match": 1, "t": self.game.game_time_ms(), "pieces": pieces, "winner": None}
+        for s in self.sockets:
+            if s.get_write_buffer_size() <= 4096:
+                s.write(encode_frame(msg))
+
+
+def main():
+    print(f"{TICKS} ticks of {TICK_MS} ms; us per tick (us per spectator), bytes written per spectator")
+    print(f"{'spectators':>10} {'broadcaster':>22} {'per-client json':>22} {'B/spec':>9} {'json B/spec':>12}")
+    for n in AUDIENCES:
+        t_b, stage, socks_b = play(n, broadcaster)
+        stats = stage.stats()
+        t_j, _, socks_j = play(n, PerClientJson)
+        us_b, us_j = t_b / TICKS * 1e6, t_j / TICKS * 1e6
+        print(f"{n:10d} {us_b:10.1f} ({us_b / n:7.2f}) {us_j:12.1f} ({us_j / n:7.2f})"
+              f" {sum(s.written for s in socks_b) / n:9.0f} {sum(s.written for s in socks_j) / n:12.0f}")
+    print(f"last run: {stats['frames']} frames encoded, {stats['keyframes']} keyframes, "
+          f"{stats['dropped']} frames dropped for slow spectators, max outbox {stats['max_depth']}")
+
+
+if __name__ == '__main__':
+    main()
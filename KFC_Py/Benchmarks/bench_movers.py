@@ -0,0 +1,71 @@
+"""Per-frame cost of placing N simultaneously moving pieces.
+
+    python Benchmarks/bench_movers.py
+
+The renderer needs every mover's pixel position at one instant.  Compares
+``MovePhysics.pix_at`` computed per piece with one ``MoverRegistry.step``
+followed by the same ``pix_at`` calls, which then read the batched rows.
+The simulation itself is not involved: the scheduler wakes movers only at
+cell crossings and arrival.
+"""
+import os, random, sys, timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from Board import Board
+from Command import Command
+from mock_img import MockImg
+from MoverRegistry import MoverRegistry
+from Physics import MovePhysics
+from Piece import Piece
+
+TICKS = 200
+
+
+class _State:
+    def __init__(self, physics):
+        self.physics = physics
+
+
+def _pieces(n, board, rng):
+    out = []
+    for i in range(n):
+        src = (rng.randrange(board.H_cells), rng.randrange(board.W_cells // 2))
+        dst = (src[0], src[1] + rng.randrange(1, board.W_cells // 2))
+        phys = MovePhysics(board, 1.0)
+        phys.reset(Command(0, f"Q{i}", "move", [src, dst]))
+        out.append(Piece(f"Q{i}", _State(phys)))
+    return out
+
+
+def main():
+    rng = random.Random(0)
+    board = Board(32, 32, 64, 64, MockImg())
+    print(f"{'movers':>7s} {'per-piece µs/frame':>18s} {'registry µs/frame':>17s} {'speed-up':>9s}")
+    for n in (10, 100, 500, 2000):
+        seed = rng.random()
+        pieces = _pieces(n, board, random.Random(seed))
+        reg = MoverRegistry(board)
+        batched = _pieces(n, board, random.Random(seed))
+        for p in batched:
+            reg.add(p)
+        ticks = iter(range(10**9))
+
+        def scalar():
+            now = next(ticks)
+            for p in pieces:
+                p.state.physics.pix_at(now)
+
+        def vectorized():
+            now = next(ticks)
+            reg.step(now)
+            for p in batched:
+                p.state.physics.pix_at(now)
+
+        t_scalar = min(timeit.repeat(scalar, number=TICKS, repeat=3)) / TICKS * 1e6
+        t_vec = min(timeit.repeat(vectorized, number=TICKS, repeat=3)) / TICKS * 1e6
+        print(f"{n:7d} {t_scalar:18.1f} {t_vec:17.1f} {t_scalar / t_vec:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
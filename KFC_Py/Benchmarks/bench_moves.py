@@ -0,0 +1,106 @@
+"""Throughput of ``Moves.is_valid`` on the standard setup and larger boards.
+
+    python Benchmarks/bench_moves.py
+
+Compares the original dict lookup + float path walk (``legacy_is_valid``)
+with the compiled tables, fed either the engine's ``OccupancyIndex``
+(bitboards maintained incrementally) or a plain ``{cell: [pieces]}`` dict
+(probed at the destination and the precompiled cells passed over).  Each query is a random (piece, destination)
+pair, so most are rejected early – the same mix a UI hint or a bot sees.
+The legacy column keeps the original eager f-string ``logging.debug``
+calls, which are a large part of its per-call cost.
+"""
+import logging, os, random, sys, timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from GameFactory import create_game
+from GraphicsFactory import MockImgFactory
+from Moves import Moves
+from Occupancy import OccupancyIndex
+from Piece import PieceDescriptor
+
+PIECES_ROOT = os.path.join(os.path.dirname(__file__), '..', '..', 'pieces')
+N = 20_000
+
+
+def legacy_is_valid(mv, src_cell, dst_cell, cell2piece, is_need_clear_path, my_color):
+    """The pre-bitboard implementation, kept for comparison (its per-block ``print`` dropped)."""
+    if not (0 <= dst_cell[0] < mv.dims[0] and 0 <= dst_cell[1] < mv.dims[1]):
+        logging.debug(f"Move out of bounds: {dst_cell}")
+        return False
+    dr, dc = dst_cell[0] - src_cell[0], dst_cell[1] - src_cell[1]
+    if not mv.is_dst_cell_valid(dr, dc, cell2piece.get(dst_cell), my_color):
+        logging.debug(f"Invalid destination: {src_cell} → {dst_cell}")
+        return False
+    logging.debug(f"Checking path: {src_cell} → {dst_cell}, need_clear_path={is_need_clear_path}")
+    if is_need_clear_path:
+        steps = max(abs(dr), abs(dc))
+        if steps:
+            step_r, step_c = dr / steps, dc / steps
+            for i in range(1, steps):
+                if (src_cell[0] + int(i * step_r), src_cell[1] + int(i * step_c)) in cell2piece:
+                    logging.debug(f"Path not clear: {src_cell} → {dst_cell}")
+                    return False
+    logging.debug(f"Move is valid: {src_cell} → {dst_cell}")
+    return True
+
+
+class _Piece:
+    def __init__(self, piece_id, cell):
+        self.id, self.cell = piece_id, cell
+        self.desc = PieceDescriptor.from_id(piece_id)
+
+    def current_cell(self):
+        return self.cell
+
+
+def _standard_queries(rng):
+    game = create_game(PIECES_ROOT, MockImgFactory())
+    index = game.pos
+    queries = []
+    for _ in range(N):
+        p = rng.choice(game.pieces)
+        dst = (rng.randrange(8), rng.randrange(8))
+        queries.append((p.state.moves, p.current_cell(), dst, p.state.physics.is_need_clear_path(), p.id[1]))
+    return index, queries
+
+
+def _custom_queries(rng, n):
+    dims = (n, n)
+    rays = [(1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1)]
+    queen = Moves.from_table({(d * dr, d * dc): "" for d in range(1, n) for dr, dc in rays}, dims)
+    cells = rng.sample([(r, c) for r in range(n) for c in range(n)], n * n // 4)
+    pieces = [_Piece("Q" + rng.choice("WB"), cell) for cell in cells]
+    index = OccupancyIndex(pieces, dims=dims)
+    queries = []
+    for _ in range(N):
+        p = rng.choice(pieces)
+        dr, dc = rng.choice(rays)
+        d = rng.randrange(1, n)
+        queries.append((queen, p.cell, (p.cell[0] + d * dr, p.cell[1] + d * dc), True, p.id[1]))
+    return index, queries
+
+
+def _bench(fn):
+    return N / min(timeit.repeat(fn, number=1, repeat=3)) / 1000
+
+
+def main():
+    rng = random.Random(0)
+    print(f"{'board':24s} {'legacy k/s':>11s} {'bits+index':>11s} {'dict':>10s} {'speed-up':>9s}")
+    cases = [("8x8 standard setup", *_standard_queries(rng))]
+    cases += [(f"{n}x{n} queens, 25% full", *_custom_queries(rng, n)) for n in (16, 32)]
+    for name, index, queries in cases:
+        plain = {cell: list(index[cell]) for cell in index}
+        assert all(legacy_is_valid(mv, s, d, plain, c, col) == mv.is_valid(s, d, index, c, col)
+                   for mv, s, d, c, col in queries)
+
+        legacy = _bench(lambda: [legacy_is_valid(mv, s, d, plain, c, col) for mv, s, d, c, col in queries])
+        bits = _bench(lambda: [mv.is_valid(s, d, index, c, col) for mv, s, d, c, col in queries])
+        probed = _bench(lambda: [mv.is_valid(s, d, plain, c, col) for mv, s, d, c, col in queries])
+        print(f"{name:24s} {legacy:11.0f} {bits:11.0f} {probed:10.0f} {bits / legacy:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Encode/decode throughput and bytes per tick of the binary wire format.
+
+    python Benchmarks/bench_wire.py
+
+Plays a few seconds of a headless game on a virtual clock (both sides
+moving pawns) and, every 20 ms tick, encodes the board three ways: the
+JSON ``state`` frame ``Server`` sends today and a binary delta against
+the previous (acknowledged) tick; a full binary keyframe is timed too.  Commands are
+compared the same way.
+"""
+import os, sys, timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from Clock import VirtualClock
+from Command import Command
+from GameFactory import create_game
+from GraphicsFactory import MockImgFactory
+from Server import encode_frame
+from Wire import SnapshotDecoder, SnapshotEncoder, decode_command, encode_command
+
+PIECES_ROOT = os.path.join(os.path.dirname(__file__), '..', '..', 'pieces')
+TICK_MS = 20
+TICKS = 1000
+
+
+def json_state(game):
+    pieces = [[p.id, *p.current_cell(), p.state.name] for p in game.pieces]
+    return encode_frame({"type": "state", "match": 1, "t": game.game_time_ms(), "pieces": pieces, "winner": None})
+
+
+def play():
+    """Run the game for TICKS ticks; bytes per tick as JSON and as acknowledged binary deltas."""
+    game = create_game(PIECES_ROOT, MockImgFactory(), headless=True, clock=VirtualClock())
+    enc, dec = SnapshotEncoder(), SnapshotDecoder()
+    enc.ack(dec.decode(enc.encode(game.pieces, 0)).seq)
+    moves = [("PW_(6, %d)" % c, (6, c), (4, c)) for c in range(8)] + \
+            [("PB_(1, %d)" % c, (1, c), (3, c)) for c in range(8)]
+    json_sizes, delta_sizes = [], []
+    for i in range(TICKS):
+        if i % 60 == 0 and moves:
+            pid, src, dst = moves.pop(0)
+            game.user_input_queue.put(Command(game.game_time_ms(), pid, "move", [src, dst]))
+        game.clock.advance(TICK_MS)
+        game.tick()
+        buf = enc.encode(game.pieces, game.game_time_ms())
+        enc.ack(dec.decode(buf).seq)
+        delta_sizes.append(len(buf))
+        json_sizes.append(len(json_state(game)))
+    return game, json_sizes, delta_sizes
+
+
+def main():
+    game, json_sizes, delta_sizes = play()
+    pieces, t_ms = list(game.pieces), game.game_time_ms()
+
+    enc, dec = SnapshotEncoder(), SnapshotDecoder()
+    key = enc.keyframe(pieces, t_ms)
+    enc.ack(dec.decode(key).seq)
+
+    def delta_round():
+        # encode + decode + ack of one tick against the previous one
+        enc.ack(dec.decode(enc.encode(pieces, t_ms)).seq)
+
+    n = 2000
+    t_key = timeit.timeit(lambda: enc.keyframe(pieces, t_ms), number=n) / n
+    t_key_dec = timeit.timeit(lambda: SnapshotDecoder().decode(key), number=n) / n
+    t_delta = timeit.timeit(delta_round, number=n) / n
+
+    cmd = Command(123456, "PW_(6, 4)", "move", [(6, 4), (4, 4)])
+    cmd_bin = encode_command(cmd)
+    cmd_json = encode_frame({"type": "command", "piece_id": cmd.piece_id, "cmd": cmd.type,
+                             "params": [list(c) for c in cmd.params]})
+    t_cmd = timeit.timeit(lambda: decode_command(encode_command(cmd)), number=50_000) / 50_000
+
+    print(f"{len(pieces)} pieces, {TICKS} ticks of {TICK_MS} ms")
+    print(f"{'':18}{'bytes':>10}{'us/op':>10}")
+    print(f"{'json state':18}{sum(json_sizes) / TICKS:10.1f}")
+    print(f"{'keyframe':18}{len(key):10d}{t_key * 1e6:10.1f}   (+{t_key_dec * 1e6:.1f} us decode)")
+    print(f"{'delta (avg tick)':18}{sum(delta_sizes) / TICKS:10.1f}{t_delta * 1e6:10.1f}"
+          f"   (encode+decode, max {max(delta_sizes)} B)")
+    print(f"{'command json':18}{len(cmd_json):10d}")
+    print(f"{'command binary':18}{len(cmd_bin):10d}{t_cmd * 1e6:10.1f}   (encode+decode)")
+
+
+if __name__ == '__main__':
+    main()
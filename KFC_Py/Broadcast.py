@@ -0,0 +1,186 @@
+# Broadcast.py
+"""Spectator fan-out: one encoding per tick, however many are watching.
+
+A ``Broadcaster`` belongs to one match.  It subscribes to the match's
+events once and, every tick, encodes the board once as a ``Wire`` delta
+against the previous frame it sent; the very same bytes are queued for
+every spectator.  Each spectator has a bounded outbox that is flushed into
+its socket only while the socket keeps up.  A spectator whose outbox is
+full does not grow a backlog: what is queued is thrown away and replaced by
+one keyframe of the current board (encoded at most once per tick, shared by
+everyone who needs it), from which the next deltas apply again.
+"""
+from __future__ import annotations
+
+import asyncio
+import collections
+import json
+import logging
+import struct
+from typing import Dict, Optional
+
+from Wire import KEYFRAME, SnapshotEncoder, is_empty_delta, message_kind
+
+logger = logging.getLogger(__name__)
+
+_HEADER = struct.Struct(">I")
+EVENTS = ("move", "capture", "game_over")
+MAX_FRAMES = 64                  # frames queued for one spectator before it is cut back to a keyframe
+BUFFER_LIMIT = 64 * 1024         # bytes in a spectator's socket buffer before its outbox stops flushing
+FINISH_TIMEOUT_S = 5.0           # how long the end of a match waits for spectators to take the last frames
+
+
+def _framed(body: bytes) -> bytes:
+    # same length-prefixed framing as Server.encode_frame
+    return _HEADER.pack(len(body)) + body
+
+
+class Spectator:
+    """One watching connection: a bounded outbox in front of its writer.
+
+    *writer* is an ``asyncio.StreamWriter`` or anything with ``write``,
+    ``is_closing``, ``transport.get_write_buffer_size`` and an awaitable
+    ``drain``.
+    """
+
+    def __init__(self, writer, max_frames: int = MAX_FRAMES, buffer_limit: int = BUFFER_LIMIT):
+        self.writer = writer
+        self.max_frames = max_frames
+        self.buffer_limit = buffer_limit
+        self.outbox = collections.deque()
+        self.needs_keyframe = True
+        # counters
+        self.sent = self.keyframes = self.dropped = 0
+        self.high_water = 0
+
+    @property
+    def depth(self) -> int:
+        return len(self.outbox)
+
+    def stats(self) -> dict:
+        return {"depth": self.depth, "high_water": self.high_water, "sent": self.sent,
+                "keyframes": self.keyframes, "dropped": self.dropped}
+
+    def offer(self, frame: bytes) -> bool:
+        """Queue *frame*; False (and nothing queued) once the outbox is full
+        – the spectator then waits for a keyframe instead."""
+        if self.needs_keyframe:
+            return False
+        if len(self.outbox) >= self.max_frames:
+            self.dropped += len(self.outbox) + 1
+            self.outbox.clear()
+            self.needs_keyframe = True
+            return False
+        self.outbox.append(frame)
+        self.high_water = max(self.high_water, len(self.outbox))
+        return True
+
+    def reset(self, *frames: bytes):
+        """Replace whatever is queued with *frames* (a keyframe, and maybe the final result)."""
+        self.outbox.clear()
+        self.outbox.extend(frames)
+        self.needs_keyframe = False
+        self.keyframes += 1
+
+    def flush(self, force: bool = False) -> bool:
+        """Write queued frames while the socket keeps up (all of them if *force*);
+        False once the connection is gone."""
+        writer = self.writer
+        if writer.is_closing():
+            return False
+        get_size = writer.transport.get_write_buffer_size
+        while self.outbox and (force or get_size() <= self.buffer_limit):
+            writer.write(self.outbox.popleft())
+            self.sent += 1
+        return True
+
+
+class Broadcaster:
+    """Streams one match to any number of spectators (see module doc)."""
+
+    def __init__(self, game, match_id: Optional[int] = None,
+                 max_frames: int = MAX_FRAMES, buffer_limit: int = BUFFER_LIMIT):
+        self.game = game
+        self.match_id = match_id
+        self.max_frames = max_frames
+        self.buffer_limit = buffer_limit
+        self.encoder = SnapshotEncoder()
+        self.spectators: Dict[object, Spectator] = {}    # writer -> spectator
+        self._final: Optional[bytes] = None               # game_over, repeated after every later keyframe
+        self.frames = self.keyframes = 0                  # encodings done – independent of the audience
+        for event in EVENTS:
+            game.pubsub.subscribe(event, self._event_handler(event))
+
+    # ---------------- audience ----------------------------------------
+    def add(self, writer) -> Spectator:
+        spectator = Spectator(writer, self.max_frames, self.buffer_limit)
+        self.spectators[writer] = spectator
+        return spectator
+
+    def remove(self, writer) -> Optional[Spectator]:
+        return self.spectators.pop(writer, None)
+
+    # ---------------- events ------------------------------------------
+    def _event_handler(self, event: str):
+        def on_event(data):
+            if not self.spectators and event != "game_over":
+                return
+            msg = {"type": "event", "match": self.match_id, "event": event, "data": data}
+            frame = _framed(json.dumps(msg, separators=(",", ":")).encode("utf-8"))
+            if event == "game_over":
+                self._final = frame
+            for spectator in self.spectators.values():
+                spectator.offer(frame)
+        return on_event
+
+    # ---------------- the tick ----------------------------------------
+    def tick(self):
+        """Encode this tick's board once and queue it for every spectator."""
+        if not self.spectators:
+            return
+        frame = self.encoder.encode(self.game.pieces, self.game.game_time_ms())
+        lagging = [s for s in self.spectators.values() if s.needs_keyframe]
+        if is_empty_delta(frame) and not lagging:
+            # nothing to tell; the next delta still builds on the last one sent
+            self._flush()
+            return
+        self.encoder.ack(self.encoder.seq)
+        self.frames += 1
+        framed, key = _framed(frame), None
+        final = (self._final,) if self._final else ()
+        if message_kind(frame) == KEYFRAME:
+            # no base yet, or a new state name: this frame is everyone's keyframe
+            key = (framed,) + final
+            self.keyframes += 1
+        for spectator in self.spectators.values():
+            if not spectator.offer(framed):
+                if key is None:
+                    key = (_framed(self.encoder.current_keyframe()),) + final
+                    self.keyframes += 1
+                spectator.reset(*key)
+        self._flush()
+
+    async def finish(self, timeout: float = FINISH_TIMEOUT_S):
+        """End of the match: hand every spectator what is still queued (the
+        ``game_over`` event included) and wait – up to *timeout* – for the
+        sockets to take it.  Outboxes are bounded, so writing them out whole
+        is bounded too."""
+        writers = [writer for writer, spectator in self.spectators.items() if spectator.flush(force=True)]
+        if not writers:
+            return
+        results = asyncio.gather(*(writer.drain() for writer in writers), return_exceptions=True)
+        try:
+            await asyncio.wait_for(results, timeout)
+        except asyncio.TimeoutError:
+            logger.info("Match %s: spectators still draining after %.1fs", self.match_id, timeout)
+
+    def _flush(self):
+        for writer, spectator in list(self.spectators.items()):
+            if not spectator.flush():
+                logger.debug("Spectator of match %s left: %s", self.match_id, spectator.stats())
+                del self.spectators[writer]
+
+    def stats(self) -> dict:
+        return {"spectators": len(self.spectators), "frames": self.frames, "keyframes": self.keyframes,
+                "dropped": sum(s.dropped for s in self.spectators.values()),
+                "max_depth": max((s.high_water for s in self.spectators.values()), default=0)}
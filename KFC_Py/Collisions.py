@@ -0,0 +1,116 @@
+# Collisions.py
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from Piece import Piece
+
+logger = logging.getLogger(__name__)
+
+Cell = Tuple[int, int]
+
+
+@dataclass(frozen=True)
+class Presence:
+    """A piece as the capture rule sees it at one instant."""
+    piece: Piece
+    state_name: str
+    start_ms: int
+    can_be_captured: bool
+
+    @classmethod
+    def of(cls, piece: Piece) -> "Presence":
+        """The piece as it is right now."""
+        st = piece.state
+        return cls(piece, st.name, st.physics.get_start_ms(), st.can_be_captured())
+
+    @property
+    def id(self) -> str:
+        return self.piece.id
+
+    @property
+    def airborne(self) -> bool:
+        # jumping pieces and moving knights are in the air
+        return self.state_name == "jump" or (self.state_name == "move" and self.piece.desc.airborne_while_moving)
+
+
+def capture_outcome(group: List[Presence], cell: Cell) -> Tuple[Presence, List[Piece]]:
+    """Who wins when *group* shares *cell*, and which pieces it captures."""
+    logger.debug(f"Collision detected at {cell}: {[p.id for p in group]}")
+
+    # Choose the piece that most recently entered the square
+    # But prioritize pieces that are actually moving over idle pieces
+    moving = [p for p in group if p.state_name != 'idle']
+    winner = max(moving or group, key=lambda p: p.start_ms)
+    logger.debug(f"Winner: {winner.id} (state: {winner.state_name})")
+
+    victims = []
+    for p in group:
+        if p is winner:
+            continue
+        if not p.can_be_captured:
+            logger.debug(f"Piece {p.id} cannot be captured (state: {p.state_name})")
+            continue
+        # Pieces in the air (jumping, or airborne movers like knights) are neither captured nor capture
+        if p.airborne:
+            logger.debug(f"{p.id} is in the air - not removing")
+            continue
+        if winner.airborne:
+            logger.debug(f"Winner {winner.id} is in the air - not removing {p.id}")
+            continue
+        # Don't capture pieces of the same color (friendly pieces)
+        if winner.piece.desc.color == p.piece.desc.color:
+            logger.debug(f"Winner {winner.id} and {p.id} are same color - not capturing")
+            continue
+        victims.append(p.piece)
+    return winner, victims
+
+
+@dataclass(frozen=True)
+class Contact:
+    t_ms: int
+    cell: Cell
+    group: Tuple[Presence, ...]
+
+
+class SweptCollisions:
+    """Spatial hash of the cells movers passed through during one tick.
+
+    Each mover contributes the ``(cell, enter, exit)`` intervals of its
+    movement segment (from ``physics.cell_intervals``); pieces that did not
+    move occupy their cell for the whole window.  ``contacts`` reports every
+    moment two or more pieces share a cell, with the exact time of contact,
+    so the outcome does not depend on how long the tick was.  Only cells a
+    mover touched are examined.
+    """
+
+    def __init__(self):
+        self._hash: Dict[Cell, List[Tuple[int, int, Presence]]] = {}
+
+    def add_segment(self, presence: Presence, cell: Cell, t_in: int, t_out: int):
+        self._hash.setdefault(cell, []).append((t_in, t_out, presence))
+
+    def contacts(self, t_start: int, t_end: int,
+                 occupants: Optional[Callable[[Cell], Iterable[Presence]]] = None) -> List[Contact]:
+        """Contacts within ``[t_start, t_end]``, earliest first."""
+        swept = {pr.piece for entries in self._hash.values() for _, _, pr in entries}
+        out: List[Contact] = []
+        for cell, entries in self._hash.items():
+            entries = list(entries)
+            if occupants is not None:
+                entries += [(t_start, t_end, pr) for pr in occupants(cell) if pr.piece not in swept]
+            if len({pr.piece for _, _, pr in entries}) < 2:
+                continue
+            last = None
+            # a contact can only begin when somebody enters the cell
+            for t in sorted({t_in for t_in, _, _ in entries}):
+                present = {pr.piece: pr for t_in, t_out, pr in entries
+                           if t_in <= t and (t < t_out or t_out == t_end)}
+                group, pieces = tuple(present.values()), frozenset(present)
+                if len(pieces) >= 2 and pieces != last:
+                    out.append(Contact(t, cell, group))
+                last = pieces
+        out.sort(key=lambda c: (c.t_ms, c.cell))
+        return out
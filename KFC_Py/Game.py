@@ -1,25 +1,27 @@
-import queue, threading, time, math, logging
+import queue, threading, time, math, logging, dataclasses
 from typing import List, Dict, Tuple, Optional, Set
-from collections import defaultdict
-import cv2
 from Board import Board
 from Command import Command
-from Piece import Piece
+from Piece import Piece, color_code
 import numpy as np
 import pathlib
 from BackgroundBoardFactory import create_background_board
-from PubSub import pubsub
+from PubSub import PubSub
 from MoveLogger import MoveLogger
-from UIOverlay import UIOverlay
-from SoundManager import SoundManager
 from img import Img
+from Renderer import DirtyRectRenderer
+from Scheduler import PhysicsScheduler
+from Occupancy import OccupancyIndex
+from MoverRegistry import MoverRegistry
+from Collisions import Presence, SweptCollisions, capture_outcome
+from Royals import COLOR_NAMES, PieceList, RoyalIndex
+from Clock import Clock, MonotonicClock
 
 
 class InvalidBoard(Exception):
     """Raised when board setup is invalid"""
     pass
 from ScoreBoard import Scoreboard
-from Announcer import Announcer
 from KeyboardInput import KeyboardProcessor, KeyboardProducer
 
 
@@ -31,8 +33,13 @@ class InvalidBoard(Exception): ...
 
 
 class Game:
-    def __init__(self, pieces: List[Piece], board: Board, skip_validation: bool = False):
-        self.pieces = pieces
+    def __init__(self, pieces: List[Piece], board: Board, skip_validation: bool = False,
+                 clock: Optional[Clock] = None, headless: bool = False,
+                 pubsub: Optional[PubSub] = None):
+        # kings per color, kept in sync with the piece list for O(1) win checks
+        self.royals = RoyalIndex(pieces)
+        self.pieces = PieceList(pieces, on_add=self.royals.add, on_remove=self.royals.discard)
+        self._game_over_published = False
         self.board = board
         
         # Validate the board after basic initialization (unless skipped for tests)
@@ -40,11 +47,14 @@ class Game:
             self._validate(pieces)
             
         self.curr_board = None
+        self.renderer: Optional[DirtyRectRenderer] = None
         self.user_input_queue = queue.Queue()
         self.piece_by_id = {p.id: p for p in pieces}
-        self.pos: Dict[Tuple[int, int], List[Piece]] = defaultdict(list)
-        self.START_NS = time.time_ns()
-        self._time_factor = 1  
+        # cell -> pieces, updated only when a piece changes cell
+        self.pos = OccupancyIndex(pieces, dims=(board.H_cells, board.W_cells))
+        self._legal_cache: Dict[Piece, tuple] = {}  # piece -> ((state, cell, pos.version), cells)
+        # all game time (commands, physics, rendering) is read from this clock
+        self.clock: Clock = clock if clock is not None else MonotonicClock()
         self.kp1 = None
         self.kp2 = None
         self.kb_prod_1 = None
@@ -55,23 +65,78 @@ class Game:
         self.last_cursor2 = (0, 0)
         self.opening_message_duration = 3  # שניות
         self.closing_message_duration = 3  # שניות
-        self.logger = MoveLogger()
+        # this match's event bus – nothing outside it hears these events
+        self.pubsub = pubsub if pubsub is not None else PubSub()
+        self.logger = MoveLogger(self.pubsub)
         self.score = Scoreboard()
-        self.overlay = UIOverlay(self.logger, self.score)
         #board = create_background_board("../pieces/background.png", "../pieces/board.png")
-        self.sound = SoundManager(pubsub)
-        self.announcer = Announcer()
         self.register_event_listeners()
+        # UI overlay, sound and announcer (OpenCV / pygame) – left out when headless
+        self.overlay = self.sound = self.announcer = None
+        self.headless = headless
+        if not headless:
+            self.attach_media()
+
+        # only pieces that are moving or have a pending deadline get updated;
+        # the moving ones are stepped together, vectorized, by the registry
+        self.scheduler = PhysicsScheduler()
+        self.movers = MoverRegistry(board)
+        for p in pieces:
+            p.on_state_change = self._on_piece_state_change
+            self.scheduler.schedule(p)
+            self._track_mover(p)
+
+    def _track_mover(self, piece: Piece):
+        if piece.state.physics.is_moving():
+            self.movers.add(piece)
+        else:
+            self.movers.discard(piece)
 
+    def _on_piece_state_change(self, piece: Piece):
+        # new state (or the same one restarted / restored): its hints are recomputed on demand
+        self._legal_cache.pop(piece, None)
+        self.scheduler.schedule(piece)
+        self._track_mover(piece)
+        # a jump lands / a move starts or ends right here; captured pieces stay out
+        if self.pos.cell_of(piece) is not None:
+            self.pos.place(piece, piece.current_cell())
 
     def register_event_listeners(self):
-        pubsub.subscribe("capture", self.score.handle_capture)
-        pubsub.subscribe("move", self.logger.handle_move)
-        pubsub.subscribe("game_start", self.announcer.show_start)
-        pubsub.subscribe("game_over", self.announcer.show_end)
+        self.pubsub.subscribe("capture", self.score.handle_capture)
+        self.pubsub.subscribe("move", self.logger.handle_move)
+
+    def attach_media(self):
+        """Attach the presentation adapters; they only listen to game events.
+
+        Imported here rather than at module level so the simulation core
+        never loads OpenCV or pygame unless something is shown or played.
+        """
+        if self.announcer is not None:
+            return
+        from UIOverlay import UIOverlay
+        from SoundManager import SoundManager
+        from Announcer import Announcer
+
+        self.overlay = UIOverlay(self.logger, self.score)
+        self.sound = SoundManager(self.pubsub)
+        self.announcer = Announcer()
+        self.pubsub.subscribe("game_start", self.announcer.show_start)
+        self.pubsub.subscribe("game_over", self.announcer.show_end)
+        # side panels are cached layers – re-render only when their content changes
+        for event in ("move", "capture", "game_over"):
+            self.pubsub.subscribe(event, self.overlay.invalidate)
     
     def game_time_ms(self) -> int:
-        return self._time_factor * (time.monotonic_ns() - self.START_NS) // 1_000_000
+        return self.clock.now_ms()
+
+    @property
+    def _time_factor(self) -> float:
+        """Game-time speed multiplier (kept for callers that speed the game up)."""
+        return self.clock.speed
+
+    @_time_factor.setter
+    def _time_factor(self, factor: float):
+        self.clock.speed = factor
 
     def clone_board(self) -> Board:
         return self.board.clone()
@@ -114,37 +179,108 @@ class Game:
         self.kb_prod_2.start()
 
     def _update_cell2piece_map(self):
-        self.pos.clear()
-        for p in self.pieces:
-            self.pos[p.current_cell()].append(p)
-
-    def _run_game_loop(self, num_iterations=None, is_with_graphics=True):
+        """Full resync of the occupancy index – the game loop keeps it current incrementally."""
+        self.pos.rebuild(self.pieces)
+        self._legal_cache.clear()
+
+    def legal_destinations(self, piece: Piece) -> Tuple[Tuple[int, int], ...]:
+        """Cells *piece* may be ordered to move to right now (move hints, bots, prevalidation).
+
+        Memoized per piece until its state, its cell or the board occupancy
+        (``pos.version``) changes.
+        """
+        cell = self.pos.cell_of(piece)
+        if cell is None:
+            return ()  # captured / not on the board
+        key = (piece.state, cell, self.pos.version)
+        hit = self._legal_cache.get(piece)
+        if hit is not None and hit[0] == key:
+            return hit[1]
+        cells = tuple(piece.state.legal_destinations(self.pos, piece.desc.color))
+        self._legal_cache[piece] = (key, cells)
+        return cells
+
+    def _update_pieces(self, now_ms: int) -> list:
+        """Advance only the pieces whose physics can change at *now_ms*.
+
+        Pieces are woken from the scheduler's deadline heap only: rest/jump
+        pieces when their timer runs out, moving pieces when they enter the
+        next cell or arrive.  Positions in between are never computed here –
+        observers use ``physics.position_at``.  State changes re-schedule the
+        piece through ``Piece.on_state_change``.
+
+        Returns ``(piece, move_state, last_update_ms)`` for every mover woken,
+        for the swept collision stage.
+        """
+        swept = []
+        for p in self.scheduler.due(now_ms):
+            state = p.state
+            if state.physics.is_moving():
+                swept.append((p, state, state.physics.get_last_update_ms()))
+            p.update(now_ms)
+            if p.state is state:
+                # still travelling (new cell) or woken a hair early – re-arm
+                self._on_piece_state_change(p)
+        return swept
+
+    def _wait_for_input(self, now_ms: int, max_wait_ms: float):
+        """Block on the input queue until the next scheduled deadline."""
+        deadline = self.scheduler.next_deadline_ms()
+        wait_ms = max_wait_ms
+        if deadline is not None:
+            wait_ms = min(wait_ms, self.clock.real_wait_s(deadline - now_ms) * 1000)
+        if wait_ms <= 0:
+            return
+        try:
+            cmd: Command = self.user_input_queue.get(timeout=wait_ms / 1000)
+        except queue.Empty:
+            return
+        self._process_input(cmd)
+
+    def tick(self, now_ms: Optional[int] = None) -> bool:
+        """One simulation step at *now_ms* (default: the clock's time).
+
+        Wakes the pieces that are due, applies the queued input, resolves
+        collisions and checks for a win.  Touches no graphics or input
+        device, so any driver – the local loop, a server task – can call it.
+        Returns True once the game is decided.
+        """
+        if self._is_win():
+            return True
+        now = self.game_time_ms() if now_ms is None else now_ms
+        swept = self._update_pieces(now)
+
+        while not self.user_input_queue.empty():
+            cmd: Command = self.user_input_queue.get()
+            self._process_input(cmd)
+
+        self._resolve_collisions(swept, now)
+
+        # בדיקה אם המשחק הסתיים
+        if self._is_win():
+            # פרסום אירוע סיום המשחק (אם הלכידה עוד לא פרסמה)
+            self._announce_win()
+            return True
+        return False
+
+    def _run_game_loop(self, num_iterations=None, is_with_graphics=True, max_idle_wait_ms: float = 0):
         it_counter = 0
         game_ended = False
         victory_screen_shown = False
         
+        if is_with_graphics:
+            self.attach_media()
+
         while not game_ended:
             now = self.game_time_ms()
 
             # אם המשחק עדיין פעיל
-            if not victory_screen_shown and not self._is_win():
-                for p in self.pieces:
-                    p.update(now)
-
-                self._update_cell2piece_map()
-
-                while not self.user_input_queue.empty():
-                    cmd: Command = self.user_input_queue.get()
-                    self._process_input(cmd)
-
-                self._resolve_collisions()
-                
-                # בדיקה אם המשחק הסתיים
-                if self._is_win():
+            if not victory_screen_shown:
+                if self.tick(now):
                     victory_screen_shown = True
-                    # פרסום אירוע סיום המשחק
-                    winner = 'Black' if any(p.id.startswith('KB') for p in self.pieces) else 'White'
-                    pubsub.publish("game_over", {"winner": winner})
+                elif not is_with_graphics and max_idle_wait_ms:
+                    # nothing can change before the next deadline or input
+                    self._wait_for_input(now, max_idle_wait_ms)
 
             if is_with_graphics:
                 self._draw()
@@ -161,16 +297,16 @@ class Game:
 
     def run(self, num_iterations=None, is_with_graphics=True):
        
-        self.start_user_input_thread()
-        start_ms = self.START_NS
+        if not self.headless:
+            self.start_user_input_thread()
+        start_ms = self.clock.now_ms()
         for p in self.pieces:
             p.reset(start_ms)
-        pubsub.publish("game_start", {})
+        self.pubsub.publish("game_start", {})
         self._run_game_loop(num_iterations, is_with_graphics)
         
         # הודעה על סיום במסוף
-        winner = 'Black' if any(p.id.startswith('KB') for p in self.pieces) else 'White'
-        logger.info(f"{winner} wins!")
+        logger.info(f"{self._winner_name()} wins!")
         
         if self.kb_prod_1:
             self.kb_prod_1.stop()
@@ -178,6 +314,7 @@ class Game:
 
 
     def draw(self, frame):
+        import cv2
         # ציור כל הכלים על הלוח
         for piece in self.pieces:
             if piece.alive:
@@ -219,9 +356,10 @@ class Game:
                         cv2.FONT_HERSHEY_SIMPLEX, 2, (0, 0, 255), 4)
 
     def _draw(self):
-        self.curr_board = self.clone_board()
-        for p in self.pieces:
-            p.draw_on_board(self.curr_board, now_ms=self.game_time_ms())
+        if self.renderer is None:
+            self.renderer = DirtyRectRenderer(self.board.img)
+            self.curr_board = dataclasses.replace(self.board, img=self.renderer.frame)
+        decorations = []
 
         # overlay both players' cursors, but only log on change
         if self.kp1 and self.kp2:
@@ -236,7 +374,7 @@ class Game:
                 y2 = y1 + self.board.cell_H_pix - 1
                 x2 = x1 + self.board.cell_W_pix - 1
                 color = (0, 255, 0) if player == 1 else (255, 0, 0)
-                self.curr_board.img.draw_rect(x1, y1, x2, y2, color)
+                decorations.append((x1, y1, x2, y2, color))
 
                 # only print if moved
                 prev = getattr(self, last)
@@ -251,7 +389,7 @@ class Game:
                 selected_piece = self.piece_by_id.get(selected_id)
                 if selected_piece:
                     # בדוק שהכלי שייך לשחקן הנכון
-                    piece_color = selected_piece.id[1]  # W או B
+                    piece_color = selected_piece.desc.color_letter  # W או B
                     expected_color = 'W' if player == 1 else 'B'  # שחקן 1 = לבן, שחקן 2 = שחור
                     
                     if piece_color == expected_color:
@@ -270,9 +408,17 @@ class Game:
                         
                         # צייר מסגרת עבה
                         for i in range(thickness):
-                            self.curr_board.img.draw_rect(x1-i, y1-i, x2+i, y2+i, color)
+                            decorations.append((x1-i, y1-i, x2+i, y2+i, color))
+
+        # only cells whose sprite moved/changed frame (or under a changed marker) are repainted
+        now = self.game_time_ms()
+        self.movers.step(now)  # every mover's position at `now`, in one batch
+        self.renderer.render(((p.id, *p.sprite_pos(now)) for p in self.pieces), decorations)
 
     def _show(self):
+        if self.announcer.is_active():
+            # the announcer paints straight onto the frame buffer – repaint it next tick
+            self.renderer.invalidate()
         self.announcer.overlay_message(self.curr_board.img.img)
         frame = self.curr_board.img.img
         frame = self.overlay.draw_overlay(frame)  # ← כאן
@@ -282,16 +428,12 @@ class Game:
         if self.announcer.is_victory_screen_finished():
             return True  # סיגנל ליציאה מהמשחק
 
-    def _side_of(self, piece_id: str) -> str:
-        return piece_id[1]
-
     def _process_input(self, cmd: Command):
-        color_char = cmd.piece_id[1].upper()
-        color = "white" if color_char == "W" else "black"
         mover = self.piece_by_id.get(cmd.piece_id)
         if not mover:
             logger.debug("Unknown piece id %s", cmd.piece_id)
             return
+        color = "white" if mover.desc.color_letter == "W" else "black"
 
         # שמור את המצב הקודם כדי לבדוק אם המהלך בוצע בהצלחה
         old_state = mover.state
@@ -315,8 +457,8 @@ class Game:
             to_cell = None
             ate = False
 
-        pubsub.publish("move", {
-            "piece": cmd.piece_id[0],
+        self.pubsub.publish("move", {
+            "piece": mover.desc.kind,
             "color": color,
             "from": from_cell,
             "to": to_cell,
@@ -324,102 +466,102 @@ class Game:
         })
         logger.info(f"Processed command: {cmd} for piece {cmd.piece_id}")
 
-    def _resolve_collisions(self):
-        self._update_cell2piece_map()
-        occupied = self.pos
-
-        for cell, plist in occupied.items():
+    def _capture(self, winner: Piece, victim: Piece, cell):
+        logger.info(f"CAPTURE: {winner.id} captures {victim.id} at {cell}")
+        self.pubsub.publish("capture", {
+            "attacker_color": winner.desc.color_letter,
+            "piece_type": victim.desc.kind.upper(),
+            "cell": cell
+        })
+        self.pieces.remove(victim)
+        self._legal_cache.pop(victim, None)
+        self.scheduler.remove(victim)
+        self.movers.discard(victim)
+        self.pos.remove(victim)
+        if self._is_win():
+            self._announce_win()
+
+    def _resolve_swept(self, swept, now_ms: int):
+        """Replay the movers woken this tick over their exact cell intervals.
+
+        Catches pieces that met between two ticks (swapping or crossing
+        cells), at the time and cell of first contact.
+        """
+        hashed = SweptCollisions()
+        t_start = now_ms
+        for piece, state, t0 in swept:
+            phys = state.physics
+            arrival = phys.arrival_ms()
+            in_flight = Presence(piece, state.name, phys.get_start_ms(), phys.can_be_captured())
+            for cell, t_in, t_out in phys.cell_intervals(t0, min(now_ms, arrival)):
+                hashed.add_segment(in_flight, cell, t_in, t_out)
+            if arrival < now_ms:  # landed during the tick – present as it is now
+                hashed.add_segment(Presence.of(piece), phys.get_end_cell(), arrival, now_ms)
+            t_start = min(t_start, t0)
+
+        def occupants(cell):
+            return [Presence.of(p) for p in self.pos.get(cell, ())]
+
+        gone = set()
+        for contact in hashed.contacts(t_start, now_ms, occupants):
+            group = [pr for pr in contact.group
+                     if pr.piece not in gone and self.pos.cell_of(pr.piece) is not None]
+            if len(group) < 2:
+                continue
+            winner, victims = capture_outcome(group, contact.cell)
+            for victim in victims:
+                logger.debug(f"Swept contact at {contact.cell}, t={contact.t_ms}")
+                self._capture(winner.piece, victim, contact.cell)
+                gone.add(victim)
+
+    def _resolve_collisions(self, swept=(), now_ms: Optional[int] = None):
+        """*swept*: ``(piece, move_state, last_update_ms)`` for movers woken this tick."""
+        if swept:
+            self._resolve_swept(swept, now_ms)
+
+        # pieces sharing a cell right now (jump landings, stationary overlaps)
+        for cell in list(self.pos.crowded):
+            plist = list(self.pos.get(cell, ()))
             if len(plist) < 2:
                 continue
-
-            logger.debug(f"Collision detected at {cell}: {[p.id for p in plist]}")
-
-            # Choose the piece that most recently entered the square
-            # But prioritize pieces that are actually moving over idle pieces
-            moving_pieces = [p for p in plist if p.state.name != 'idle']
-            if moving_pieces:
-
-                winner = max(moving_pieces, key=lambda p: p.state.physics.get_start_ms())
-                logger.debug(f"Winner (moving): {winner.id} (state: {winner.state.name})")
-            else:
-                # If no moving pieces, choose the most recent idle piece
-                winner = max(plist, key=lambda p: p.state.physics.get_start_ms())
-                logger.debug(f"Winner (idle): {winner.id} (state: {winner.state.name})")
-
-            # Determine if captures allowed: default allow
-            if not winner.state.can_capture():
-                # Allow capture even for idle pieces to satisfy game rules
-                pass
-
-            # Remove every other piece that *can be captured*
-            for p in plist:
-                if p is winner:
-                    continue
-                if p.state.can_be_captured():
-                    logger.debug(f"Checking if {p.id} can be captured (state: {p.state.name})")
-                    
-                    # Don't remove knights that are moving (they're jumping in the air)
-                    if p.id.startswith(('NW', 'NB')) and p.state.name == 'move':
-                        logger.debug(f"Knight {p.id} is moving (jumping) - not removing")
-                        continue
-                    # Don't remove pieces that are jumping (they're in the air)
-                    if p.state.name == 'jump':
-                        logger.debug(f"Piece {p.id} is jumping - not removing")
-                        continue
-                    # Don't remove pieces if the winner is jumping (winner is in the air)
-                    if winner.state.name == 'jump':
-                        logger.debug(f"Winner {winner.id} is jumping - not removing {p.id}")
-                        continue
-                    # Don't remove pieces if the winner is a knight moving (knight is jumping in the air)
-                    if winner.id.startswith(('NW', 'NB')) and winner.state.name == 'move':
-                        logger.debug(f"Winner knight {winner.id} is moving (jumping) - not removing {p.id}")
-                        continue
-                    
-                    # Don't capture pieces of the same color (friendly pieces)
-                    if winner.id[1] == p.id[1]:  # Same color (W/B)
-                        logger.debug(f"Winner {winner.id} and {p.id} are same color - not capturing")
-                        continue
-                    
-                    logger.info(f"CAPTURE: {winner.id} captures {p.id} at {cell}")
-                    pubsub.publish("capture", {
-                        "attacker_color": winner.id[1],
-                        "piece_type": p.id[0].upper(),
-                        "cell": cell
-                    })
-                    self.pieces.remove(p)
-                else:
-                    logger.debug(f"Piece {p.id} cannot be captured (state: {p.state.name})")
+            winner, victims = capture_outcome([Presence.of(p) for p in plist], cell)
+            for victim in victims:
+                self._capture(winner.piece, victim, cell)
 
     def _validate(self, pieces):
         """Ensure both kings present and no two pieces share a cell."""
-        has_white_king = has_black_king = False
-        seen_cells: dict[tuple[int, int], str] = {}
+        royal_colors = set()
+        seen_cells: dict[tuple[int, int], int] = {}
         for p in pieces:
             cell = p.current_cell()
             if cell in seen_cells:
                 # Same color pieces cannot overlap
-                if seen_cells[cell] == p.id[1]:
+                if seen_cells[cell] == p.desc.color:
                     raise InvalidBoard("Same color pieces cannot overlap")
                 # Different colors can overlap (for captures)
-            seen_cells[cell] = p.id[1]
-            if p.id.startswith("KW"):
-                has_white_king = True
-            elif p.id.startswith("KB"):
-                has_black_king = True
-        
-        if not has_white_king:
+            seen_cells[cell] = p.desc.color
+            if p.desc.royal:
+                royal_colors.add(p.desc.color)
+
+        if color_code("W") not in royal_colors:
             raise InvalidBoard("Missing white king")
-        if not has_black_king:
+        if color_code("B") not in royal_colors:
             raise InvalidBoard("Missing black king")
         
         return True
 
     def _is_win(self) -> bool:
-        kings = [p for p in self.pieces if p.id.startswith(('KW', 'KB'))]
-        return len(kings) < 2
+        return self.royals.is_decided()
+
+    def _winner_name(self) -> str:
+        return COLOR_NAMES.get(self.royals.winner(), 'White')
 
     def _announce_win(self):
-        winner = 'Black' if any(p.id.startswith('KB') for p in self.pieces) else 'White'
+        """Publish ``game_over`` – once per game, however many times it is called."""
+        if self._game_over_published:
+            return
+        self._game_over_published = True
+        winner = self._winner_name()
         logger.info(f"{winner} wins!")
-        pubsub.publish("game_over", {"winner": winner})
+        self.pubsub.publish("game_over", {"winner": winner})
         
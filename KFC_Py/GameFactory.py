@@ -2,46 +2,92 @@ import pathlib
 from Board import Board
 from PieceFactory import PieceFactory
 from Game import Game
-from GraphicsFactory import GraphicsFactory
-from BackgroundBoardFactory import create_background_board
+from GraphicsFactory import GraphicsFactory, MockImgFactory
+from BackgroundBoardFactory import create_background_board, board_from_background
+from AssetBundle import AssetBundle
+from Clock import Clock
+from mock_img import MockImg
+from PubSub import PubSub
 
 
 CELL_PX = 64
 
 
-def create_game(pieces_root: str | pathlib.Path, img_factory) -> Game:
+def create_game(pieces_root: str | pathlib.Path, img_factory,
+                bundle: str | pathlib.Path | AssetBundle | None = None,
+                parallel_load: bool = False,
+                lazy_graphics: bool = False,
+                clock: Clock | None = None,
+                headless: bool = False,
+                pubsub: PubSub | None = None) -> Game:
     """Build a *Game* from the on-disk asset hierarchy rooted at *pieces_root*.
 
     This reads *board.csv* located inside *pieces_root*, creates a blank board
     (or loads board.png if present), instantiates every piece via PieceFactory
     and returns a ready-to-run *Game* instance.
+
+    If *bundle* (a path compiled by ``AssetBundle.py`` or an open
+    ``AssetBundle``) is given, the board layout, background, configs, moves,
+    transitions and sprites all come from that single memory-mapped file.
+    Otherwise *parallel_load* decodes every sprite up-front on a thread pool
+    (see ``GraphicsFactory.preload``) instead of one piece at a time, and
+    *lazy_graphics* defers each state's sprites until it is first drawn while
+    prefetching the states reachable from the current one.
+
+    *clock* is the game's time source (default: real time); pass a
+    ``Clock.VirtualClock`` to step the game deterministically.
+
+    *headless* builds only the simulation: no background image is decoded,
+    sprites come from ``MockImgFactory`` whatever *img_factory* is, and no
+    sound, overlay or keyboard adapter is attached – nothing imports
+    OpenCV, pygame or ``keyboard``.
+
+    *pubsub* is the match's event bus; by default the game gets its own.
     """
+    if headless:
+        img_factory = MockImgFactory()
     pieces_root = pathlib.Path(pieces_root)
-    board_csv = pieces_root / "board.csv"
-    if not board_csv.exists():
-        raise FileNotFoundError(board_csv)
-
-    background_path = pieces_root / "background.jpg"
-    board_img_path = pieces_root / "board.png"
-
-    if not background_path.exists():
-        raise FileNotFoundError(background_path)
-    if not board_img_path.exists():
-        raise FileNotFoundError(board_img_path)
-
-    board = create_background_board(
-        background_path=str(background_path),
-        board_img_path=str(board_img_path)
-    )
-
-    gfx_factory = GraphicsFactory(img_factory)
-    pf = PieceFactory(board, pieces_root, graphics_factory=gfx_factory)
-
-    pieces = []
-    with board_csv.open() as f:
-        for r, line in enumerate(f):
-            for c, code in enumerate(line.strip().split(",")):
-                if code:
-                    pieces.append(pf.create_piece(code, (r, c)))
-
-    return Game(pieces, board) 
\ No newline at end of file
+    if bundle is not None and not isinstance(bundle, AssetBundle):
+        bundle = AssetBundle(bundle)
+
+    if bundle is not None:
+        board = board_from_background(MockImg() if headless else bundle.background())
+        board_lines = bundle.board_csv.splitlines()
+    elif headless:
+        board = board_from_background(MockImg())
+        board_lines = (pieces_root / "board.csv").read_text().splitlines()
+    else:
+        board_csv = pieces_root / "board.csv"
+        if not board_csv.exists():
+            raise FileNotFoundError(board_csv)
+
+        background_path = pieces_root / "background.jpg"
+        board_img_path = pieces_root / "board.png"
+
+        if not background_path.exists():
+            raise FileNotFoundError(background_path)
+        if not board_img_path.exists():
+            raise FileNotFoundError(board_img_path)
+
+        board = create_background_board(
+            background_path=str(background_path),
+            board_img_path=str(board_img_path)
+        )
+        board_lines = board_csv.read_text().splitlines()
+
+    layout = [(code, (r, c))
+              for r, line in enumerate(board_lines)
+              for c, code in enumerate(line.strip().split(",")) if code]
+
+    gfx_factory = GraphicsFactory(img_factory, lazy=lazy_graphics, prefetch=lazy_graphics)
+    if parallel_load and bundle is None and not lazy_graphics:
+        sprite_dirs = [state_dir / "sprites"
+                       for code in {code for code, _ in layout}
+                       for state_dir in (pieces_root / code / "states").iterdir()
+                       if state_dir.is_dir()]
+        gfx_factory.preload(sprite_dirs, (board.cell_W_pix, board.cell_H_pix))
+
+    pf = PieceFactory(board, pieces_root, graphics_factory=gfx_factory, bundle=bundle)
+    pieces = [pf.create_piece(code, cell) for code, cell in layout]
+
+    return Game(pieces, board, clock=clock, headless=headless, pubsub=pubsub)
@@ -1,6 +1,6 @@
 import pathlib
 from dataclasses import dataclass, field
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, Sequence, Callable
 from img import Img
 import copy
 from Command import Command
@@ -16,18 +16,54 @@ class Graphics:
                  cell_size: tuple[int, int],
                  img_loader,
                  loop: bool = True,
-                 fps: float = 6.0):
+                 fps: float = 6.0,
+                 frames: Optional[Sequence[Img]] = None,
+                 lazy: bool = False,
+                 frames_loader: Optional[Callable[[], Sequence[Img]]] = None,
+                 prefetcher=None):
 
         # injectable image loader for tests (defaults to Img().read)
         self._img_loader = img_loader
 
-        self.frames: list[Img] = self._load_sprites(sprites_folder, cell_size)
+        # pre-loaded frames (e.g. shared by GraphicsFactory) skip the disk entirely;
+        # lazy graphics decode on first use through *frames_loader*
+        if frames_loader is None:
+            frames_loader = lambda: self._load_sprites(sprites_folder, cell_size)
+        self._frames_loader = frames_loader
+        self._frames: Optional[Sequence[Img]] = frames
+        if frames is None and not lazy:
+            self._frames = frames_loader()
+        # executor used by prefetch(); None disables background warming
+        self._prefetcher = prefetcher
+        self._prefetching = False
+
         self.loop, self.fps = loop, fps
         self.start_ms = 0
         self.cur_frame = 0
+        self._now_ms = 0
         self.frame_duration_ms = 1000 / fps
         logger.debug(f"[LOAD] Graphics from: {sprites_folder}")
 
+    @property
+    def frames(self) -> Sequence[Img]:
+        if self._frames is None:
+            self._frames = self._frames_loader()
+        return self._frames
+
+    @frames.setter
+    def frames(self, frames: Sequence[Img]):
+        self._frames = frames
+
+    def is_loaded(self) -> bool:
+        return self._frames is not None
+
+    def prefetch(self):
+        """Warm the frames in the background (no-op if loaded or no prefetcher)."""
+        if self._frames is not None or self._prefetcher is None or self._prefetching:
+            return
+        self._prefetching = True
+        self._prefetcher.submit(lambda: self.frames)
+
     def copy(self):
         # shallow copy is enough: frames list is immutable PNGs
         return copy.copy(self)
@@ -43,9 +79,13 @@ class Graphics:
 
     def reset(self, cmd: Command):
         self.start_ms = cmd.timestamp
+        self._now_ms = cmd.timestamp
         self.cur_frame = 0
 
     def update(self, now_ms: int):
+        self._now_ms = now_ms
+        if self._frames is None:
+            return  # not drawn yet – get_img() catches up after loading
         elapsed = now_ms - self.start_ms
         frames_passed = int(elapsed / self.frame_duration_ms)
         if self.loop:
@@ -54,6 +94,9 @@ class Graphics:
             self.cur_frame = min(frames_passed, len(self.frames) - 1)
 
     def get_img(self) -> Img:
+        if self._frames is None:
+            self._frames = self._frames_loader()
+            self.update(self._now_ms)
         if not self.frames:
             raise ValueError("No frames loaded for animation.")
         if self.cur_frame >= len(self.frames):
@@ -1,5 +1,4 @@
 import threading, logging
-import keyboard  # pip install keyboard
 from Command import Command
 
 logger = logging.getLogger(__name__)
@@ -78,6 +77,7 @@ class KeyboardProducer(threading.Thread):
 
     def run(self):
         # Install our hook; it stays active until we call keyboard.unhook_all()
+        import keyboard  # pip install keyboard – only needed once input is attached
         keyboard.hook(self._on_event)
         keyboard.wait()
 
@@ -105,7 +105,7 @@ class KeyboardProducer(threading.Thread):
                     return
 
                 # Check if the piece belongs to this player's color
-                piece_color = piece.id[1]  # W or B
+                piece_color = piece.desc.color_letter  # W or B
                 if piece_color != self.my_color:
                     print(f"[WARN] Player{self.player} ({self.my_color}) cannot select {piece.id} (color {piece_color})")
                     return
@@ -166,4 +166,5 @@ class KeyboardProducer(threading.Thread):
 
 
     def stop(self):
+        import keyboard
         keyboard.unhook_all()
@@ -1,7 +1,13 @@
-from PubSub import pubsub 
+from PubSub import PubSub, pubsub as default_pubsub
+
 
 class MoveLogger:
-    def __init__(self):
+    def __init__(self, pubsub: PubSub | None = None):
+        self.pubsub = pubsub if pubsub is not None else default_pubsub
+        self._clear()
+        self.pubsub.subscribe("reset", self.handle_reset)
+
+    def _clear(self):
         self.moves = {"white": [], "black": []}
         self.points = {"white": 0, "black": 0}
         self.value_map = {
@@ -12,8 +18,6 @@ class MoveLogger:
             "Q": 9,
             "K": 0  # או ערך גבוה אם רוצים לתת נקודות גם על אכילת מלך
         }
-  
-        pubsub.subscribe(self.handle_reset, "reset")
 
     def handle_move(self, data):
         color = data["color"]         # "white" / "black"
@@ -27,8 +31,8 @@ class MoveLogger:
     #         piece_type = data["piece_type"]  # "P", "N", etc.
     #         self.log_capture(color, piece_type)
 
-    def handle_reset(self):
-        self.__init__()
+    def handle_reset(self, data=None):
+        self.reset()
 
     def log_move(self, color: str, piece: str, from_cell: str, to_cell: str, ate: bool = False):
         notation = f"{piece}: {from_cell}->{to_cell}"
@@ -43,10 +47,10 @@ class MoveLogger:
         return self.points[color]
 
     def reset(self):
-        self.__init__()
+        self._clear()
    
     def log_capture(self, color: str, piece_type: str):
         value = self.value_map.get(piece_type.upper(), 0)
         self.points[color] += value
         print(f"[SCORE] {color} gets {value} points. Total: {self.points[color]}")
-        pubsub.publish("score_update", {"color": color, "points": self.points[color]})
\ No newline at end of file
+        self.pubsub.publish("score_update", {"color": color, "points": self.points[color]})
\ No newline at end of file
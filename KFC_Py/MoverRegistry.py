@@ -0,0 +1,122 @@
+# MoverRegistry.py
+from __future__ import annotations
+
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from Board import Board
+from Physics import MovePhysics
+from Piece import Piece
+
+
+class MoverRegistry:
+    """Struct-of-arrays view of every piece currently in a ``MovePhysics`` state.
+
+    Start positions, velocities, start times and durations live in parallel
+    NumPy arrays, so one ``step(now_ms)`` computes every mover's position
+    in a couple of vectorized expressions.  ``MovePhysics.position_at(now_ms)``
+    reads its row back instead of computing its own, so an observer that
+    needs every mover at one instant (the renderer) pays for a single
+    batched step.  The game loop itself does not step it: the scheduler
+    already wakes each mover exactly when it enters a new cell or arrives.
+
+    Slots are kept dense: removing a mover moves the last row into its place.
+    """
+
+    def __init__(self, board: Board, capacity: int = 32):
+        self.board = board
+        self._cell_m = np.array([board.cell_W_m, board.cell_H_m], dtype=float)
+        self._n = 0
+        self._owners: List[Piece] = []
+        self._physics: List[MovePhysics] = []
+        self._slot_of: Dict[Piece, int] = {}
+        self.now_ms: Optional[int] = None
+        # start times are stored relative to this (Python int) epoch so the
+        # float64 column stays exact whatever the clock's origin and scale
+        self._epoch: Optional[int] = None
+        self._alloc(capacity)
+
+    def _alloc(self, capacity: int):
+        def grow(arr, shape, dtype):
+            new = np.zeros(shape, dtype=dtype)
+            if arr is not None:
+                new[:self._n] = arr[:self._n]
+            return new
+
+        get = lambda name: getattr(self, name, None)
+        self._start = grow(get("_start"), (capacity, 2), float)
+        self._velocity = grow(get("_velocity"), (capacity, 2), float)
+        self._t0 = grow(get("_t0"), capacity, float)
+        self._duration_s = grow(get("_duration_s"), capacity, float)
+        self._pos = grow(get("_pos"), (capacity, 2), float)
+        self._capacity = capacity
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __contains__(self, piece: Piece) -> bool:
+        return piece in self._slot_of
+
+    # ------------------------------------------------------------------
+    def add(self, piece: Piece):
+        """Track (or re-read, after a new move command) *piece*'s move physics."""
+        phys: MovePhysics = piece.state.physics
+        slot = self._slot_of.get(piece)
+        if slot is None:
+            if self._n == self._capacity:
+                self._alloc(self._capacity * 2)
+            slot = self._n
+            self._n += 1
+            self._owners.append(piece)
+            self._physics.append(phys)
+            self._slot_of[piece] = slot
+        elif self._physics[slot] is not phys:
+            self._physics[slot]._registry = None
+            self._physics[slot] = phys
+
+        self._start[slot] = phys._start_pos
+        self._velocity[slot] = phys._velocity
+        if self._epoch is None:
+            self._epoch = phys._start_ms
+        self._t0[slot] = phys._start_ms - self._epoch
+        self._duration_s[slot] = phys._duration_s
+        if self.now_ms is not None:
+            elapsed_s = min(max((self.now_ms - phys._start_ms) / 1000, 0.0), phys._duration_s)
+            self._pos[slot] = self._start[slot] + self._velocity[slot] * elapsed_s
+        phys._registry, phys._slot = self, slot
+
+    def discard(self, piece: Piece):
+        slot = self._slot_of.pop(piece, None)
+        if slot is None:
+            return
+        # the piece has usually left its move state already – release that physics
+        phys = self._physics[slot]
+        phys._registry, phys._slot = None, -1
+
+        last = self._n - 1
+        if slot != last:
+            for arr in (self._start, self._velocity, self._t0, self._duration_s, self._pos):
+                arr[slot] = arr[last]
+            moved = self._owners[slot] = self._owners[last]
+            self._physics[slot] = self._physics[last]
+            self._physics[slot]._slot = slot
+            self._slot_of[moved] = slot
+        self._owners.pop()
+        self._physics.pop()
+        self._n = last
+
+    def position(self, slot: int) -> np.ndarray:
+        return self._pos[slot]
+
+    # ------------------------------------------------------------------
+    def step(self, now_ms: int):
+        """Compute every mover's position at *now_ms*."""
+        self.now_ms = now_ms
+        n = self._n
+        if not n:
+            return
+        elapsed_s = ((now_ms - self._epoch) - self._t0[:n]) / 1000
+        pos = self._pos[:n]
+        np.multiply(self._velocity[:n], np.clip(elapsed_s, 0.0, self._duration_s[:n])[:, None], out=pos)
+        pos += self._start[:n]
@@ -1,11 +1,21 @@
 # Moves.py
 from __future__ import annotations
 import pathlib
-from typing import List, Tuple
+from typing import Dict, List, Tuple
 import logging
 
-_CAPTURE = 1  # tag flag
-_NON_CAPTURE = 0
+from Piece import color_code, descriptor_of
+
+logger = logging.getLogger(__name__)
+
+
+def _between(src_cell, dst_cell) -> Tuple[Tuple[int, int], ...]:
+    """The cells strictly between *src* and *dst* (same stepping as the old path walk)."""
+    dr = dst_cell[0] - src_cell[0]
+    dc = dst_cell[1] - src_cell[1]
+    steps = max(abs(dr), abs(dc))
+    return tuple((src_cell[0] + int(i * dr / steps), src_cell[1] + int(i * dc / steps))
+                 for i in range(1, steps))
 
 
 class Moves:
@@ -14,6 +24,13 @@ class Moves:
         dr,dc               # can both capture and not capture
         dr,dc:non_capture   # non-capture move only
         dr,dc:capture       # capture move only (e.g. pawn diagonal)
+
+    On first use the table is compiled against ``dims`` = (rows, cols) into
+    bitboards (Python ints, bit ``r * cols + c``): per source cell, one
+    destination mask per tag plus the mask of cells each move passes over.
+    Validation against an ``OccupancyIndex`` of the same dims is then a
+    handful of ``&``/``|`` on its bitboards; a plain ``{cell: [pieces]}``
+    dict is probed at the destination and the cells passed over only.
     """
 
     def __init__(self, moves_file: pathlib.Path, dims: Tuple[int, int]):
@@ -25,6 +42,7 @@ class Moves:
         """
         self.dims = dims
         self.moves = {}  # (dr, dc) -> tag
+        self._compiled = None
 
         if not moves_file.exists():
             return
@@ -48,33 +66,83 @@ class Moves:
 
                 self.moves[(dr, dc)] = tag
 
-    def _load_moves(self, fp: pathlib.Path) -> List[Tuple[int, int, int]]:
-        moves: List[Tuple[int, int, int]] = []
-        with open(fp, encoding="utf-8") as f:
-            for line in f:
-                if line.strip() and not line.lstrip().startswith("#"):
-                    moves.append(self._parse(line))
-        return moves
+    @classmethod
+    def from_table(cls, table: Dict[Tuple[int, int], str], dims: Tuple[int, int]) -> "Moves":
+        """Build from an already parsed ``{(dr, dc): tag}`` table (see AssetBundle)."""
+        mv = cls.__new__(cls)
+        mv.dims = dims
+        mv.moves = dict(table)
+        mv._compiled = None
+        return mv
+
+    # ------------------------------------------------------------------
+    # Bitboards
+    # ------------------------------------------------------------------
+    def _compile(self):
+        """Per source cell: ``(any, capture, non_capture)`` destination masks and
+        ``{dst_cell: (tag, dst_bit, between_bits, between_cells)}`` for every
+        on-board destination."""
+        rows, cols = self.dims
+        targets, rays = {}, {}
+        for r in range(rows):
+            for c in range(cols):
+                masks = {"": 0, "capture": 0, "non_capture": 0}
+                ray = {}
+                for (dr, dc), tag in self.moves.items():
+                    tr, tc = r + dr, c + dc
+                    if not (0 <= tr < rows and 0 <= tc < cols) or tag not in masks:
+                        continue
+                    bit = 1 << (tr * cols + tc)
+                    masks[tag] |= bit
+                    path = _between((r, c), (tr, tc))
+                    between = 0
+                    for pr, pc in path:
+                        between |= 1 << (pr * cols + pc)
+                    ray[(tr, tc)] = (tag, bit, between, path)
+                targets[(r, c)] = (masks[""], masks["capture"], masks["non_capture"])
+                rays[(r, c)] = ray
+        self._compiled = (targets, rays)
+        return self._compiled
+
+    def occupancy_bits(self, cell2piece, my_color) -> Tuple[int, int]:
+        """``(occupied, opponents)`` bitboards for *cell2piece*.
+
+        Uses the engine's incrementally maintained bitboards when handed an
+        ``OccupancyIndex`` for the same board, otherwise builds them from a
+        plain ``{cell: [pieces]}`` dict.
+        """
+        bitboards = getattr(cell2piece, "bitboards", None)
+        if bitboards is not None and cell2piece.dims == self.dims:
+            return bitboards(my_color)
+        my_color = color_code(my_color)
+        rows, cols = self.dims
+        occupied = opponents = 0
+        for (r, c), plist in (cell2piece or {}).items():
+            if not plist or not (0 <= r < rows and 0 <= c < cols):
+                continue
+            bit = 1 << (r * cols + c)
+            occupied |= bit
+            if any(descriptor_of(p).color != my_color for p in plist):
+                opponents |= bit
+        return occupied, opponents
 
     @staticmethod
-    def _parse(s: str) -> Tuple[int, int, int]:
-        if ":" not in s:
-            # Simple format: "dr,dc" - can both capture and non-capture
-            dr, dc = [int(x) for x in s.split(",")]
-            return dr, dc, -1  # -1 means can both capture and non-capture
+    def _dst_allowed(tag: str, dst_bit: int, occupied: int, opponents: int) -> bool:
+        if tag == "":           # move to an empty cell or capture an opponent
+            return not occupied & dst_bit or bool(opponents & dst_bit)
+        if tag == "capture":
+            return bool(opponents & dst_bit)
+        return not occupied & dst_bit   # non_capture
 
-        # Format with tag: "dr,dc:tag"
-        coords, tag_str = s.split(":", 1)
-        dr, dc = [int(x) for x in coords.split(",")]
-
-        if tag_str.strip() == "capture":
-            tag = _CAPTURE
-        elif tag_str.strip() == "non_capture":
-            tag = _NON_CAPTURE
-        else:  # can both capture and not capture
-            tag = -1
-
-        return dr, dc, tag
+    @staticmethod
+    def _dst_pieces_allowed(tag: str, dst_pieces, my_color) -> bool:
+        """``_dst_allowed`` for the list of pieces standing on the destination."""
+        if not dst_pieces:
+            return tag != "capture"
+        if tag == "non_capture":
+            return False
+        my_color = color_code(my_color)
+        return any(descriptor_of(p).color != my_color for p in dst_pieces)
 
     def is_dst_cell_valid(self, dr, dc, dst_pieces = None, my_color = None, dst_has_piece: bool | None = None):
         if dst_has_piece is not None and dst_pieces is None:
@@ -83,6 +151,7 @@ class Moves:
             dst_pieces = [Dummy()] if dst_has_piece else None
             # tests don't care about colour; default if missing
             my_color   = my_color or "W"
+        my_color = color_code(my_color)
 
         # unknown relative move
         if (dr, dc) not in self.moves:
@@ -95,10 +164,10 @@ class Moves:
             if dst_pieces is None:
                 return True  # Empty square - allowed
             # Check if there are any opponent pieces at destination
-            return len([p for p in dst_pieces if p.id[1] != my_color]) > 0
+            return any(descriptor_of(p).color != my_color for p in dst_pieces)
 
         if move_tag == "capture":
-            return dst_pieces is not None and len([p for p in dst_pieces if p.id[1] != my_color]) > 0
+            return dst_pieces is not None and any(descriptor_of(p).color != my_color for p in dst_pieces)
 
         if move_tag == "non_capture":
             return dst_pieces is None
@@ -106,53 +175,47 @@ class Moves:
         return False  # Invalid tag
 
     def is_valid(self, src_cell, dst_cell, cell2piece, is_need_clear_path, my_color):
-        # Check board boundaries
-        if not (0 <= dst_cell[0] < self.dims[0] and 0 <= dst_cell[1] < self.dims[1]):
-            logging.debug(f"Move out of bounds: {dst_cell}")
+        # only on-board sources and destinations are compiled, so this is the bounds check too
+        rays = (self._compiled or self._compile())[1].get(tuple(src_cell))
+        entry = rays.get(tuple(dst_cell)) if rays is not None else None
+        if entry is None:
+            logger.debug("Invalid destination: %s → %s", src_cell, dst_cell)
             return False
 
-        dr, dc = dst_cell[0] - src_cell[0], dst_cell[1] - src_cell[1]
-        if not self.is_dst_cell_valid(dr, dc, cell2piece.get(dst_cell), my_color):
-            logging.debug(f"Invalid destination: {src_cell} → {dst_cell}")
+        tag, dst_bit, between, path = entry
+        bitboards = getattr(cell2piece, "bitboards", None)
+        if bitboards is not None and cell2piece.dims == self.dims:
+            occupied, opponents = bitboards(my_color)
+            dst_ok = self._dst_allowed(tag, dst_bit, occupied, opponents)
+            path_clear = not between & occupied
+        else:
+            # plain dict: building its bitboards costs more than the few lookups needed
+            cell2piece = cell2piece or {}
+            dst_ok = self._dst_pieces_allowed(tag, cell2piece.get(tuple(dst_cell)), my_color)
+            path_clear = not any(cell2piece.get(cell) for cell in path)
+        if not dst_ok:
+            logger.debug("Invalid destination: %s → %s", src_cell, dst_cell)
             return False
 
-        logging.debug(f"Checking path: {src_cell} → {dst_cell}, need_clear_path={is_need_clear_path}")
-        
         # Only check path if piece needs clear path (not for knights)
-        if is_need_clear_path and not self._path_is_clear(src_cell, dst_cell, cell2piece, my_color):
-            logging.debug(f"Path not clear: {src_cell} → {dst_cell}")
+        if is_need_clear_path and not path_clear:
+            logger.debug("Path not clear: %s → %s", src_cell, dst_cell)
             return False
 
-        logging.debug(f"Move is valid: {src_cell} → {dst_cell}")
         return True
 
-    def _path_is_clear(self, src_cell, dst_cell, cell2piece_all, my_color):
-        """Check if there are any pieces blocking the path between src and dst."""
-        dr = dst_cell[0] - src_cell[0]
-        dc = dst_cell[1] - src_cell[1]
-        
-        # Check all pieces in the path, not just same color pieces
-        cell2piece = cell2piece_all
-
-        # Don't check the destination cell - we want to allow captures
-        # if dst_cell in cell2piece:
-        #     print(f"Path not clear at destination {dst_cell}")
-        #     return False
-
-        # Get unit vector for movement direction
-        steps = max(abs(dr), abs(dc))
-        if steps == 0:
-            return True
-            
-        step_r = dr / steps
-        step_c = dc / steps
-
-        # Check each cell along the path (excluding src and dst)
-        for i in range(1, steps):
-            r = src_cell[0] + int(i * step_r)
-            c = src_cell[1] + int(i * step_c)
-            if (r, c) in cell2piece:
-                print(f"Path not clear at {(r,c)}")
-                return False
+    def destinations(self, src_cell, cell2piece, is_need_clear_path, my_color) -> List[Tuple[int, int]]:
+        """Every cell ``is_valid`` would accept from *src_cell*, in one pass over the move set."""
+        targets, rays = self._compiled or self._compile()
+        src_cell = tuple(src_cell)
+        masks = targets.get(src_cell)
+        if masks is None:
+            return []
+        any_mask, capture_mask, non_capture_mask = masks
+        occupied, opponents = self.occupancy_bits(cell2piece, my_color)
+        allowed = ((any_mask & (~occupied | opponents))
+                   | (capture_mask & opponents)
+                   | (non_capture_mask & ~occupied))
+        return sorted(dst for dst, (_, bit, between, _) in rays[src_cell].items()
+                      if bit & allowed and not (is_need_clear_path and between & occupied))
 
-        return True
@@ -0,0 +1,141 @@
+# Occupancy.py
+from __future__ import annotations
+
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from Piece import Piece, color_code
+
+Cell = Tuple[int, int]
+
+
+class OccupancyIndex(Mapping):
+    """Which pieces stand on which cell, maintained incrementally.
+
+    Reads like the old ``cell -> [pieces]`` dict (``index[cell]``,
+    ``index.get(cell)``, ``cell in index``) so it can be handed straight to
+    ``Moves.is_valid``; cells never hold an empty list.  Writers call
+    ``place``/``remove`` only when a piece actually changes cell, and every
+    change bumps ``version`` so caches derived from the occupancy can tell
+    when they are stale.  ``crowded`` holds the cells with two or more
+    pieces – the only ones collision resolution has to look at.
+
+    Given the board ``dims`` it also keeps one occupancy bitboard per color
+    (bit ``r * cols + c``), which ``Moves`` uses for legality checks.
+    """
+
+    def __init__(self, pieces: Iterable[Piece] = (), dims: Optional[Tuple[int, int]] = None):
+        self.dims = dims
+        self._by_cell: Dict[Cell, List[Piece]] = {}
+        self._cell_of: Dict[Piece, Cell] = {}
+        self._color_bits: Dict[int, int] = {}       # color code -> bitboard
+        self._opponent_bits: Dict[object, int] = {}  # per asking color, cleared on change
+        self.occupied_bits = 0
+        self.crowded: Set[Cell] = set()
+        self.version = 0
+        self.rebuild(pieces)
+
+    # ---------------- Mapping protocol (by cell) ----------------------
+    def __getitem__(self, cell: Cell) -> List[Piece]:
+        return self._by_cell[cell]
+
+    def __iter__(self) -> Iterator[Cell]:
+        return iter(self._by_cell)
+
+    def __len__(self) -> int:
+        return len(self._by_cell)
+
+    def __contains__(self, cell) -> bool:
+        return cell in self._by_cell
+
+    def get(self, cell: Cell, default=None):
+        return self._by_cell.get(cell, default)
+
+    # ---------------- reads -------------------------------------------
+    def pieces_at(self, cell: Cell) -> Tuple[Piece, ...]:
+        return tuple(self._by_cell.get(cell, ()))
+
+    def cell_of(self, piece: Piece) -> Optional[Cell]:
+        return self._cell_of.get(piece)
+
+    def bitboards(self, my_color) -> Tuple[int, int]:
+        """``(occupied, opponents)`` – cells holding any piece / a piece not of *my_color*."""
+        opponents = self._opponent_bits.get(my_color)
+        if opponents is None:
+            opponents = 0
+            code = color_code(my_color)
+            for color, bits in self._color_bits.items():
+                if color != code:
+                    opponents |= bits
+            self._opponent_bits[my_color] = opponents
+        return self.occupied_bits, opponents
+
+    def _refresh_bits(self, cell: Cell):
+        if self.dims is None:
+            return
+        rows, cols = self.dims
+        if not (0 <= cell[0] < rows and 0 <= cell[1] < cols):
+            return
+        bit = 1 << (cell[0] * cols + cell[1])
+        self._opponent_bits.clear()
+        for color in self._color_bits:
+            self._color_bits[color] &= ~bit
+        self.occupied_bits &= ~bit
+        for p in self._by_cell.get(cell, ()):
+            color = p.desc.color
+            self._color_bits[color] = self._color_bits.get(color, 0) | bit
+            self.occupied_bits |= bit
+
+    # ---------------- writes ------------------------------------------
+    def _detach(self, piece: Piece, cell: Cell):
+        plist = self._by_cell[cell]
+        plist.remove(piece)
+        if not plist:
+            del self._by_cell[cell]
+        if len(plist) < 2:
+            self.crowded.discard(cell)
+
+    def place(self, piece: Piece, cell: Cell) -> bool:
+        """Put *piece* on *cell* (adding it if unknown). Returns True if anything changed."""
+        old = self._cell_of.get(piece)
+        if old == cell:
+            return False
+        if old is not None:
+            self._detach(piece, old)
+            self._refresh_bits(old)
+        self._cell_of[piece] = cell
+        plist = self._by_cell.setdefault(cell, [])
+        plist.append(piece)
+        if len(plist) > 1:
+            self.crowded.add(cell)
+        self._refresh_bits(cell)
+        self.version += 1
+        return True
+
+    def remove(self, piece: Piece) -> bool:
+        cell = self._cell_of.pop(piece, None)
+        if cell is None:
+            return False
+        self._detach(piece, cell)
+        self._refresh_bits(cell)
+        self.version += 1
+        return True
+
+    def rebuild(self, pieces: Iterable[Piece]):
+        """Full resync from the pieces' physics (start-up and tests)."""
+        self._by_cell.clear()
+        self._cell_of.clear()
+        self.crowded.clear()
+        self._color_bits.clear()
+        self._opponent_bits.clear()
+        self.occupied_bits = 0
+        for p in pieces:
+            cell = p.current_cell()
+            self._cell_of[p] = cell
+            plist = self._by_cell.setdefault(cell, [])
+            plist.append(p)
+            if len(plist) > 1:
+                self.crowded.add(cell)
+        for cell in self._by_cell:
+            self._refresh_bits(cell)
+        self.version += 1
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Tuple, Optional
+from typing import List, Tuple, Optional
 from abc import ABC, abstractmethod
 import math, logging
 
@@ -42,15 +42,36 @@ class BasePhysics(ABC):  # Interface/base class
 
     def get_pos_pix(self) -> Tuple[int, int]:
         """Current position converted to pixels."""
-        return self.board.m_to_pix(self._curr_pos_m)
+        return self.board.m_to_pix(self.get_pos_m())
 
     def get_curr_cell(self) -> Tuple[int, int]:
         """Return current board cell `(row, col)` derived from position."""
-        return self.board.m_to_cell(self._curr_pos_m)
+        return self.board.m_to_cell(self.get_pos_m())
+
+    # ---------------- analytic queries ----------------------------------
+    def position_at(self, t_ms: int) -> Tuple[float, float]:
+        """Position in metres at game time *t_ms*, without advancing anything."""
+        return self._curr_pos_m
+
+    def cell_at(self, t_ms: int) -> Tuple[int, int]:
+        return self.board.m_to_cell(self.position_at(t_ms))
+
+    def pix_at(self, t_ms: int) -> Tuple[int, int]:
+        return self.board.m_to_pix(self.position_at(t_ms))
+
+    def cell_intervals(self, t0_ms: int, t1_ms: int) -> List[Tuple[Tuple[int, int], int, int]]:
+        """``(cell, enter_ms, exit_ms)`` covering ``[t0_ms, t1_ms]`` – one interval for static pieces."""
+        return [(self.cell_at(t0_ms), t0_ms, t1_ms)]
 
     def get_start_ms(self) -> int:
         return self._start_ms
 
+    def get_start_cell(self) -> Optional[Tuple[int, int]]:
+        return self._start_cell
+
+    def get_end_cell(self) -> Optional[Tuple[int, int]]:
+        return self._end_cell
+
     def can_be_captured(self) -> bool: return True
 
     def can_capture(self) -> bool:     return True
@@ -60,6 +81,16 @@ class BasePhysics(ABC):  # Interface/base class
     def is_need_clear_path(self) -> bool:
         return self.do_i_need_clear_path
 
+    # ---------------- scheduling hints ----------------------------------
+    def is_moving(self) -> bool:
+        """True while the position changes continuously."""
+        return False
+
+    def next_deadline_ms(self) -> Optional[float]:
+        """Game time at which ``update`` next has something to do – emit a
+        command or, for moves, enter a new cell – or None if never."""
+        return None
+
 
 class IdlePhysics(BasePhysics):
 
@@ -87,30 +118,94 @@ class MovePhysics(BasePhysics):
             raise ValueError("_speed_m_s is 0")
         if self._speed_m_s < 0:
             self._speed_m_s = abs(self._speed_m_s)
+        # set by MoverRegistry while this move is tracked in its arrays
+        self._registry = None
+        self._slot = -1
+        self._last_ms = 0
 
     def reset(self, cmd: Command):
         self._start_cell = cmd.params[0]
         self._end_cell = cmd.params[1]
         self._curr_pos_m = self.board.cell_to_m(self._start_cell)
-        self._start_ms = cmd.timestamp
-        start_pos = np.array(self.board.cell_to_m(self._start_cell))
-        end_pos = np.array(self.board.cell_to_m(self._end_cell))
-        self._movement_vector = end_pos - start_pos
+        self._start_ms = self._last_ms = cmd.timestamp
+        self._start_pos = np.array(self.board.cell_to_m(self._start_cell), dtype=float)
+        end_pos = np.array(self.board.cell_to_m(self._end_cell), dtype=float)
+        self._movement_vector = end_pos - self._start_pos
         self._movement_vector_length = math.hypot(*self._movement_vector)
         self._movement_vector = self._movement_vector / self._movement_vector_length
+        self._velocity = self._movement_vector * self._speed_m_s
         self._duration_s = self._movement_vector_length / self._speed_m_s
 
+    def position_at(self, t_ms: int):
+        reg = self._registry
+        if reg is not None and reg.now_ms == t_ms:
+            # already computed in the vectorized step – copied, the registry row moves on
+            return reg.position(self._slot).copy()
+        seconds = min(max((t_ms - self._start_ms) / 1000, 0.0), self._duration_s)
+        return self._start_pos + self._velocity * seconds
+
     def update(self, now_ms: int):
         seconds_passed = (now_ms - self._start_ms) / 1000
-        self._curr_pos_m = np.array(
-            self.board.cell_to_m(self._start_cell)) + self._movement_vector * seconds_passed * self._speed_m_s
+        self._curr_pos_m = self.position_at(now_ms)
+        self._last_ms = now_ms
 
         if seconds_passed >= self._duration_s:
             return Command(now_ms, None, "done", [self._end_cell])
 
         return None
 
+    def is_moving(self) -> bool:
+        return True
+
+    def arrival_ms(self) -> float:
+        return self._start_ms + self._duration_s * 1000
+
+    def get_last_update_ms(self) -> int:
+        return self._last_ms
+
+    def _next_cell_change_ms(self, after_ms: int) -> Optional[int]:
+        """First whole ms after *after_ms* at which the piece is in another cell (None: not before arrival)."""
+        end_ms = self.arrival_ms()
+        row, col = cell = self.cell_at(after_ms)
+        best = end_ms
+        # cells change halfway between cell origins (Board.m_to_cell rounds)
+        for axis, k, size in ((0, col, self.board.cell_W_m), (1, row, self.board.cell_H_m)):
+            v = self._velocity[axis]
+            if v == 0:
+                continue
+            boundary = (k + 0.5 if v > 0 else k - 0.5) * size
+            best = min(best, self._start_ms + (boundary - self._start_pos[axis]) / v * 1000)
+        t = max(math.ceil(best), after_ms + 1)
+        # exact-boundary ties round back into the old cell – step past them
+        for _ in range(3):
+            if t >= end_ms:
+                return None
+            if self.cell_at(t) != cell:
+                return t
+            t += 1
+        return t if t < end_ms else None
+
+    def next_deadline_ms(self) -> Optional[float]:
+        """First integer ms after the last update at which the piece is in
+        another cell, or the arrival time if it stays put until then."""
+        t = self._next_cell_change_ms(self._last_ms)
+        return self.arrival_ms() if t is None else t
+
+    def cell_intervals(self, t0_ms: int, t1_ms: int):
+        out, t = [], t0_ms
+        while True:
+            cell = self.cell_at(t)
+            nxt = self._next_cell_change_ms(t)
+            if nxt is None or nxt >= t1_ms:
+                out.append((cell, t, t1_ms))
+                return out
+            out.append((cell, t, nxt))
+            t = nxt
+
     def get_pos_m(self):
+        """Position as of the last ``update`` – exact for the cell, since the
+        engine updates a mover whenever it enters a new one.  Use
+        ``position_at`` for a pixel-accurate position at an arbitrary time."""
         return self._curr_pos_m
 
     def get_pos_pix(self):
@@ -134,6 +229,9 @@ class StaticTemporaryPhysics(BasePhysics):
 
         return None
 
+    def next_deadline_ms(self) -> Optional[float]:
+        return self._start_ms + self.duration_s * 1000
+
 
 class JumpPhysics(StaticTemporaryPhysics):
     def reset(self, cmd: Command):
@@ -1,35 +1,180 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
+
 from Board import Board
 from Command import Command
-from typing import Callable, Dict, List, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+# colors are small ints; ids and the UI keep using letters ("W", "B")
+_COLOR_CODES: Dict[str, int] = {"W": 0, "B": 1}
+_COLOR_LETTERS: List[str] = ["W", "B"]
+
+
+def color_code(color) -> int:
+    """Small-int code for a color given as a letter (or already as a code)."""
+    if type(color) is int:
+        return color
+    code = _COLOR_CODES.get(color)
+    if code is None:
+        code = _COLOR_CODES[color] = len(_COLOR_LETTERS)
+        _COLOR_LETTERS.append(color)
+    return code
+
+
+@dataclass(frozen=True)
+class PieceDescriptor:
+    """What kind of piece this is, decided once when the piece is created.
+
+    Hot paths branch on these fields instead of slicing the id string.
+    """
+    ROYAL = 1               # losing every royal piece loses the game
+    AIRBORNE_MOVE = 2       # in the air while moving: neither captures nor is captured
+
+    color: int
+    kind: str
+    flags: int = 0
+
+    @classmethod
+    def from_id(cls, piece_id: str, royal: Optional[bool] = None,
+                airborne_while_moving: Optional[bool] = None) -> "PieceDescriptor":
+        """Defaults follow the id convention (``"KW_..."``: kind K, color W);
+        kings are royal and knights jump over the board when they move."""
+        kind = piece_id[:1]
+        if royal is None:
+            royal = kind == "K"
+        if airborne_while_moving is None:
+            airborne_while_moving = kind == "N"
+        flags = (cls.ROYAL if royal else 0) | (cls.AIRBORNE_MOVE if airborne_while_moving else 0)
+        return cls(color_code(piece_id[1:2]), kind, flags)
+
+    @property
+    def color_letter(self) -> str:
+        return _COLOR_LETTERS[self.color]
+
+    @property
+    def royal(self) -> bool:
+        return bool(self.flags & self.ROYAL)
+
+    @property
+    def airborne_while_moving(self) -> bool:
+        return bool(self.flags & self.AIRBORNE_MOVE)
+
+
+def descriptor_of(piece) -> PieceDescriptor:
+    """``piece.desc``, or one derived from the id for bare stand-ins that lack it."""
+    desc = getattr(piece, "desc", None)
+    return desc if desc is not None else PieceDescriptor.from_id(piece.id)
+
+
+@dataclass(frozen=True)
+class PieceRuntime:
+    """What sets one piece apart from another of its type at an instant:
+    enough to snapshot a piece and ``restore`` it later.  The piece itself
+    still owns one State/Graphics/Physics object per state – only the parsed
+    configs, ``Moves`` tables, transitions and decoded frames are shared (see
+    ``PieceFactory.PieceTemplate``)."""
+    state: str
+    start_ms: int
+    start_cell: Tuple[int, int]
+    end_cell: Tuple[int, int]
+    anim_start_ms: int
+
+
+def _reachable(state) -> Dict[str, object]:
+    """Every state reachable from *state*, by name."""
+    seen, todo = {}, [state]
+    while todo:
+        st = todo.pop()
+        if st.name in seen:
+            continue
+        seen[st.name] = st
+        todo.extend(st.transitions.values())
+    return seen
 
 
 class Piece:
-    def __init__(self, piece_id: str, init_state):
+    def __init__(self, piece_id: str, init_state, desc: Optional[PieceDescriptor] = None,
+                 states: Optional[Dict[str, object]] = None):
         self.id = piece_id
+        self.desc = desc if desc is not None else PieceDescriptor.from_id(piece_id)
         self.state = init_state
-        
+        # every state of this piece by name (PieceFactory passes the whole
+        # template); restore() needs states the current one can no longer reach
+        self._all_states: Optional[Dict[str, object]] = dict(states) if states is not None else None
+        self._init_state = init_state
+        # called with the piece whenever its state (re)starts – the game's
+        # scheduler uses it to recompute when this piece next needs an update
+        self.on_state_change: Optional[Callable[[Piece], None]] = None
+
+    def _notify_state_change(self):
+        if self.on_state_change is not None:
+            self.on_state_change(self)
+
     def on_command(self, cmd: Command, cell2piece: Dict[Tuple[int, int], List[Piece]]):
         """Process a command and potentially transition to a new state."""
-        my_color = self.id[1]
+        my_color = self.desc.color
+        old_state, old_start = self.state, self.state.physics.get_start_ms()
         self.state = self.state.on_command(cmd, cell2piece, my_color)
+        if self.state is not old_state or self.state.physics.get_start_ms() != old_start:
+            self._notify_state_change()
 
     def reset(self, start_ms: int):
         cell = self.current_cell()
         self.state.reset(Command(start_ms, self.id, "idle", [cell]))
+        self._notify_state_change()
 
     def update(self, now_ms: int):
+        old_state = self.state
         self.state = self.state.update(now_ms)
+        if self.state is not old_state:
+            self._notify_state_change()
+
+    # ────────────────────────────────────────────────────────────────────
+    # Runtime record – cheap game-state snapshots / clones
+    def snapshot(self) -> PieceRuntime:
+        phys = self.state.physics
+        return PieceRuntime(self.state.name, phys.get_start_ms(),
+                            phys.get_start_cell(), phys.get_end_cell(),
+                            self.state.graphics.start_ms)
+
+    @property
+    def states(self) -> Dict[str, object]:
+        """Every state of this piece, by name."""
+        if self._all_states is None:
+            # built without a template: everything reachable from the first state
+            self._all_states = _reachable(self._init_state)
+        return self._all_states
+
+    def restore(self, rec: PieceRuntime):
+        """Put the piece back into the state captured by ``snapshot``."""
+        st = self.states[rec.state]
+        st.physics.reset(Command(rec.start_ms, self.id, rec.state, [rec.start_cell, rec.end_cell]))
+        st.graphics.reset(Command(rec.anim_start_ms, self.id, rec.state, []))
+        self.state = st
+        self._notify_state_change()
 
     def is_movement_blocker(self) -> bool:
         return self.state.physics.is_movement_blocker()
 
+    def sprite_pos(self, now_ms: Optional[int] = None):
+        """Return ``(x, y, sprite)`` – where and what this piece draws right now.
+
+        The engine only updates pieces at their deadlines, so when *now_ms*
+        is given the animation and position are evaluated for that instant.
+        """
+        if now_ms is None:
+            x, y = self.state.physics.get_pos_pix()
+        else:
+            self.state.graphics.update(now_ms)
+            x, y = self.state.physics.pix_at(now_ms)
+        return x, y, self.state.graphics.get_img()
+
     def draw_on_board(self, board, now_ms: int):
-        x, y = self.state.physics.get_pos_pix()
+        x, y, sprite = self.sprite_pos(now_ms)
         # x += board.offset_x  
         # y += board.offset_y  
-        sprite = self.state.graphics.get_img()
         sprite.draw_on(board.img, x, y)
 
     # ────────────────────────────────────────────────────────────────────
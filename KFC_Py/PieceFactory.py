@@ -1,16 +1,36 @@
 # PieceFactory.py
 from __future__ import annotations
 import csv, json, pathlib
+from dataclasses import dataclass
 from plistlib import InvalidFileException
-from typing import Dict, Tuple
+from typing import Dict, Optional, Tuple
 
 from Board import Board
 from Command import Command
 from GraphicsFactory import GraphicsFactory
 from Moves import Moves
 from PhysicsFactory import PhysicsFactory
-from Piece import Piece
+from Piece import Piece, PieceDescriptor
 from State import State
+from img import Img
+
+
+@dataclass(frozen=True)
+class StateTemplate:
+    """Immutable, shareable part of one state of a piece type."""
+    name: str
+    cfg: dict
+    moves: Optional[Moves]
+    sprites_dir: pathlib.Path
+    frames: Optional[tuple[Img, ...]] = None  # pre-decoded (bundle); else GraphicsFactory's cache
+
+
+@dataclass(frozen=True)
+class PieceTemplate:
+    """Everything two pieces of the same type have in common."""
+    states: Dict[str, StateTemplate]
+    transitions: Dict[str, Dict[str, str]]
+    descriptor: PieceDescriptor
 
 
 class PieceFactory:
@@ -18,12 +38,17 @@ class PieceFactory:
                  board: Board,
                  pieces_root,
                  graphics_factory=None,
-                 physics_factory=None):
+                 physics_factory=None,
+                 bundle=None):
 
         self.board = board
         self.graphics_factory = graphics_factory or GraphicsFactory()
         self.physics_factory = physics_factory or PhysicsFactory(board)
         self._pieces_root = pieces_root
+        # optional AssetBundle – when it knows a piece type, no file is touched
+        self._bundle = bundle
+        # piece type -> parsed configs / shared Moves / transitions, loaded once
+        self._templates: Dict[str, PieceTemplate] = {}
 
     # ──────────────────────────────────────────────────────────────
     @staticmethod
@@ -42,12 +67,47 @@ class PieceFactory:
         return _global_trans
 
     # ──────────────────────────────────────────────────────────────
-    def _build_state_machine(self, piece_dir: pathlib.Path) -> State:
-        board_size = (self.board.W_cells, self.board.H_cells)
-        cell_px = (self.board.cell_W_pix, self.board.cell_H_pix)
-        _global_trans = self._load_master_csv(piece_dir / "states")
+    def _make_state(self, name: str, cfg: dict, moves: Moves | None, graphics) -> State:
+        physics_cfg = cfg.get("physics", {})
+        physics = self.physics_factory.create((0, 0), name, physics_cfg)
+        physics.do_i_need_clear_path = physics_cfg.get("need_clear_path", True)  # Read from physics config
 
-        states: Dict[str, State] = {}
+        st = State(moves, graphics, physics)
+        st.name = name
+        return st
+
+    @staticmethod
+    def _wire_transitions(states: Dict[str, State], transitions: dict[str, dict[str, str]]) -> State:
+        # apply master CSV overrides
+        for frm, ev_map in transitions.items():
+            src = states.get(frm)
+            if not src:
+                continue
+            for ev, nxt in ev_map.items():
+                dst = states.get(nxt)
+                if not dst:
+                    continue
+
+                src.set_transition(ev, dst)
+
+        # always start at idle
+        return states.get("idle")
+
+    # ──────────────────────────────────────────────────────────────
+    def template(self, piece_dir: pathlib.Path) -> PieceTemplate:
+        """Per-type template: parsed once, shared by every piece of that type."""
+        tpl = self._templates.get(piece_dir.name)
+        if tpl is None:
+            if self._bundle is not None and piece_dir.name in self._bundle:
+                tpl = self._load_template_from_bundle(piece_dir)
+            else:
+                tpl = self._load_template(piece_dir)
+            self._templates[piece_dir.name] = tpl
+        return tpl
+
+    def _load_template(self, piece_dir: pathlib.Path) -> PieceTemplate:
+        board_size = (self.board.H_cells, self.board.W_cells)   # (rows, cols)
+        states: Dict[str, StateTemplate] = {}
 
         # There is no longer a piece-wide fall-back. Each state must provide its own
         # `moves.txt`; if it does not, the state will have *no* legal moves.
@@ -62,37 +122,60 @@ class PieceFactory:
 
             moves_path = state_dir / "moves.txt"
             moves = Moves(moves_path, board_size) if moves_path.exists() else None
-            graphics = self.graphics_factory.load(state_dir / "sprites",
-                                                  cfg.get("graphics", {}), cell_px)
-            physics_cfg = cfg.get("physics", {})
-            physics = self.physics_factory.create((0, 0), name, physics_cfg)
-            physics.do_i_need_clear_path = physics_cfg.get("need_clear_path", True)  # Read from physics config
+            states[name] = StateTemplate(name, cfg, moves, state_dir / "sprites")
 
-            st = State(moves, graphics, physics)
-            st.name = name
-            states[name] = st
+        cfg_path = piece_dir / "config.json"
+        piece_cfg = json.loads(cfg_path.read_text()) if cfg_path.exists() else {}
+        return PieceTemplate(states, self._load_master_csv(piece_dir / "states"),
+                             self._descriptor(piece_dir.name, piece_cfg))
 
-        # apply master CSV overrides
-        for frm, ev_map in _global_trans.items():
-            src = states.get(frm)
-            if not src:
-                continue
-            for ev, nxt in ev_map.items():
-                dst = states.get(nxt)
-                if not dst:
-                    continue
+    def _load_template_from_bundle(self, piece_dir: pathlib.Path) -> PieceTemplate:
+        board_size = (self.board.H_cells, self.board.W_cells)   # (rows, cols)
+        cell_px = (self.board.cell_W_pix, self.board.cell_H_pix)
+        if tuple(self._bundle.cell_size) != cell_px:
+            raise ValueError(f"Bundle {self._bundle.path} was compiled for cells of "
+                             f"{self._bundle.cell_size}, board uses {cell_px}")
 
-                src.set_transition(ev, dst)
+        p_type = piece_dir.name
+        states: Dict[str, StateTemplate] = {}
+        for name, spec in self._bundle.states(p_type).items():
+            moves = Moves.from_table(spec["moves"], board_size) if spec["moves"] is not None else None
+            states[name] = StateTemplate(name, spec["config"], moves,
+                                         piece_dir / "states" / name / "sprites",
+                                         frames=self._bundle.frames(p_type, name))
 
-        # always start at idle
-        return states.get("idle")
+        return PieceTemplate(states, self._bundle.transitions(p_type),
+                             self._descriptor(p_type, self._bundle.piece_config(p_type)))
+
+    @staticmethod
+    def _descriptor(p_type: str, cfg: dict) -> PieceDescriptor:
+        """Kind, color and flags of a piece type.  Derived from the type name
+        ("KW", "NB", …); the optional ``<piece>/config.json`` (*cfg*) may
+        override the flags, e.g. ``{"royal": true, "airborne_while_moving": false}``."""
+        return PieceDescriptor.from_id(p_type, royal=cfg.get("royal"),
+                                       airborne_while_moving=cfg.get("airborne_while_moving"))
+
+    def _build_state_machine(self, piece_dir: pathlib.Path) -> Tuple[State, Dict[str, State]]:
+        """Fresh per-piece State, Graphics and Physics objects around the
+        shared template (these are not shared – physics and animation keep
+        their timing in them): the initial state and every state by name."""
+        tpl = self.template(piece_dir)
+        cell_px = (self.board.cell_W_pix, self.board.cell_H_pix)
+
+        states: Dict[str, State] = {}
+        for name, st in tpl.states.items():
+            graphics = self.graphics_factory.load(st.sprites_dir, st.cfg.get("graphics", {}),
+                                                  cell_px, frames=st.frames)
+            states[name] = self._make_state(name, st.cfg, st.moves, graphics)
+
+        return self._wire_transitions(states, tpl.transitions), states
 
     # ──────────────────────────────────────────────────────────────
     def create_piece(self, p_type: str, cell: Tuple[int, int]) -> Piece:
         p_dir = self._pieces_root / p_type
-        state = self._build_state_machine(p_dir)
+        state, states = self._build_state_machine(p_dir)
 
-        piece = Piece(f"{p_type}_{cell}", state)
+        piece = Piece(f"{p_type}_{cell}", state, desc=self.template(p_dir).descriptor, states=states)
         piece.state.reset(Command(0, piece.id, "idle", [cell]))
 
         return piece
@@ -1,23 +1,210 @@
 # PubSub.py
+import asyncio
+import collections
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# overflow policies of a QueuedSubscriber
+DROP_OLDEST = "drop_oldest"   # make room by discarding the oldest pending event
+COALESCE = "coalesce"         # a pending event with the same key is replaced by the newer one
+BLOCK = "block"               # the publisher waits for room – only for subscribers off the game loop
+
+
+class QueuedSubscriber:
+    """Delivers events to *callback* away from the publishing thread.
+
+    ``PubSub.publish`` only appends the event to this subscriber's bounded
+    queue; a worker thread (default), an asyncio *loop*, or whoever calls
+    ``drain`` runs the callback.  A slow or failing subscriber therefore
+    costs the game loop one append, and its exceptions are logged and
+    counted instead of propagating into the tick.
+
+    With ``COALESCE``, *key* maps an event's data to its coalescing key
+    (default: one key – only the latest pending event is kept).
+    """
+
+    def __init__(self, callback, maxsize: int = 256, overflow: str = DROP_OLDEST,
+                 key=None, loop: asyncio.AbstractEventLoop | None = None,
+                 start_thread: bool = True, name: str | None = None):
+        if overflow not in (DROP_OLDEST, COALESCE, BLOCK):
+            raise ValueError(f"unknown overflow policy {overflow!r}")
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.callback = callback
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.name = name or getattr(callback, "__qualname__", repr(callback))
+        self._key = key if key is not None else (lambda data: None)
+        self._pending = collections.deque()   # [key, data] items, oldest first
+        self._by_key = {}                     # COALESCE: key -> its pending item
+        self._cond = threading.Condition()
+        self._closed = False
+        self._loop = loop
+        self._drain_scheduled = False
+
+        # counters
+        self.published = self.delivered = self.dropped = self.coalesced = self.errors = 0
+        self.high_water = 0
+
+        self._thread = None
+        if loop is None and start_thread:
+            self._thread = threading.Thread(target=self._run, name=f"pubsub-{self.name}", daemon=True)
+            self._thread.start()
+
+    @property
+    def depth(self) -> int:
+        return len(self._pending)
+
+    def stats(self) -> dict:
+        return {"depth": self.depth, "high_water": self.high_water, "published": self.published,
+                "delivered": self.delivered, "dropped": self.dropped,
+                "coalesced": self.coalesced, "errors": self.errors}
+
+    # ---------------- publisher side ----------------------------------
+    def __call__(self, data=None):
+        with self._cond:
+            if self._closed:
+                return
+            self.published += 1
+            key = self._key(data) if self.overflow == COALESCE else None
+            if self.overflow == COALESCE:
+                item = self._by_key.get(key)
+                if item is not None:
+                    item[1] = data
+                    self.coalesced += 1
+                    return
+            while len(self._pending) >= self.maxsize:
+                if self.overflow == BLOCK:
+                    self._cond.wait()
+                    if self._closed:
+                        return
+                    continue
+                old_key, _ = self._pending.popleft()
+                self._by_key.pop(old_key, None)
+                self.dropped += 1
+            item = [key, data]
+            self._pending.append(item)
+            if self.overflow == COALESCE:
+                self._by_key[key] = item
+            self.high_water = max(self.high_water, len(self._pending))
+            self._cond.notify_all()
+            schedule = self._loop is not None and not self._drain_scheduled
+            if schedule:
+                self._drain_scheduled = True
+        if schedule:
+            self._loop.call_soon_threadsafe(self._drain_in_loop)
+
+    # ---------------- consumer side -----------------------------------
+    def _take(self):
+        key, data = self._pending.popleft()
+        if self.overflow == COALESCE:
+            self._by_key.pop(key, None)
+        self._cond.notify_all()   # room for a blocked publisher
+        return data
+
+    def _deliver(self, data):
+        try:
+            result = self.callback(data)
+            if asyncio.iscoroutine(result):
+                if self._loop is None:
+                    asyncio.run(result)   # worker thread: run it to completion here
+                else:
+                    asyncio.ensure_future(result, loop=self._loop)
+        except Exception:
+            self.errors += 1
+            logger.exception("Subscriber %s failed", self.name)
+        else:
+            self.delivered += 1
+
+    def drain(self) -> int:
+        """Deliver every pending event on the calling thread; returns how many."""
+        n = 0
+        while True:
+            with self._cond:
+                if not self._pending:
+                    return n
+                data = self._take()
+            self._deliver(data)
+            n += 1
+
+    def _drain_in_loop(self):
+        with self._cond:
+            self._drain_scheduled = False
+        self.drain()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                data = self._take()
+            self._deliver(data)
+
+    def close(self, timeout: float | None = None):
+        """Stop accepting events; the worker delivers what is pending, then exits.
+
+        Waits up to *timeout* for it (``0``: don't wait)."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
 
 class PubSub:
-    _instance = None
+    """Event bus. Each match owns one, so games sharing a process never see
+    each other's events; ``pubsub`` below is only the default for code that
+    does not get one injected."""
 
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(PubSub, cls).__new__(cls)
-            cls._instance.subscribers = {}
-        return cls._instance
+    def __init__(self):
+        # event -> callbacks; tuples are replaced, never mutated, so a callback
+        # may (un)subscribe while the event is being published
+        self.subscribers = {}
 
     def subscribe(self, event_type: str, callback):
         """רישום לפעולה מסוימת"""
-        if event_type not in self.subscribers:
-            self.subscribers[event_type] = []
-        self.subscribers[event_type].append(callback)
+        self.subscribers[event_type] = self.subscribers.get(event_type, ()) + (callback,)
+
+    def unsubscribe(self, event_type: str, callback) -> bool:
+        """ביטול רישום; מחזיר False אם לא היה רשום"""
+        callbacks = self.subscribers.get(event_type, ())
+        if callback not in callbacks:
+            return False
+        i = callbacks.index(callback)
+        callbacks = callbacks[:i] + callbacks[i + 1:]
+        if callbacks:
+            self.subscribers[event_type] = callbacks
+        else:
+            del self.subscribers[event_type]
+        if isinstance(callback, QueuedSubscriber) and \
+                not any(callback in cbs for cbs in self.subscribers.values()):
+            callback.close(timeout=0)     # off the bus for good – let its worker finish and exit
+        return True
+
+    def subscribe_queued(self, event_type: str, callback, **options) -> QueuedSubscriber:
+        """Subscribe *callback* through its own bounded queue (see ``QueuedSubscriber``).
+
+        Returns the subscriber – its counters tell how far behind it is.
+        ``unsubscribe`` (or ``clear``) closes it once it is off the bus.
+        """
+        subscriber = QueuedSubscriber(callback, **options)
+        self.subscribe(event_type, subscriber)
+        return subscriber
+
+    def clear(self):
+        """Drop every subscriber (end of match); queued ones are closed."""
+        queued = {cb for cbs in self.subscribers.values() for cb in cbs if isinstance(cb, QueuedSubscriber)}
+        self.subscribers.clear()
+        for subscriber in queued:
+            subscriber.close(timeout=0)
 
     def publish(self, event_type: str, data=None):
         """שיגור הודעה לכל מי שמחכה לאירוע מסוים"""
-        for callback in self.subscribers.get(event_type, []):
+        for callback in self.subscribers.get(event_type, ()):
             callback(data)
 
-pubsub = PubSub()
\ No newline at end of file
+pubsub = PubSub()
@@ -0,0 +1,105 @@
+# Renderer.py
+from __future__ import annotations
+
+import logging
+from typing import Hashable, Iterable, List, Tuple
+
+import numpy as np
+
+from img import Img
+
+logger = logging.getLogger(__name__)
+
+Rect = Tuple[int, int, int, int]          # x1, y1, x2, y2 (exclusive)
+Decoration = Tuple[int, int, int, int, tuple]  # draw_rect(x1, y1, x2, y2, color)
+
+_RECT_PAD = 2  # draw_rect uses thickness 2, which bleeds one pixel outwards
+
+
+def _intersects(a: Rect, b: Rect) -> bool:
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+class DirtyRectRenderer:
+    """Keeps one persistent frame buffer and repaints only what changed.
+
+    Every tick the caller passes the sprites to show as
+    ``(key, x, y, Img)``.  A sprite is *dirty* when its position or frame
+    (compared by identity – frames are shared, immutable ``Img`` objects)
+    differs from the previous tick, or when it disappeared.  Only the dirty
+    rectangles – grown to cover every sprite that has to be redrawn – are
+    restored from the cached static background, and only those sprites are
+    redrawn, so an idle board costs almost
+    nothing per frame.
+    """
+
+    def __init__(self, background: Img):
+        self._background: np.ndarray = background.img
+        self.frame = background.copy()
+        self._drawn: dict[Hashable, tuple[Rect, Img]] = {}
+        self._decorations: List[Decoration] = []
+        self._full = True
+
+    def invalidate(self):
+        """Force the next ``render`` to restore and redraw the whole frame."""
+        self._full = True
+
+    def _restore(self, rect: Rect):
+        H, W = self._background.shape[:2]
+        x1, y1 = max(0, rect[0]), max(0, rect[1])
+        x2, y2 = min(W, rect[2]), min(H, rect[3])
+        if x1 < x2 and y1 < y2:
+            self.frame.img[y1:y2, x1:x2] = self._background[y1:y2, x1:x2]
+
+    def render(self,
+               sprites: Iterable[tuple[Hashable, int, int, Img]],
+               decorations: List[Decoration] = ()) -> Img:
+        current: dict[Hashable, tuple[Rect, Img]] = {}
+        for key, x, y, sprite in sprites:
+            h, w = sprite.img.shape[:2]
+            current[key] = ((x, y, x + w, y + h), sprite)
+
+        decorations = list(decorations)
+        if self._full:
+            self.frame.img[...] = self._background
+            dirty = None
+        else:
+            dirty = []
+            for key, (rect, sprite) in self._drawn.items():
+                now = current.get(key)
+                if now is None or now[0] != rect or now[1] is not sprite:
+                    dirty.append(rect)
+            for key, (rect, _) in current.items():
+                if self._drawn.get(key, (None, None))[0] != rect:
+                    dirty.append(rect)
+            if decorations != self._decorations:
+                dirty.extend((x1 - _RECT_PAD, y1 - _RECT_PAD, x2 + _RECT_PAD + 1, y2 + _RECT_PAD + 1)
+                             for x1, y1, x2, y2, _ in self._decorations)
+            # a sprite touching a restored area is redrawn whole, so its whole
+            # rect must be restored too – otherwise the part outside is blended
+            # twice.  Grow the dirty set until no redrawn sprite reaches past it.
+            redraw = set()
+            grown = True
+            while grown:
+                grown = False
+                for key, (rect, _) in current.items():
+                    if key not in redraw and any(_intersects(rect, d) for d in dirty):
+                        redraw.add(key)
+                        dirty.append(rect)
+                        grown = True
+            for rect in dirty:
+                self._restore(rect)
+
+        for key, (rect, sprite) in current.items():
+            if dirty is None or key in redraw:
+                sprite.draw_on(self.frame, rect[0], rect[1])
+
+        # outlines are opaque, so redrawing unchanged ones is idempotent
+        if dirty is None or dirty:
+            for x1, y1, x2, y2, color in decorations:
+                self.frame.draw_rect(x1, y1, x2, y2, color)
+
+        self._drawn = current
+        self._decorations = decorations
+        self._full = False
+        return self.frame
@@ -0,0 +1,66 @@
+# Royals.py
+from __future__ import annotations
+
+from typing import Callable, Dict, Iterable, Optional, Set
+
+from Piece import Piece, color_code
+
+COLOR_NAMES = {color_code("W"): "White", color_code("B"): "Black"}
+
+
+class RoyalIndex:
+    """The royal pieces (kings) still on the board, per color.
+
+    Kept up to date as pieces leave the game, so asking whether the game
+    is decided – and who won – costs O(1) instead of a scan of every piece.
+    The game is decided once fewer than two of the colors that started with
+    a king still have one.
+    """
+
+    def __init__(self, pieces: Iterable[Piece] = ()):
+        self._by_color: Dict[int, Set[Piece]] = {}     # color code -> its royal pieces
+        for p in pieces:
+            self.add(p)
+
+    def add(self, piece: Piece):
+        if piece.desc.royal:
+            self._by_color.setdefault(piece.desc.color, set()).add(piece)
+
+    def discard(self, piece: Piece):
+        kings = self._by_color.get(piece.desc.color)
+        if kings is not None:
+            kings.discard(piece)
+
+    def alive(self, color) -> bool:
+        return bool(self._by_color.get(color_code(color)))
+
+    def is_decided(self) -> bool:
+        return sum(1 for kings in self._by_color.values() if kings) < 2
+
+    def winner(self) -> Optional[int]:
+        """Color code of the only side with a king left (None while undecided or if none is left)."""
+        alive = [color for color, kings in self._by_color.items() if kings]
+        return alive[0] if len(alive) == 1 else None
+
+
+class PieceList(list):
+    """``Game.pieces``: a plain list that reports additions and removals,
+    so indexes derived from it stay in sync whoever edits it."""
+
+    def __init__(self, pieces: Iterable[Piece], on_add: Callable[[Piece], None],
+                 on_remove: Callable[[Piece], None]):
+        super().__init__(pieces)
+        self._on_add, self._on_remove = on_add, on_remove
+
+    def append(self, piece: Piece):
+        super().append(piece)
+        self._on_add(piece)
+
+    def remove(self, piece: Piece):
+        super().remove(piece)
+        self._on_remove(piece)
+
+    def pop(self, index: int = -1) -> Piece:
+        piece = super().pop(index)
+        self._on_remove(piece)
+        return piece
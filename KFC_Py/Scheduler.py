@@ -0,0 +1,68 @@
+# Scheduler.py
+from __future__ import annotations
+
+import heapq
+import itertools
+from typing import Dict, List, Optional, Tuple
+
+from Piece import Piece
+
+
+class PhysicsScheduler:
+    """Timer queue deciding which pieces need ``update`` on a given tick.
+
+    * Every piece with a deadline sits in a min-heap keyed on
+      ``physics.next_deadline_ms()`` and is only woken once it has passed:
+      the end of a rest or jump, or – for a move – the next cell crossing
+      or the arrival.  In between nobody computes its position.
+    * Pieces in a moving state are also listed in ``moving``.
+    * Idle pieces have neither and cost nothing per tick.
+
+    Re-scheduling a piece simply supersedes its previous heap entry; stale
+    entries are discarded lazily when they reach the top.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[float, int, Piece]] = []
+        self._seq = itertools.count()
+        self._deadline: Dict[Piece, float] = {}
+        self.moving: Dict[Piece, None] = {}  # insertion-ordered set
+
+    def schedule(self, piece: Piece):
+        """(Re)register *piece* according to its current state."""
+        self.remove(piece)
+        physics = piece.state.physics
+        if physics.is_moving():
+            self.moving[piece] = None
+        deadline = physics.next_deadline_ms()
+        if deadline is not None:
+            self._deadline[piece] = deadline
+            heapq.heappush(self._heap, (deadline, next(self._seq), piece))
+
+    def remove(self, piece: Piece):
+        self.moving.pop(piece, None)
+        self._deadline.pop(piece, None)
+
+    def _drop_stale(self):
+        heap = self._heap
+        while heap and self._deadline.get(heap[0][2]) != heap[0][0]:
+            heapq.heappop(heap)
+
+    def due(self, now_ms: int) -> List[Piece]:
+        """Pop every piece whose deadline is ``<= now_ms``, earliest first."""
+        out = []
+        self._drop_stale()
+        while self._heap and self._heap[0][0] <= now_ms:
+            _, _, piece = heapq.heappop(self._heap)
+            del self._deadline[piece]
+            out.append(piece)
+            self._drop_stale()
+        return out
+
+    def next_deadline_ms(self) -> Optional[float]:
+        self._drop_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def is_idle(self) -> bool:
+        """Nothing is moving, so nothing can happen before the next deadline."""
+        return not self.moving
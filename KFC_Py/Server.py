@@ -0,0 +1,356 @@
+# Server.py
+"""Asyncio match server: many headless games in one process, one task each.
+
+    python Server.py --port 8765 --matches 4
+
+Every match is a ``Game`` built with ``headless=True`` and driven by its own
+task at a fixed tick rate through ``Game.tick``; nothing blocks the event
+loop, so one process (one core) serves as many matches as its ticks fit in.
+A tick that overruns its slot is not made up with a burst of catch-up
+ticks – the schedule restarts from now and the overrun is counted.
+
+Messages are length-prefixed frames (4-byte big-endian size, then a UTF-8
+JSON object):
+
+client → server
+    {"type": "join", "match": 1, "color": "W"}        color "W"/"B", or null to watch
+    {"type": "watch", "match": 1}                     spectate through the binary stream
+    {"type": "command", "piece_id": "PW_(6, 0)", "cmd": "move", "params": [[6, 0], [4, 0]]}
+server → client
+    {"type": "joined", "match": 1, "color": "W", "tick_ms": 20}
+    {"type": "state", "match": 1, "t": 1234, "pieces": [[id, row, col, state], ...], "winner": null}
+    {"type": "error", "reason": "..."}
+server → spectator
+    {"type": "watching", "match": 1, "tick_ms": 20}
+    Wire keyframes and deltas (binary frames, see Wire.py and Broadcast.py)
+    {"type": "event", "match": 1, "event": "move", "data": {...}}
+
+A ``state`` frame is sent whenever a piece changed cell or state.  Clients
+whose socket buffer is already full skip updates instead of slowing the
+match down; the next frame carries the full state anyway.  Spectators are
+served by the match's ``Broadcaster``, which encodes each tick once for
+all of them.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import pathlib
+import struct
+import time
+from typing import Callable, Dict, List, Optional, Union
+
+from Broadcast import Broadcaster
+from Command import Command
+from Game import Game
+from GameFactory import create_game
+
+logger = logging.getLogger(__name__)
+
+PIECES_ROOT = pathlib.Path(__file__).parent.parent / "pieces"
+_HEADER = struct.Struct(">I")
+MAX_FRAME = 1 << 20
+SEND_BUFFER_LIMIT = 256 * 1024   # bytes queued for a client before its updates are skipped
+
+
+# ---------------------------------------------------------------------------
+#                               FRAMING
+# ---------------------------------------------------------------------------
+
+def encode_frame(msg: dict) -> bytes:
+    body = json.dumps(msg, separators=(",", ":")).encode("utf-8")
+    return _HEADER.pack(len(body)) + body
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Union[dict, bytes, None]:
+    """Next message, or None once the peer closed the connection.
+
+    JSON messages are returned decoded; binary ``Wire`` frames as bytes.
+    """
+    try:
+        (size,) = _HEADER.unpack(await reader.readexactly(_HEADER.size))
+        if size > MAX_FRAME:
+            raise ValueError(f"frame of {size} bytes exceeds {MAX_FRAME}")
+        body = await reader.readexactly(size)
+        return json.loads(body) if body[:1] == b"{" else body
+    except asyncio.IncompleteReadError:
+        return None
+
+
+# ---------------------------------------------------------------------------
+#                               MATCHES
+# ---------------------------------------------------------------------------
+
+class Match:
+    """One game, its clients, and the task that ticks it."""
+
+    def __init__(self, match_id: int, game: Game, tick_ms: float):
+        self.id = match_id
+        self.game = game
+        self.tick_ms = tick_ms
+        self.clients: Dict[asyncio.StreamWriter, Optional[str]] = {}   # writer -> color
+        self.task: Optional[asyncio.Task] = None
+        self.winner: Optional[str] = None
+        # tick statistics
+        self.ticks = 0
+        self.overruns = 0
+        self.max_tick_s = 0.0
+        self.skipped_sends = 0
+        self._last_pieces: Optional[List[list]] = None
+        game.pubsub.subscribe("game_over", self._on_game_over)
+        self.broadcaster = Broadcaster(game, match_id)
+
+    def _on_game_over(self, data):
+        self.winner = data["winner"]
+
+    def pieces_state(self) -> List[list]:
+        return [[p.id, *p.current_cell(), p.state.name] for p in self.game.pieces]
+
+    def state_message(self, pieces: Optional[List[list]] = None) -> dict:
+        return {"type": "state", "match": self.id, "t": self.game.game_time_ms(),
+                "pieces": self.pieces_state() if pieces is None else pieces, "winner": self.winner}
+
+    # ---------------- input -------------------------------------------
+    def submit(self, color: Optional[str], piece_id, cmd_type, params) -> Optional[str]:
+        """Queue a client's command for the next tick; returns why it was refused, if it was."""
+        if not isinstance(piece_id, str):
+            return f"bad piece_id {piece_id!r}"
+        piece = self.game.piece_by_id.get(piece_id)
+        if piece is None or self.game.pos.cell_of(piece) is None:
+            return f"unknown piece {piece_id!r}"
+        if color is None or piece.desc.color_letter != color:
+            return f"{piece_id} is not yours to move"
+        try:
+            cells = [(int(r), int(c)) for r, c in params]
+        except (TypeError, ValueError):
+            return f"bad params {params!r}"
+        # the server's clock stamps commands – clients' clocks are not trusted
+        self.game.user_input_queue.put(Command(self.game.game_time_ms(), piece_id, str(cmd_type), cells))
+        return None
+
+    # ---------------- output ------------------------------------------
+    def send(self, writer: asyncio.StreamWriter, msg: dict):
+        if writer.is_closing():
+            return
+        if writer.transport.get_write_buffer_size() > SEND_BUFFER_LIMIT:
+            self.skipped_sends += 1
+            return
+        writer.write(encode_frame(msg))
+
+    def broadcast_state(self, force: bool = False):
+        pieces = self.pieces_state()
+        if not force and pieces == self._last_pieces:
+            return
+        self._last_pieces = pieces
+        msg = self.state_message(pieces)
+        for writer in list(self.clients):
+            self.send(writer, msg)
+
+    # ---------------- the tick task -----------------------------------
+    async def run(self):
+        try:
+            await self._tick_until_over()
+        finally:
+            # the match's bus dies with it – the broadcaster's and our own subscriptions too
+            self.game.pubsub.clear()
+
+    async def _tick_until_over(self):
+        loop = asyncio.get_running_loop()
+        period = self.tick_ms / 1000
+        self.game.pubsub.publish("game_start", {})
+        next_tick = loop.time()
+        while True:
+            t0 = time.perf_counter()
+            over = self.game.tick()
+            self.broadcast_state(force=over)
+            self.broadcaster.tick()
+            self.ticks += 1
+            self.max_tick_s = max(self.max_tick_s, time.perf_counter() - t0)
+            if over:
+                logger.info("Match %d over: %s wins after %d ticks", self.id, self.winner, self.ticks)
+                # spectators that were behind still get the end of the game
+                await self.broadcaster.finish()
+                return
+            next_tick += period
+            delay = next_tick - loop.time()
+            if delay < 0:
+                self.overruns += 1
+                next_tick = loop.time()
+                delay = 0
+            await asyncio.sleep(delay)
+
+
+class MatchServer:
+    """Hosts matches as asyncio tasks and serves their clients over TCP."""
+
+    def __init__(self, game_factory: Optional[Callable[[], Game]] = None, tick_ms: float = 20):
+        self.game_factory = game_factory or (lambda: create_game(PIECES_ROOT, None, headless=True))
+        self.tick_ms = tick_ms
+        self.matches: Dict[int, Match] = {}
+        self._ids = itertools.count(1)
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    def create_match(self) -> Match:
+        match = Match(next(self._ids), self.game_factory(), self.tick_ms)
+        match.task = asyncio.get_running_loop().create_task(self._play(match), name=f"match-{match.id}")
+        self.matches[match.id] = match
+        return match
+
+    async def _play(self, match: Match):
+        """Tick *match* until it is over, then let its clients go and forget it."""
+        try:
+            await match.run()
+        finally:
+            self.matches.pop(match.id, None)
+            for writer in list(match.clients) + list(match.broadcaster.spectators):
+                writer.close()
+            match.clients.clear()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        """Listen for clients; returns the bound port."""
+        self._server = await asyncio.start_server(self._handle_client, host, port)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        tasks = [m.task for m in self.matches.values() if m.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        # matches close their clients as their task ends; these never started
+        for match in self.matches.values():
+            for writer in list(match.clients):
+                writer.close()
+
+    def _match(self, match_id) -> Optional[Match]:
+        # ids come off the wire: anything but an int (lists, objects) is no match
+        if type(match_id) is not int:
+            return None
+        return self.matches.get(match_id)
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        match: Optional[Match] = None
+        watching: Optional[Match] = None
+        try:
+            while (msg := await read_frame(reader)) is not None:
+                if not isinstance(msg, dict):
+                    writer.write(encode_frame({"type": "error", "reason": "expected a JSON object"}))
+                    continue
+                kind = msg.get("type")
+                if kind == "join":
+                    new = self._match(msg.get("match"))
+                    color = msg.get("color")
+                    if new is None or color not in ("W", "B", None):
+                        writer.write(encode_frame({"type": "error", "reason": f"cannot join {msg!r}"}))
+                        continue
+                    if match is not None:
+                        match.clients.pop(writer, None)
+                    match = new
+                    match.clients[writer] = color
+                    writer.write(encode_frame({"type": "joined", "match": match.id, "color": color,
+                                               "tick_ms": match.tick_ms}))
+                    writer.write(encode_frame(match.state_message()))
+                elif kind == "watch":
+                    new = self._match(msg.get("match"))
+                    if new is None:
+                        writer.write(encode_frame({"type": "error", "reason": f"cannot watch {msg!r}"}))
+                        continue
+                    if watching is not None:
+                        watching.broadcaster.remove(writer)
+                    watching = new
+                    writer.write(encode_frame({"type": "watching", "match": watching.id,
+                                               "tick_ms": watching.tick_ms}))
+                    # the first frame the broadcaster queues for it is a keyframe
+                    watching.broadcaster.add(writer)
+                elif kind == "command" and match is not None:
+                    reason = match.submit(match.clients.get(writer), msg.get("piece_id"),
+                                          msg.get("cmd"), msg.get("params", []))
+                    if reason is not None:
+                        writer.write(encode_frame({"type": "error", "reason": reason}))
+                else:
+                    writer.write(encode_frame({"type": "error", "reason": f"unexpected {kind!r}"}))
+        except (ConnectionError, ValueError) as e:
+            logger.info("Dropping client: %s", e)
+        finally:
+            if match is not None:
+                match.clients.pop(writer, None)
+            if watching is not None:
+                watching.broadcaster.remove(writer)
+            writer.close()
+
+
+# ---------------------------------------------------------------------------
+#                               CLIENT
+# ---------------------------------------------------------------------------
+
+class LoopbackClient:
+    """Minimal client for tests and tools."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader, self.writer = reader, writer
+
+    @classmethod
+    async def connect(cls, host: str = "127.0.0.1", port: int = 8765) -> "LoopbackClient":
+        return cls(*await asyncio.open_connection(host, port))
+
+    async def send(self, msg: dict):
+        self.writer.write(encode_frame(msg))
+        await self.writer.drain()
+
+    async def recv(self) -> Union[dict, bytes, None]:
+        return await read_frame(self.reader)
+
+    async def wait_for(self, predicate: Callable[[dict], bool], timeout: float = 5.0) -> dict:
+        async def scan():
+            while (msg := await self.recv()) is not None:
+                if predicate(msg):
+                    return msg
+            raise ConnectionError("server closed the connection")
+        return await asyncio.wait_for(scan(), timeout)
+
+    async def join(self, match_id: int, color: Optional[str] = None) -> dict:
+        await self.send({"type": "join", "match": match_id, "color": color})
+        return await self.wait_for(lambda m: m["type"] in ("joined", "error"))
+
+    async def watch(self, match_id: int) -> dict:
+        """Spectate a match; binary frames and events follow (decode with ``Wire.SnapshotDecoder``)."""
+        await self.send({"type": "watch", "match": match_id})
+        return await self.wait_for(lambda m: isinstance(m, dict) and m["type"] in ("watching", "error"))
+
+    async def command(self, piece_id: str, cmd_type: str, params):
+        await self.send({"type": "command", "piece_id": piece_id, "cmd": cmd_type,
+                         "params": [list(cell) for cell in params]})
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+# ---------------------------------------------------------------------------
+
+async def serve(host: str, port: int, matches: int, tick_ms: float):
+    server = MatchServer(tick_ms=tick_ms)
+    port = await server.start(host, port)
+    for _ in range(matches):
+        server.create_match()
+    logger.info("Serving %d matches on %s:%d", matches, host, port)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--matches", type=int, default=1)
+    parser.add_argument("--tick-ms", type=float, default=20)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(serve(args.host, args.port, args.matches, args.tick_ms))
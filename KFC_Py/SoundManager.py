@@ -6,6 +6,9 @@ import logging
 logger = logging.getLogger(__name__)
 
 class SoundManager:
+    # a sound that could not start in time is not worth playing late
+    QUEUE_SIZE = 4
+
     def __init__(self, pubsub):
         pygame.mixer.init()
         base = pathlib.Path(__file__).parent.parent / "pieces"
@@ -15,10 +18,12 @@ class SoundManager:
             "start": pygame.mixer.Sound(str(base / "gamestart.wav")),
             "end": pygame.mixer.Sound(str(base / "gameend.wav"))
         }
-        pubsub.subscribe("move", self.play_move)
-        pubsub.subscribe("capture", self.play_capture)
-        pubsub.subscribe("game_start", self.play_start)
-        pubsub.subscribe("game_end", self.play_end)
+        # mixer calls run on the subscribers' worker threads, never in the game loop
+        self.subscribers = [
+            pubsub.subscribe_queued(event, play, maxsize=self.QUEUE_SIZE, name=f"sound-{event}")
+            for event, play in (("move", self.play_move), ("capture", self.play_capture),
+                                ("game_start", self.play_start), ("game_end", self.play_end))
+        ]
 
     def play_move(self, event_data=None):
         logger.debug("[Sound] Playing move.wav")
@@ -0,0 +1,66 @@
+# SpriteDiskCache.py
+import hashlib
+import logging
+import os
+import pathlib
+import tempfile
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class SpriteDiskCache:
+    """Persistent cache of decoded + resized sprite pixels.
+
+    Each entry is a plain ``.npy`` file named ``<key>-<mtime>.npy`` where
+    *key* hashes the resolved source path, target size, aspect flag and
+    interpolation, and *mtime* is the source file's ``st_mtime_ns``.  When a
+    source changes its mtime no longer matches, the lookup misses and the
+    stale sibling is replaced on the next ``put``.
+    """
+
+    def __init__(self, root: str | pathlib.Path):
+        self.root = pathlib.Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(path: pathlib.Path, size, keep_aspect: bool, interpolation: int) -> str:
+        raw = f"{path.resolve()}|{tuple(size) if size is not None else None}|{bool(keep_aspect)}|{interpolation}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:24]
+
+    def _entry(self, path, size, keep_aspect, interpolation) -> tuple[str, pathlib.Path]:
+        path = pathlib.Path(path)
+        key = self._key(path, size, keep_aspect, interpolation)
+        mtime = os.stat(path).st_mtime_ns
+        return key, self.root / f"{key}-{mtime:x}.npy"
+
+    def get(self, path, size, keep_aspect: bool, interpolation: int) -> np.ndarray | None:
+        _, entry = self._entry(path, size, keep_aspect, interpolation)
+        try:
+            arr = np.load(entry, allow_pickle=False)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring corrupt sprite cache entry %s: %s", entry, e)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return arr
+
+    def put(self, path, size, keep_aspect: bool, interpolation: int, pixels: np.ndarray):
+        key, entry = self._entry(path, size, keep_aspect, interpolation)
+        try:
+            for stale in self.root.glob(f"{key}-*.npy"):
+                if stale != entry:
+                    stale.unlink(missing_ok=True)
+            # write-then-rename so concurrent workers never see half a file
+            fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, np.ascontiguousarray(pixels), allow_pickle=False)
+            os.replace(tmp, entry)
+        except OSError as e:
+            logger.warning("Could not write sprite cache entry %s: %s", entry, e)
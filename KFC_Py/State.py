@@ -28,6 +28,9 @@ class State:
     def reset(self, cmd: Command):
         self.graphics.reset(cmd)
         self.physics.reset(cmd)
+        # lazy graphics: warm the states we are likely to enter next
+        for nxt in self.transitions.values():
+            nxt.graphics.prefetch()
 
     def on_command(self, cmd: Command, cell2piece: Dict[Tuple[int, int], List[Piece]], my_color: str = "X"):
         """Process a command and potentially transition to a new state."""
@@ -66,6 +69,13 @@ class State:
         nxt.reset(cmd)
         return nxt
 
+    def legal_destinations(self, cell2piece, my_color: str = "X") -> List[Tuple[int, int]]:
+        """Cells a ``move`` command would be accepted for right now (empty if this state can't move)."""
+        if self.moves is None or "move" not in self.transitions:
+            return []
+        return self.moves.destinations(self.physics.get_curr_cell(), cell2piece,
+                                       self.physics.is_need_clear_path(), my_color)
+
     def update(self, now_ms: int) -> State:
         internal = self.physics.update(now_ms)
         if internal:
@@ -0,0 +1,100 @@
+import os
+import pathlib
+import shutil
+import numpy as np
+import pytest
+
+from AssetBundle import AssetBundle, compile_assets, load_current_bundle
+from GameFactory import create_game
+from GraphicsFactory import MockImgFactory
+
+PIECES_DIR = pathlib.Path(__file__).parent.parent.parent / "pieces"
+
+
+def _pawn_tree(tmp_path):
+    """A pieces tree with only the white pawn – quick to compile."""
+    root = tmp_path / "pieces"
+    shutil.copytree(PIECES_DIR / "PW", root / "PW")
+    for name in ("background.jpg", "board.png", "board.csv"):
+        shutil.copy(PIECES_DIR / name, root / name)
+    return root
+
+
+@pytest.fixture(scope="module")
+def bundle_path(tmp_path_factory):
+    return compile_assets(PIECES_DIR, tmp_path_factory.mktemp("bundle") / "assets.kfcb")
+
+
+def test_bundle_frames_are_memmap_views(bundle_path):
+    bundle = AssetBundle(bundle_path)
+    frames = bundle.frames("PW", "idle")
+
+    assert len(frames) == len(list((PIECES_DIR / "PW" / "states" / "idle" / "sprites").glob("*.png")))
+    for frm in frames:
+        assert frm.img.shape == (64, 64, 4)
+        assert isinstance(frm.img.base, np.memmap)   # zero-copy
+        assert not frm.img.flags.writeable
+    assert bundle.frames("PW", "idle") is frames
+
+
+def test_bundle_keeps_moves_and_transitions(bundle_path):
+    bundle = AssetBundle(bundle_path)
+    states = bundle.states("PW")
+
+    assert states["idle"]["moves"][(-2, 0)] == "non_capture"
+    assert states["move"]["moves"] is None
+    assert states["long_rest"]["config"]["physics"]["duration_ms"] == 10000
+    assert bundle.transitions("PW")["move"]["done"] == "long_rest"
+
+
+def test_create_game_from_bundle(bundle_path):
+    game = create_game(PIECES_DIR, MockImgFactory(), bundle=bundle_path)
+    game._update_cell2piece_map()
+
+    assert len(game.pieces) == 32
+    knight = game.pos[(7, 1)][0]
+    assert knight.id.startswith("NW")
+    assert not knight.state.physics.is_need_clear_path()
+    assert set(knight.state.transitions) == {"move", "jump"}
+
+
+def test_rejects_foreign_file(tmp_path):
+    bogus = tmp_path / "bogus.kfcb"
+    bogus.write_bytes(b"\0" * 64)
+    with pytest.raises(ValueError):
+        AssetBundle(bogus)
+
+
+def test_bundle_carries_piece_descriptor_overrides(tmp_path):
+    from Board import Board
+    from GraphicsFactory import GraphicsFactory
+    from mock_img import MockImg
+    from PieceFactory import PieceFactory
+
+    root = _pawn_tree(tmp_path)
+    (root / "PW" / "config.json").write_text('{"royal": true}')
+    bundle = AssetBundle(compile_assets(root, tmp_path / "assets.kfcb"))
+    (root / "PW" / "config.json").unlink()          # the bundle alone must know
+
+    assert bundle.piece_config("PW") == {"royal": True}
+    board = Board(cell_H_pix=64, cell_W_pix=64, W_cells=8, H_cells=8, img=MockImg())
+    factory = PieceFactory(board, pieces_root=root, graphics_factory=GraphicsFactory(MockImgFactory()),
+                           bundle=bundle)
+    assert factory.create_piece("PW", (6, 0)).desc.royal
+
+
+def test_stale_bundle_is_not_used(tmp_path):
+    root = _pawn_tree(tmp_path)
+    compile_assets(root)
+    assert load_current_bundle(root).is_current(root)
+
+    moves = root / "PW" / "states" / "idle" / "moves.txt"
+    moves.write_text(moves.read_text() + "\n-3,0:non_capture\n")
+    st = moves.stat()
+    os.utime(moves, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert load_current_bundle(root) is None
+
+    compile_assets(root)
+    assert load_current_bundle(root) is not None
+    (root / "PW" / "states" / "idle" / "sprites" / "1.png").unlink()      # removals count too
+    assert load_current_bundle(root) is None
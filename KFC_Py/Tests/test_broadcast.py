@@ -0,0 +1,135 @@
+import asyncio
+import json
+import struct
+
+from Broadcast import Broadcaster
+from Clock import VirtualClock
+from Command import Command
+from GameFactory import create_game
+from GraphicsFactory import MockImgFactory
+from Wire import PieceRecord, SnapshotDecoder
+
+
+class _Sink:
+    """Stands in for a spectator's StreamWriter; *backlog* is what its socket buffer reports."""
+
+    def __init__(self):
+        self.frames = []
+        self.backlog = 0
+        self.transport = self
+
+    def get_write_buffer_size(self):
+        return self.backlog
+
+    def write(self, data):
+        self.frames.append(data)
+
+    def is_closing(self):
+        return False
+
+    async def drain(self):
+        pass
+
+    def replay(self):
+        """Decode everything written so far; the last board and the events seen."""
+        dec, frame, events = SnapshotDecoder(), None, []
+        for data in self.frames:
+            (size,) = struct.unpack_from(">I", data)
+            body = data[4:]
+            assert len(body) == size
+            if body[:1] == b"{":
+                events.append(json.loads(body)["event"])
+            else:
+                frame = dec.decode(body)
+        return frame, events
+
+
+def _game():
+    return create_game("../pieces", MockImgFactory(), headless=True, clock=VirtualClock())
+
+
+def _play(game, broadcaster, ticks, moves=()):
+    moves = list(moves)
+    for i in range(ticks):
+        if i % 20 == 0 and moves:
+            pid, src, dst = moves.pop(0)
+            game.user_input_queue.put(Command(game.game_time_ms(), pid, "move", [src, dst]))
+        game.clock.advance(20)
+        game.tick()
+        broadcaster.tick()
+
+
+_PAWNS = [("PW_(6, %d)" % c, (6, c), (5, c)) for c in range(8)]
+
+
+def test_each_tick_is_encoded_once_for_every_spectator():
+    game = _game()
+    broadcaster = Broadcaster(game, match_id=1)
+    sinks = [_Sink() for _ in range(5)]
+    for sink in sinks:
+        broadcaster.add(sink)
+
+    _play(game, broadcaster, 1)          # events reach a spectator once it has its keyframe
+    _play(game, broadcaster, 100, _PAWNS[:3])
+
+    # the same bytes objects went to everyone
+    first = sinks[0].frames
+    assert all(len(s.frames) == len(first) and all(a is b for a, b in zip(s.frames, first)) for s in sinks)
+    assert broadcaster.keyframes == 1 and broadcaster.frames < 100       # quiet ticks send nothing
+    board, events = sinks[0].replay()
+    assert board.pieces == {p.id: PieceRecord.of(p) for p in game.pieces}
+    assert events.count("move") == 3
+
+
+def test_slow_spectator_gets_a_keyframe_instead_of_a_backlog():
+    game = _game()
+    broadcaster = Broadcaster(game, max_frames=4, buffer_limit=1000)
+    fast, slow = _Sink(), _Sink()
+    broadcaster.add(fast)
+    spectator = broadcaster.add(slow)
+
+    _play(game, broadcaster, 1)
+    slow.backlog = 10_000                                   # its reader stopped reading
+    _play(game, broadcaster, 300, _PAWNS)
+    assert spectator.high_water <= 4 and spectator.dropped > 0
+    assert len(slow.frames) == 1
+
+    slow.backlog = 0
+    _play(game, broadcaster, 1)
+    board = {p.id: PieceRecord.of(p) for p in game.pieces}
+    assert slow.replay()[0].pieces == fast.replay()[0].pieces == board
+    assert spectator.keyframes >= 2
+    # the fast one never needed more than its first keyframe
+    assert broadcaster.spectators[fast].keyframes == 1
+
+
+def test_late_spectator_joins_the_running_stream():
+    game = _game()
+    broadcaster = Broadcaster(game)
+    early = _Sink()
+    broadcaster.add(early)
+    _play(game, broadcaster, 50, _PAWNS[:2])
+
+    late = _Sink()
+    broadcaster.add(late)
+    _play(game, broadcaster, 100, _PAWNS[2:4])
+    assert late.replay()[0].pieces == early.replay()[0].pieces == {p.id: PieceRecord.of(p) for p in game.pieces}
+
+
+def test_end_of_match_reaches_a_spectator_that_was_behind():
+    game = _game()
+    broadcaster = Broadcaster(game, buffer_limit=1000)
+    sink = _Sink()
+    broadcaster.add(sink)
+    _play(game, broadcaster, 1)
+
+    sink.backlog = 10_000
+    _play(game, broadcaster, 40, _PAWNS[:1])
+    game.pubsub.publish("game_over", {"winner": "White"})
+    broadcaster.tick()
+    assert len(sink.frames) == 1                            # still stuck behind its socket
+
+    asyncio.run(broadcaster.finish())
+    board, events = sink.replay()
+    assert events == ["move", "game_over"]
+    assert board.pieces == {p.id: PieceRecord.of(p) for p in game.pieces}
@@ -0,0 +1,75 @@
+import time
+
+import pytest
+
+from Clock import Clock, MonotonicClock, VirtualClock
+from Command import Command
+from GameFactory import create_game
+from GraphicsFactory import MockImgFactory
+
+
+def test_virtual_clock_steps_scales_and_pauses():
+    clock = VirtualClock(start_ms=1000)
+    assert clock.advance(250) == 1250
+    clock.speed = 4
+    assert clock.advance(250) == 2250
+    clock.pause()
+    assert clock.advance(250) == 2250 and clock.paused
+    assert clock.advance_to(5000) == 5000          # fast-forward works while paused
+    clock.resume()
+    assert clock.advance(1) == 5004
+    assert clock.real_wait_s(1000) == 0.0
+    with pytest.raises(ValueError):
+        clock.speed = 0
+
+
+def test_half_implemented_clock_fails_at_construction():
+    class OnlyNow(Clock):
+        def now_ms(self):
+            return 0
+
+    with pytest.raises(TypeError):
+        OnlyNow()
+
+
+def test_monotonic_clock_is_continuous_across_pause_and_speed_changes():
+    clock = MonotonicClock(speed=1000)
+    time.sleep(0.01)
+    clock.pause()
+    frozen = clock.now_ms()
+    assert frozen >= 10_000
+    time.sleep(0.01)
+    assert clock.now_ms() == frozen and clock.real_wait_s(5) == float("inf")
+
+    clock.speed = 1
+    clock.resume()
+    assert frozen <= clock.now_ms() < frozen + 1000     # no jump from the new speed
+    assert clock.real_wait_s(500) == pytest.approx(0.5)
+
+
+def _play_capture_on_virtual_time():
+    game = create_game("../pieces", MockImgFactory(), clock=VirtualClock())
+
+    def play(ms, step_ms=20):
+        for _ in range(ms // step_ms):
+            game.clock.advance(step_ms)
+            game._run_game_loop(num_iterations=1, is_with_graphics=False)
+
+    pw, pb = game.pos[(6, 0)][0], game.pos[(1, 1)][0]
+    game.user_input_queue.put(Command(game.game_time_ms(), pw.id, "move", [(6, 0), (4, 0)]))
+    game.user_input_queue.put(Command(game.game_time_ms(), pb.id, "move", [(1, 1), (3, 1)]))
+    play(15_000)           # move, then the 10 s long rest
+    game.user_input_queue.put(Command(game.game_time_ms(), pw.id, "move", [(4, 0), (3, 1)]))
+    play(15_000)
+    return game, pw, pb
+
+
+def test_game_on_virtual_clock_is_fast_and_reproducible():
+    t0 = time.perf_counter()
+    game, pw, pb = _play_capture_on_virtual_time()
+    assert time.perf_counter() - t0 < 20            # 30 s of game time, no sleeping
+    assert game.game_time_ms() == 30_000
+    assert pw.current_cell() == (3, 1) and pb not in game.pieces
+
+    again, *_ = _play_capture_on_virtual_time()
+    assert [p.snapshot() for p in again.pieces] == [p.snapshot() for p in game.pieces]
@@ -5,7 +5,7 @@ from mock_img import MockImg
 from PhysicsFactory import PhysicsFactory
 from Physics import IdlePhysics, MovePhysics, JumpPhysics, RestPhysics
 from PieceFactory import PieceFactory
-from GraphicsFactory import GraphicsFactory, MockImgFactory
+from GraphicsFactory import GraphicsFactory, ImgFactory, MockImgFactory
 
 
 # ---------------------------------------------------------------------------
@@ -73,4 +73,160 @@ def test_piece_factory_generates_all_pieces():
             if i >= board.W_cells:
                 i = 0
                 j += 1
-    assert len(piece_ids) == num_pieces_created
\ No newline at end of file
+    assert len(piece_ids) == num_pieces_created
+
+# ---------------------------------------------------------------------------
+#                          SHARED FRAME CACHE TESTS
+# ---------------------------------------------------------------------------
+
+def test_pieces_of_same_type_share_frames():
+    board = _board()
+    gfx_factory = GraphicsFactory(ImgFactory())
+    p_factory = PieceFactory(board, pieces_root=PIECES_DIR, graphics_factory=gfx_factory)
+
+    p1 = p_factory.create_piece("PW", (6, 0))
+    p2 = p_factory.create_piece("PW", (6, 1))
+
+    assert p1.state is not p2.state
+    assert p1.state.graphics is not p2.state.graphics
+    for f1, f2 in zip(p1.state.graphics.frames, p2.state.graphics.frames):
+        assert f1 is f2
+
+
+def test_pieces_of_same_type_share_template():
+    board = _board()
+    p_factory = PieceFactory(board, pieces_root=PIECES_DIR, graphics_factory=GraphicsFactory(MockImgFactory()))
+
+    p1 = p_factory.create_piece("QW", (7, 3))
+    p2 = p_factory.create_piece("QW", (0, 3))
+
+    assert p_factory.template(PIECES_DIR / "QW") is p_factory.template(PIECES_DIR / "QW")
+    assert p1.state.moves is p2.state.moves            # one Moves table per type/state
+    assert p1.state.physics is not p2.state.physics    # runtime stays per piece
+    assert p1.current_cell() == (7, 3) and p2.current_cell() == (0, 3)
+
+
+def test_piece_snapshot_restore_roundtrip():
+    from Command import Command
+
+    board = _board()
+    p_factory = PieceFactory(board, pieces_root=PIECES_DIR, graphics_factory=GraphicsFactory(MockImgFactory()))
+    piece = p_factory.create_piece("RW", (4, 0))
+    piece.on_command(Command(100, piece.id, "move", [(4, 0), (4, 3)]), {})
+    rec = piece.snapshot()
+    assert (rec.state, rec.start_ms, rec.start_cell, rec.end_cell) == ("move", 100, (4, 0), (4, 3))
+
+    piece.update(60_000)                               # finish the move
+    assert piece.state.name != "move"
+    piece.restore(rec)
+    assert piece.snapshot() == rec
+    piece.update(100 + int(piece.state.physics._duration_s * 1000))
+    assert piece.current_cell() == (4, 3)
+
+
+def test_restore_reaches_states_the_current_one_cannot():
+    from Command import Command
+
+    board = _board()
+    p_factory = PieceFactory(board, pieces_root=PIECES_DIR, graphics_factory=GraphicsFactory(MockImgFactory()))
+    pawn = p_factory.create_piece("PW", (6, 0))
+    before = pawn.snapshot()
+
+    pawn.on_command(Command(0, pawn.id, "move", [(6, 0), (5, 0)]), {})
+    for t in range(0, 60_000, 1000):                   # move, long rest, idle_after_first_move
+        pawn.update(t)
+    assert pawn.state.name == "idle_after_first_move"
+    assert "idle" not in {st.name for st in pawn.state.transitions.values()}
+
+    pawn.restore(before)
+    assert pawn.state.name == "idle" and pawn.snapshot() == before
+    assert pawn.current_cell() == (6, 0)
+
+
+def test_img_factory_cache_is_keyed_on_size():
+    ImgFactory.clear_cache()
+    factory = ImgFactory()
+    sprite = PIECES_DIR / "PW" / "states" / "idle" / "sprites" / "1.png"
+
+    a = factory(sprite, (32, 32))
+    b = ImgFactory()(sprite, (32, 32), keep_aspect=False)
+    c = factory(sprite, (16, 16))
+
+    assert a is b                      # process-wide, not per factory
+    assert a is not c
+    assert c.img.shape[:2] == (16, 16)
+    assert not a.img.flags.writeable   # shared frames are read-only
+
+
+def test_parallel_preload_keeps_sorted_frame_order():
+    ImgFactory.clear_cache()
+    sprites = [PIECES_DIR / code / "states" / st / "sprites"
+               for code in ("PW", "NB") for st in ("idle", "move")]
+
+    parallel = GraphicsFactory(ImgFactory(), max_workers=4)
+    stats = parallel.preload(sprites, (32, 32))
+
+    assert stats.frames == sum(len(list(d.glob("*.png"))) for d in sprites)
+    assert stats.workers == 4
+    assert stats.saved_s >= 0.0
+    assert parallel.last_load_stats is stats
+
+    serial = GraphicsFactory(ImgFactory())
+    for d in sprites:
+        expected = [ImgFactory()(p, (32, 32)) for p in sorted(d.glob("*.png"))]
+        assert list(parallel.load(d, {}, (32, 32)).frames) == expected
+        assert list(serial.load(d, {}, (32, 32)).frames) == expected
+
+
+def test_piece_descriptors_come_from_the_type(tmp_path):
+    import shutil
+    from Piece import PieceDescriptor, color_code
+
+    board = _board()
+    p_factory = PieceFactory(board, pieces_root=PIECES_DIR, graphics_factory=GraphicsFactory(MockImgFactory()))
+    king, knight, pawn = (p_factory.create_piece(t, (0, 0)) for t in ("KB", "NW", "PW"))
+    assert (king.desc.kind, king.desc.color, king.desc.color_letter) == ("K", color_code("B"), "B")
+    assert king.desc.royal and not king.desc.airborne_while_moving
+    assert knight.desc.airborne_while_moving and not knight.desc.royal
+    assert pawn.desc.flags == 0
+    assert p_factory.create_piece("PW", (1, 1)).desc is pawn.desc    # shared per type
+
+    # a piece type can opt into flags through its config.json
+    shutil.copytree(PIECES_DIR / "PW", tmp_path / "PW")
+    (tmp_path / "PW" / "config.json").write_text('{"royal": true}')
+    custom = PieceFactory(board, pieces_root=tmp_path, graphics_factory=GraphicsFactory(MockImgFactory()))
+    assert custom.create_piece("PW", (6, 0)).desc == PieceDescriptor(color_code("W"), "P", PieceDescriptor.ROYAL)
+
+
+def test_board_validation_reads_descriptors(tmp_path):
+    import shutil
+    from Game import Game, InvalidBoard
+
+    # white's royal piece is a pawn marked in its config.json – no "KW" id anywhere
+    shutil.copytree(PIECES_DIR / "PW", tmp_path / "PW")
+    shutil.copytree(PIECES_DIR / "KB", tmp_path / "KB")
+    (tmp_path / "PW" / "config.json").write_text('{"royal": true}')
+    board = _board()
+    factory = PieceFactory(board, pieces_root=tmp_path, graphics_factory=GraphicsFactory(MockImgFactory()))
+    royal_pawn, black_king = factory.create_piece("PW", (6, 0)), factory.create_piece("KB", (0, 4))
+    assert Game([royal_pawn, black_king], board).royals.alive("W")
+
+    plain = PieceFactory(board, pieces_root=PIECES_DIR, graphics_factory=GraphicsFactory(MockImgFactory()))
+    with pytest.raises(InvalidBoard):
+        Game([plain.create_piece("PW", (6, 0)), black_king], board)
+
+
+def test_moves_use_rows_and_cols_on_a_non_square_board():
+    from Occupancy import OccupancyIndex
+
+    board = Board(cell_H_pix=32, cell_W_pix=32, W_cells=10, H_cells=6, img=MockImg())
+    factory = PieceFactory(board, pieces_root=PIECES_DIR, graphics_factory=GraphicsFactory(MockImgFactory()))
+    rook = factory.create_piece("RW", (0, 0))
+    moves = rook.state.moves
+    index = OccupancyIndex([rook], dims=(board.H_cells, board.W_cells))
+    assert moves.dims == index.dims
+    assert moves.is_valid((0, 0), (0, 7), index, True, "W")    # column 7 exists, row 7 does not
+    assert moves.is_valid((0, 0), (5, 0), index, True, "W")
+    assert not moves.is_valid((0, 0), (6, 0), index, True, "W")
+    assert moves.destinations((0, 0), index, True, "W") == sorted(
+        [(r, 0) for r in range(1, 6)] + [(0, c) for c in range(1, 8)])
@@ -36,4 +36,11 @@ def test_graphics_factory_uses_custom_img_factory():
     gfx = gf.load(sprites_dir, cfg={}, cell_size=(32, 32))
 
     for frm in gfx.frames:
-        assert isinstance(frm, MockImg) 
\ No newline at end of file
+        assert isinstance(frm, MockImg) 
+
+def test_create_game_with_lazy_graphics():
+    game = create_game(PIECES_DIR, MockImgFactory(), lazy_graphics=True)
+    pawn = next(p for p in game.pieces if p.id.startswith("PW"))
+
+    assert not pawn.state.transitions["jump"].transitions["done"].graphics.is_loaded()
+    assert isinstance(pawn.state.graphics.get_img(), MockImg)
@@ -6,6 +6,7 @@ from Command import Command
 from Graphics import Graphics
 from GraphicsFactory import MockImgFactory
 from Moves import Moves
+from Piece import PieceDescriptor
 from mock_img import MockImg
 
 
@@ -64,6 +65,51 @@ def test_graphics_empty_frames():
         pass
 
 
+def test_graphics_lazy_frames_load_on_first_get_img():
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return [MockImg() for _ in range(4)]
+
+    gfx = Graphics(
+        sprites_folder=SPRITES_DIR,
+        cell_size=(32, 32),
+        loop=True,
+        fps=10.0,
+        img_loader=MockImgFactory(),
+        lazy=True,
+        frames_loader=loader,
+    )
+    gfx.reset(Command(0, "test", "idle", []))
+    gfx.update(250)                 # animating alone does not decode
+    assert calls == [] and not gfx.is_loaded()
+
+    frame = gfx.get_img()
+    assert calls == [1]
+    assert frame is gfx.frames[2]   # caught up with the elapsed time
+    gfx.get_img()
+    assert calls == [1]
+
+
+def test_graphics_prefetch_warms_next_states():
+    class _InlineExecutor:
+        def submit(self, fn):
+            fn()
+
+    gfx = Graphics(
+        sprites_folder=SPRITES_DIR,
+        cell_size=(32, 32),
+        img_loader=MockImgFactory(),
+        lazy=True,
+        prefetcher=_InlineExecutor(),
+    )
+    assert not gfx.is_loaded()
+    gfx.prefetch()
+    assert gfx.is_loaded()
+    assert len(gfx.frames) == len(list(SPRITES_DIR.glob("*.png")))
+
+
 # ---------------------------------------------------------------------------
 #                          MOVES TESTS
 # ---------------------------------------------------------------------------
@@ -123,3 +169,55 @@ def test_moves_board_bounds():
         assert not mv.is_valid((7, 4), (8, 4), {}, True, "X")
         assert not mv.is_valid((4, 0), (4, -1), {}, True, "X")
         assert not mv.is_valid((4, 7), (4, 8), {}, True, "X")
+
+
+def _reference_is_valid(table, dims, src, dst, cell2piece, clear_path, color):
+    """Straight cell-by-cell rules the bitboard version must reproduce."""
+    if not (0 <= dst[0] < dims[0] and 0 <= dst[1] < dims[1]):
+        return False
+    dr, dc = dst[0] - src[0], dst[1] - src[1]
+    if (dr, dc) not in table:
+        return False
+    here = cell2piece.get(dst)
+    enemy = bool(here) and any(p.id[1] != color for p in here)
+    tag = table[(dr, dc)]
+    if not {"": not here or enemy, "capture": enemy, "non_capture": not here}[tag]:
+        return False
+    steps = max(abs(dr), abs(dc))
+    return not clear_path or all(
+        (src[0] + int(i * dr / steps), src[1] + int(i * dc / steps)) not in cell2piece
+        for i in range(1, steps))
+
+
+def test_moves_bitboards_match_reference_on_custom_boards():
+    import random
+    from Occupancy import OccupancyIndex
+
+    rng = random.Random(7)
+    for dims in ((8, 8), (10, 13)):
+        span = max(dims)
+        table = {(d * dr, d * dc): rng.choice(["", "capture", "non_capture"])
+                 for d in range(1, span) for dr, dc in ((1, 0), (-1, 1), (0, -1), (1, 1))}
+        table[(2, 1)] = ""
+        mv = Moves.from_table(table, dims)
+
+        class P:
+            def __init__(self, id, cell):
+                self.id, self.cell = id, cell
+                self.desc = PieceDescriptor.from_id(id)
+
+            def current_cell(self):
+                return self.cell
+
+        pieces = [P(rng.choice(["PW", "PB"]), (rng.randrange(dims[0]), rng.randrange(dims[1])))
+                  for _ in range(30)]
+        index = OccupancyIndex(pieces, dims=dims)
+        plain = {cell: list(index[cell]) for cell in index}
+
+        for _ in range(3000):
+            src = (rng.randrange(dims[0]), rng.randrange(dims[1]))
+            dst = (rng.randrange(-1, dims[0] + 1), rng.randrange(-1, dims[1] + 1))
+            clear, color = rng.random() < 0.7, rng.choice("WB")
+            want = _reference_is_valid(table, dims, src, dst, plain, clear, color)
+            assert mv.is_valid(src, dst, index, clear, color) == want
+            assert mv.is_valid(src, dst, plain, clear, color) == want
@@ -0,0 +1,34 @@
+import pathlib
+import subprocess
+import sys
+import textwrap
+
+KFC_DIR = pathlib.Path(__file__).parent.parent
+
+# runs in a fresh interpreter where importing any media/input library fails
+_SCRIPT = textwrap.dedent("""
+    import sys
+    for name in ("cv2", "pygame", "keyboard"):
+        sys.modules[name] = None
+
+    from Clock import VirtualClock
+    from Command import Command
+    from GameFactory import create_game
+    from GraphicsFactory import ImgFactory
+
+    game = create_game("../pieces", ImgFactory(), headless=True, clock=VirtualClock())
+    pw, pb = game.pos[(6, 0)][0], game.pos[(1, 1)][0]
+    game.user_input_queue.put(Command(0, pw.id, "move", [(6, 0), (4, 0)]))
+    game.user_input_queue.put(Command(0, pb.id, "move", [(1, 1), (3, 1)]))
+    for _ in range(600):
+        game.clock.advance(20)
+        game._run_game_loop(num_iterations=1, is_with_graphics=False)
+    print(pw.current_cell(), pb.current_cell(), len(game.pieces), game.sound, game.announcer)
+""")
+
+
+def test_simulation_runs_without_cv2_pygame_or_keyboard():
+    result = subprocess.run([sys.executable, "-c", _SCRIPT], cwd=KFC_DIR,
+                            capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().splitlines()[-1] == "(4, 0) (3, 1) 32 None None"
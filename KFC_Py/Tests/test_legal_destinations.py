@@ -0,0 +1,60 @@
+import time
+
+from Command import Command
+from GameFactory import create_game
+from GraphicsFactory import MockImgFactory
+
+
+def _brute_force(game, piece):
+    st = piece.state
+    if st.moves is None or "move" not in st.transitions:
+        return ()
+    src = piece.current_cell()
+    return tuple(sorted(
+        (r, c) for r in range(8) for c in range(8)
+        if st.moves.is_valid(src, (r, c), game.pos, st.physics.is_need_clear_path(), piece.id[1])))
+
+
+def test_legal_destinations_opening_position():
+    game = create_game("../pieces", MockImgFactory())
+
+    assert game.legal_destinations(game.pos[(7, 1)][0]) == ((5, 0), (5, 2))   # knight hops the pawns
+    assert game.legal_destinations(game.pos[(6, 4)][0]) == ((4, 4), (5, 4))   # pawn double step
+    assert game.legal_destinations(game.pos[(7, 0)][0]) == ()                 # boxed-in rook
+    for p in game.pieces:
+        assert game.legal_destinations(p) == _brute_force(game, p)
+
+
+def test_legal_destinations_cached_until_occupancy_changes():
+    game = create_game("../pieces", MockImgFactory())
+    game._time_factor = 1_000_000_000
+    bishop, pawn = game.pos[(7, 2)][0], game.pos[(6, 3)][0]
+
+    first = game.legal_destinations(bishop)
+    assert first == () and game.legal_destinations(bishop) is first
+
+    game.user_input_queue.put(Command(game.game_time_ms(), pawn.id, "move", [(6, 3), (4, 3)]))
+    time.sleep(0.2)
+    game._run_game_loop(num_iterations=50, is_with_graphics=False)
+
+    assert pawn.current_cell() == (4, 3)
+    assert game.legal_destinations(bishop) == _brute_force(game, bishop)
+    assert game.legal_destinations(bishop)[0] == (2, 7)
+
+
+def test_legal_cache_forgets_captured_and_restored_pieces():
+    game = create_game("../pieces", MockImgFactory())
+    knight, pawn, queen = game.pos[(7, 1)][0], game.pos[(6, 4)][0], game.pos[(7, 3)][0]
+    for p in (knight, pawn, queen):
+        game.legal_destinations(p)
+
+    game._capture(queen, pawn, (6, 4))
+    assert pawn not in game._legal_cache and queen in game._legal_cache
+
+    knight.restore(knight.snapshot())
+    assert knight not in game._legal_cache
+    assert game.legal_destinations(knight) == _brute_force(game, knight)
+
+    game.legal_destinations(queen)
+    game._update_cell2piece_map()
+    assert not game._legal_cache
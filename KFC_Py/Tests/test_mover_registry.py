@@ -0,0 +1,79 @@
+import random
+
+import numpy as np
+
+from Board import Board
+from Command import Command
+from MoverRegistry import MoverRegistry
+from mock_img import MockImg
+from Physics import MovePhysics
+from Piece import Piece
+
+
+class _State:
+    def __init__(self, physics):
+        self.physics = physics
+
+
+def _movers(n, board, rng):
+    pieces = []
+    for i in range(n):
+        src = (rng.randrange(board.H_cells), rng.randrange(board.W_cells))
+        dst = src
+        while dst == src:
+            dst = (rng.randrange(board.H_cells), rng.randrange(board.W_cells))
+        phys = MovePhysics(board, rng.choice([0.5, 1.0, 3.0]))
+        phys.reset(Command(rng.randrange(0, 500), f"Q{i}", "move", [src, dst]))
+        pieces.append(Piece(f"Q{i}", _State(phys)))
+    return pieces
+
+
+def test_vectorized_step_matches_scalar_update():
+    board = Board(32, 32, 24, 24, MockImg())
+    rng = random.Random(1)
+    pieces = _movers(200, board, rng)
+    reg = MoverRegistry(board, capacity=4)   # forces a few re-allocations
+    for p in pieces:
+        reg.add(p)
+
+    twins = _movers(200, board, random.Random(1))
+    for now in (600, 1500, 4000, 9000, 30000):
+        reg.step(now)
+        for p, t in zip(pieces, twins):
+            t.state.physics.update(now)
+            np.testing.assert_allclose(p.state.physics.position_at(now), t.state.physics.get_pos_m())
+            assert p.state.physics.cell_at(now) == t.state.physics.get_curr_cell()
+
+
+def test_discard_keeps_remaining_rows_addressable():
+    board = Board(32, 32, 8, 8, MockImg())
+    pieces = _movers(5, board, random.Random(2))
+    reg = MoverRegistry(board)
+    for p in pieces:
+        reg.add(p)
+    reg.step(700)
+    before = {p: tuple(p.state.physics.position_at(700)) for p in pieces}
+
+    reg.discard(pieces[1])
+    reg.discard(pieces[4])
+    assert len(reg) == 3 and pieces[1] not in reg
+    assert pieces[1].state.physics._registry is None
+    for p in (pieces[0], pieces[2], pieces[3]):
+        assert tuple(p.state.physics.position_at(700)) == before[p]
+
+
+def test_update_keeps_its_position_when_the_registry_moves_on():
+    board = Board(32, 32, 8, 8, MockImg())
+    phys = MovePhysics(board, 1.0)
+    phys.reset(Command(0, "Q", "move", [(0, 0), (0, 7)]))
+    piece = Piece("Q", _State(phys))
+    reg = MoverRegistry(board)
+    reg.add(piece)
+    reg.step(1000)
+    phys.update(1000)
+    cell = phys.get_curr_cell()
+
+    reg.step(5000)                   # the row the update read from is overwritten
+    assert phys.get_curr_cell() == cell
+    reg.discard(piece)
+    assert phys.get_curr_cell() == cell
@@ -66,3 +66,40 @@ def test_moves_parsing_and_validation(tmp_path):
     # move with tag "can both" (empty suffix) always allowed
     assert mv.is_dst_cell_valid(0, 1)
     assert mv.is_dst_cell_valid(0, 1, dst_has_piece=True)
+
+
+def _arr_img(arr):
+    img = Img()
+    img.img = arr
+    return img
+
+
+def test_img_draw_on_blends_premultiplied_alpha():
+    rng = np.random.default_rng(1)
+    sprite = rng.integers(0, 256, (8, 8, 4), dtype=np.uint8)
+    sprite.setflags(write=False)                     # shared frames are read-only
+    board = rng.integers(0, 256, (16, 16, 4), dtype=np.uint8)
+    before = board.copy()
+
+    _arr_img(sprite).draw_on(_arr_img(board), 4, 2)
+
+    a = sprite[..., 3:4] / 255.0
+    expected = sprite[..., :3] * a + before[2:10, 4:12, :3] * (1 - a)
+    assert np.abs(board[2:10, 4:12, :3] - expected).max() <= 1
+    assert np.array_equal(board[:2], before[:2])      # outside the roi untouched
+
+
+def test_img_draw_on_bgr_board_copies_the_colour_channels():
+    rng = np.random.default_rng(2)
+    sprite = rng.integers(0, 256, (8, 8, 4), dtype=np.uint8)
+    board = rng.integers(0, 256, (16, 16, 3), dtype=np.uint8)
+    _arr_img(sprite).draw_on(_arr_img(board), 4, 2)
+    assert np.array_equal(board[2:10, 4:12], sprite[..., :3])
+
+
+def test_img_draw_on_opaque_sprite_is_a_copy():
+    sprite = np.full((4, 4, 3), 7, dtype=np.uint8)
+    board = np.zeros((8, 8, 4), dtype=np.uint8)
+    _arr_img(sprite).draw_on(_arr_img(board), 0, 0)
+    assert (board[:4, :4, :3] == 7).all() and (board[:4, :4, 3] == 255).all()
+    assert sprite.shape == (4, 4, 3)                 # source left as-is
@@ -0,0 +1,63 @@
+import time
+
+from Command import Command
+from GameFactory import create_game
+from GraphicsFactory import MockImgFactory
+from Occupancy import OccupancyIndex
+
+
+class _P:
+    def __init__(self, cell):
+        self.cell = cell
+
+    def current_cell(self):
+        return self.cell
+
+
+def test_index_tracks_cells_crowding_and_version():
+    a, b = _P((0, 0)), _P((1, 1))
+    idx = OccupancyIndex([a, b])
+    v = idx.version
+
+    assert idx[(0, 0)] == [a] and idx.cell_of(b) == (1, 1)
+    assert (2, 2) not in idx and idx.get((2, 2)) is None
+
+    assert not idx.place(a, (0, 0))          # no-op keeps the version
+    assert idx.version == v
+
+    assert idx.place(a, (1, 1))
+    assert (0, 0) not in idx                  # no empty buckets
+    assert idx.pieces_at((1, 1)) == (b, a)
+    assert idx.crowded == {(1, 1)}
+    assert idx.version > v
+
+    assert idx.remove(b)
+    assert idx.crowded == set() and idx.cell_of(b) is None
+    assert not idx.remove(b)
+
+
+def _snapshot(game):
+    return {cell: set(plist) for cell, plist in game.pos.items()}
+
+
+def test_incremental_index_matches_full_rebuild():
+    game = create_game("../pieces", MockImgFactory())
+    game._time_factor = 1_000_000_000
+    game._update_cell2piece_map()
+    pw = game.pos[(6, 0)][0]
+    pb = game.pos[(1, 1)][0]
+
+    game.user_input_queue.put(Command(game.game_time_ms(), pw.id, "move", [(6, 0), (4, 0)]))
+    game.user_input_queue.put(Command(game.game_time_ms(), pb.id, "move", [(1, 1), (3, 1)]))
+    time.sleep(0.3)
+    game._run_game_loop(num_iterations=100, is_with_graphics=False)
+    game.user_input_queue.put(Command(game.game_time_ms(), pw.id, "move", [(4, 0), (3, 1)]))
+    time.sleep(0.3)
+    game._run_game_loop(num_iterations=100, is_with_graphics=False)
+
+    assert pb not in game.pieces and game.pos.cell_of(pb) is None
+    incremental, version = _snapshot(game), game.pos.version
+    game._update_cell2piece_map()
+    assert incremental == _snapshot(game)
+    assert game.pos[(3, 1)] == [pw]
+    assert game.pos.version > version
@@ -73,6 +73,29 @@ def test_move_physics_full_cycle():
     assert phys.get_curr_cell() == (0, 2)
 
 
+def test_move_physics_closed_form_queries_and_cell_deadlines():
+    board = _board()
+    phys = MovePhysics(board, param=1.0)
+    phys.reset(Command(0, "P", "move", [(0, 0), (0, 3)]))
+
+    assert tuple(phys.position_at(1500)) == (1.5, 0.0)
+    assert phys.cell_at(9999) == (0, 3)          # clamped at the destination
+    assert phys.get_curr_cell() == (0, 0)        # queries don't advance the piece
+
+    seen, cell = [], (0, 0)
+    while True:
+        t = phys.next_deadline_ms()
+        # the deadline is the first whole ms at which the cell changes
+        assert phys.cell_at(t - 1) == cell
+        done = phys.update(t)
+        if done:
+            break
+        cell = phys.get_curr_cell()
+        seen.append(cell)
+    assert seen == [(0, 1), (0, 2), (0, 3)] and t == 3000
+    assert phys.get_curr_cell() == (0, 3)
+
+
 def test_jump_and_rest_physics():
     board = _board()
 
@@ -9,4 +9,157 @@ def test_pubsub():
     pubsub.subscribe("test_event", callback)
     pubsub.publish("test_event", {"key": "value"})
 
-    assert results == [{"key": "value"}]
\ No newline at end of file
+    assert results == [{"key": "value"}]
+
+def test_unsubscribe_and_isolated_buses():
+    from PubSub import PubSub
+
+    a, b, got = PubSub(), PubSub(), []
+    a.subscribe("capture", got.append)
+    b.publish("capture", "other match")
+    a.publish("capture", "mine")
+    assert got == ["mine"]
+
+    assert a.unsubscribe("capture", got.append) and not a.unsubscribe("capture", got.append)
+    a.publish("capture", "ignored")
+    assert got == ["mine"] and a.subscribers == {}
+
+
+def test_two_games_in_one_process_keep_separate_scores():
+    from Clock import VirtualClock
+    from Command import Command
+    from GameFactory import create_game
+    from GraphicsFactory import MockImgFactory
+
+    games = [create_game("../pieces", MockImgFactory(), headless=True, clock=VirtualClock()) for _ in range(2)]
+    first, second = games
+
+    def play(ms):
+        for _ in range(ms // 20):
+            first.clock.advance(20)
+            first._run_game_loop(num_iterations=1, is_with_graphics=False)
+
+    pw, pb = first.pos[(6, 0)][0], first.pos[(1, 1)][0]
+    first.user_input_queue.put(Command(0, pw.id, "move", [(6, 0), (4, 0)]))
+    first.user_input_queue.put(Command(0, pb.id, "move", [(1, 1), (3, 1)]))
+    play(15_000)
+    first.user_input_queue.put(Command(first.game_time_ms(), pw.id, "move", [(4, 0), (3, 1)]))
+    play(15_000)
+
+    assert pb not in first.pieces
+    assert first.score.get_points("white") == 1
+    assert second.score.get_points("white") == 0 and second.logger.get_moves("white") == []
+    assert len(first.pubsub.subscribers["capture"]) == len(second.pubsub.subscribers["capture"]) == 1
+
+
+def test_move_logger_resets_on_reset_event():
+    from MoveLogger import MoveLogger
+    from PubSub import PubSub
+
+    bus = PubSub()
+    logger = MoveLogger(bus)
+    logger.log_move("white", "P", "e2", "e4")
+    bus.publish("reset")
+    assert logger.get_moves("white") == []
+    assert bus.subscribers["reset"] == (logger.handle_reset,)
+
+
+def test_queued_overflow_policies_and_counters():
+    from PubSub import BLOCK, COALESCE, PubSub
+
+    bus, got = PubSub(), []
+    oldest = bus.subscribe_queued("move", got.append, maxsize=3, start_thread=False)
+    for i in range(5):
+        bus.publish("move", i)
+    assert (oldest.depth, oldest.dropped, oldest.high_water) == (3, 2, 3)
+    assert oldest.drain() == 3 and got == [2, 3, 4]
+
+    latest = bus.subscribe_queued("cursor", got.append, maxsize=8, overflow=COALESCE,
+                                  key=lambda d: d["player"], start_thread=False)
+    for x in range(3):
+        bus.publish("cursor", {"player": 1, "x": x})
+        bus.publish("cursor", {"player": 2, "x": x})
+    assert latest.coalesced == 4 and latest.drain() == 2
+    assert got[-2:] == [{"player": 1, "x": 2}, {"player": 2, "x": 2}]
+
+    import threading, time
+    blocking = bus.subscribe_queued("log", got.append, maxsize=1, overflow=BLOCK, start_thread=False)
+    bus.publish("log", "a")
+    t = threading.Thread(target=bus.publish, args=("log", "b"))
+    t.start()
+    time.sleep(0.05)
+    assert t.is_alive()                    # waits for room
+    blocking.drain()
+    t.join(1)
+    assert not t.is_alive() and blocking.drain() == 1 and got[-2:] == ["a", "b"]
+
+
+def test_queued_subscriber_isolates_slow_and_failing_callbacks():
+    import time
+    from PubSub import PubSub
+
+    bus, got = PubSub(), []
+
+    def slow(data):
+        time.sleep(0.05)
+        got.append(data)
+
+    def broken(data):
+        raise RuntimeError("boom")
+
+    slow_sub = bus.subscribe_queued("capture", slow)
+    broken_sub = bus.subscribe_queued("capture", broken)
+    t0 = time.perf_counter()
+    for i in range(4):
+        bus.publish("capture", i)          # neither blocks nor raises
+    assert time.perf_counter() - t0 < 0.05
+
+    slow_sub.close()
+    broken_sub.close()
+    assert got == [0, 1, 2, 3] and slow_sub.delivered == 4
+    assert broken_sub.errors == 4 and broken_sub.delivered == 0
+
+
+def test_queued_subscriber_drains_in_asyncio_loop():
+    import asyncio
+    from PubSub import PubSub
+
+    async def main():
+        bus, got = PubSub(), []
+
+        async def on_move(data):
+            got.append(data)
+
+        sub = bus.subscribe_queued("move", on_move, loop=asyncio.get_running_loop())
+        bus.publish("move", "e2e4")
+        bus.publish("move", "e7e5")
+        assert got == [] and sub.depth == 2
+        for _ in range(3):
+            await asyncio.sleep(0)
+        return got, sub.stats()
+
+    got, stats = asyncio.run(main())
+    assert got == ["e2e4", "e7e5"]
+    assert stats["delivered"] == 2 and stats["depth"] == 0
+
+
+def test_unsubscribe_and_clear_stop_queued_workers():
+    from PubSub import PubSub
+
+    bus, got = PubSub(), []
+    first = bus.subscribe_queued("move", got.append)
+    second = bus.subscribe_queued("capture", got.append)
+    bus.subscribe("capture", second)                        # twice on the bus
+    bus.publish("move", 1)
+
+    assert bus.unsubscribe("move", first)
+    first._thread.join(1)
+    assert not first._thread.is_alive() and got == [1]      # pending events still delivered
+
+    assert bus.unsubscribe("capture", second)
+    assert second._thread.is_alive()                        # still subscribed once
+    bus.clear()
+    second._thread.join(1)
+    assert not second._thread.is_alive()
+    bus.publish("capture", 2)
+    assert got == [1]
@@ -0,0 +1,81 @@
+import numpy as np
+
+from img import Img
+from Renderer import DirtyRectRenderer
+
+
+def _img(arr):
+    img = Img()
+    img.img = arr
+    return img
+
+
+class _CountingImg(Img):
+    draws = 0
+
+    def draw_on(self, other_img, x, y):
+        _CountingImg.draws += 1
+        super().draw_on(other_img, x, y)
+
+
+def _sprite(value, alpha=200):
+    spr = _CountingImg()
+    spr.img = np.full((8, 8, 4), value, dtype=np.uint8)
+    spr.img[..., 3] = alpha
+    return spr
+
+
+def _reference(background, sprites, decorations=()):
+    ref = _img(background.img.copy())
+    for _, x, y, spr in sprites:
+        Img.draw_on(spr, ref, x, y)
+    for x1, y1, x2, y2, color in decorations:
+        ref.draw_rect(x1, y1, x2, y2, color)
+    return ref.img
+
+
+def test_dirty_rect_frames_match_full_redraw():
+    rng = np.random.default_rng(3)
+    background = _img(rng.integers(0, 256, (48, 64, 3), dtype=np.uint8))
+    r = DirtyRectRenderer(background)
+    a0, a1, b = _sprite(10), _sprite(20), _sprite(250, alpha=255)
+
+    steps = [
+        ([("a", 0, 0, a0), ("b", 20, 8, b)], []),
+        ([("a", 4, 2, a0), ("b", 20, 8, b)], []),                       # a moves onto nothing
+        ([("a", 16, 6, a1), ("b", 20, 8, b)], []),                      # a overlaps b, new frame
+        ([("b", 20, 8, b)], [(30, 30, 40, 40, (0, 255, 0))]),           # a captured, cursor shown
+        ([("b", 20, 8, b)], [(32, 30, 42, 40, (0, 255, 0))]),           # cursor moves
+    ]
+    for sprites, decorations in steps:
+        frame = r.render(sprites, decorations)
+        assert np.array_equal(frame.img, _reference(background, sprites, decorations))
+
+
+def test_idle_frame_redraws_nothing():
+    background = _img(np.zeros((32, 32, 3), dtype=np.uint8))
+    r = DirtyRectRenderer(background)
+    sprites = [("a", 0, 0, _sprite(10)), ("b", 16, 16, _sprite(90))]
+
+    r.render(sprites)
+    _CountingImg.draws = 0
+    r.render(sprites)
+    assert _CountingImg.draws == 0
+
+    r.invalidate()
+    r.render(sprites)
+    assert _CountingImg.draws == 2
+
+
+def test_overlapping_translucent_sprites_match_full_redraw():
+    rng = np.random.default_rng(7)
+    background = _img(rng.integers(0, 256, (48, 64, 3), dtype=np.uint8))
+    r = DirtyRectRenderer(background)
+    still, mover = _sprite(40, alpha=128), _sprite(220, alpha=128)
+
+    # the mover crosses the edge of the still sprite, which only partly
+    # overlaps the dirty rects and must not be blended over itself
+    for x in range(0, 30, 3):
+        sprites = [("still", 12, 10, still), ("mover", x, 14, mover)]
+        frame = r.render(sprites)
+        assert np.array_equal(frame.img, _reference(background, sprites))
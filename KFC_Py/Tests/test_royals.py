@@ -0,0 +1,49 @@
+from unittest.mock import Mock
+
+from Board import Board
+from Command import Command
+from Game import Game
+from Graphics import Graphics
+from Moves import Moves
+from Physics import IdlePhysics, MovePhysics
+from Piece import Piece, color_code
+from Royals import RoyalIndex
+from State import State
+from img import Img
+
+
+def _piece(board, piece_id, src, dst=None):
+    physics = IdlePhysics(board) if dst is None else MovePhysics(board, 1.0)
+    state = State(Mock(spec=Moves), Mock(spec=Graphics), physics)
+    state.name = "idle" if dst is None else "move"
+    piece = Piece(piece_id, state)
+    piece.state.reset(Command(0, piece_id, state.name, [src] if dst is None else [src, dst]))
+    return piece
+
+
+def test_royal_index_tracks_kings_per_color():
+    board = Board(64, 64, 8, 8, Mock(spec=Img))
+    kw, kb, pw = _piece(board, "KW_1", (7, 4)), _piece(board, "KB_1", (0, 4)), _piece(board, "PW_1", (6, 0))
+    royals = RoyalIndex([kw, kb, pw])
+    assert not royals.is_decided() and royals.winner() is None
+
+    royals.discard(pw)
+    assert not royals.is_decided()
+    royals.discard(kw)
+    assert royals.is_decided() and royals.winner() == color_code("B")
+
+
+def test_king_capture_publishes_game_over_once():
+    board = Board(64, 64, 8, 8, Mock(spec=Img))
+    rook = _piece(board, "RW_1", (0, 0), (0, 4))
+    pieces = [rook, _piece(board, "KB_1", (0, 4)), _piece(board, "KW_1", (7, 4))]
+    game = Game(pieces, board, skip_validation=True)
+
+    published = []
+    game.pubsub.subscribe("game_over", lambda data: published.append(("game_over", data)))
+
+    game._resolve_collisions(game._update_pieces(4000), 4000)
+    assert game._is_win()
+    game._announce_win()     # the game loop's own check must not publish again
+
+    assert [d for e, d in published if e == "game_over"] == [{"winner": "White"}]
@@ -0,0 +1,81 @@
+from Clock import VirtualClock
+from Command import Command
+from GameFactory import create_game
+from GraphicsFactory import MockImgFactory
+from Piece import Piece
+from Scheduler import PhysicsScheduler
+
+
+class _FakePhysics:
+    def __init__(self, moving=False, deadline=None):
+        self.moving, self.deadline = moving, deadline
+
+    def is_moving(self):
+        return self.moving
+
+    def next_deadline_ms(self):
+        return self.deadline
+
+
+class _FakeState:
+    def __init__(self, physics):
+        self.physics = physics
+
+
+def _piece(name, **kw):
+    return Piece(name, _FakeState(_FakePhysics(**kw)))
+
+
+def test_scheduler_wakes_pieces_in_deadline_order():
+    s = PhysicsScheduler()
+    late, early, idle, mover = _piece("a", deadline=300), _piece("b", deadline=100), _piece("c"), _piece("d", moving=True)
+    for p in (late, early, idle, mover):
+        s.schedule(p)
+
+    assert list(s.moving) == [mover]
+    assert s.next_deadline_ms() == 100
+    assert s.due(50) == []
+    assert s.due(1000) == [early, late]
+    assert s.next_deadline_ms() is None
+
+
+def test_rescheduling_supersedes_old_deadline():
+    s = PhysicsScheduler()
+    p = _piece("a", deadline=100)
+    s.schedule(p)
+    p.state.physics.deadline = 500
+    s.schedule(p)
+
+    assert s.due(200) == []
+    assert s.due(500) == [p]
+    s.schedule(p)
+    s.remove(p)
+    assert s.due(10_000) == []
+
+
+def _play(game, ms, step_ms=100):
+    for _ in range(ms // step_ms):
+        game.clock.advance(step_ms)
+        game.tick()
+
+
+def test_idle_pieces_are_not_updated(monkeypatch):
+    game = create_game("../pieces", MockImgFactory(), headless=True, clock=VirtualClock())
+    game._update_cell2piece_map()
+
+    updated = []
+    orig = Piece.update
+    monkeypatch.setattr(Piece, "update", lambda self, now: (updated.append(self), orig(self, now)))
+
+    _play(game, 1000)
+    assert updated == []
+
+    pw = game.pos[(6, 0)][0]
+    game.user_input_queue.put(Command(game.game_time_ms(), pw.id, "move", [(6, 0), (4, 0)]))
+    _play(game, 20_000)              # the move, then the long rest after it
+
+    assert pw.current_cell() == (4, 0)
+    assert set(updated) == {pw}
+    # back to idle: nothing left to wake
+    assert pw.state.name.startswith("idle")
+    assert game.scheduler.is_idle() and game.scheduler.next_deadline_ms() is None
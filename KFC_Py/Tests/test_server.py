@@ -0,0 +1,143 @@
+import asyncio
+import struct
+
+from GameFactory import create_game
+from Server import LoopbackClient, MatchServer, PIECES_ROOT
+from Wire import SnapshotDecoder
+
+
+def _fast_game():
+    game = create_game(PIECES_ROOT, None, headless=True)
+    game._time_factor = 50          # a pawn's two-cell move takes a few ticks
+    return game
+
+
+def _cell_of(state, piece_id):
+    return next(tuple(p[1:3]) for p in state["pieces"] if p[0] == piece_id)
+
+
+def test_loopback_client_plays_one_of_several_matches():
+    async def scenario():
+        server = MatchServer(_fast_game, tick_ms=5)
+        port = await server.start()
+        first, second = server.create_match(), server.create_match()
+
+        player = await LoopbackClient.connect(port=port)
+        watcher = await LoopbackClient.connect(port=port)
+        joined = await player.join(first.id, "W")
+        assert joined == {"type": "joined", "match": first.id, "color": "W", "tick_ms": 5}
+        assert (await watcher.join(second.id))["type"] == "joined"
+
+        pawn = first.game.pos[(6, 0)][0].id
+        black = first.game.pos[(1, 0)][0].id
+        await player.command(black, "move", [(1, 0), (3, 0)])
+        refused = await player.wait_for(lambda m: m["type"] == "error")
+        assert "not yours" in refused["reason"]
+
+        await player.command(pawn, "move", [(6, 0), (4, 0)])
+        state = await player.wait_for(lambda m: m["type"] == "state" and _cell_of(m, pawn) == (4, 0))
+        assert state["match"] == first.id and state["winner"] is None
+
+        # the other match never saw that move
+        assert second.game.pos[(6, 0)] and (4, 0) not in second.game.pos
+        assert first.ticks > 0 and second.ticks > 0
+
+        await player.close()
+        await watcher.close()
+        await server.close()
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first.task.done() and second.task.done()
+    assert not first.game.pubsub.subscribers and not second.game.pubsub.subscribers
+
+
+def test_spectator_watches_through_the_binary_stream():
+    async def scenario():
+        server = MatchServer(_fast_game, tick_ms=5)
+        port = await server.start()
+        match = server.create_match()
+
+        player = await LoopbackClient.connect(port=port)
+        spectator = await LoopbackClient.connect(port=port)
+        await player.join(match.id, "W")
+        assert await spectator.watch(match.id) == {"type": "watching", "match": match.id, "tick_ms": 5}
+
+        decoder = SnapshotDecoder()
+        keyframe = decoder.decode(await spectator.wait_for(lambda m: isinstance(m, bytes)))
+        assert keyframe.keyframe and len(keyframe.pieces) == 32
+
+        pawn = match.game.pos[(6, 0)][0].id
+        await player.command(pawn, "move", [(6, 0), (4, 0)])
+
+        def arrived(msg):
+            if isinstance(msg, bytes):
+                return decoder.decode(msg).pieces[pawn].start_cell == (4, 0)
+            return False
+        await spectator.wait_for(arrived)
+        assert len(match.broadcaster.spectators) == 1
+
+        await spectator.close()
+        await player.close()
+        await server.close()
+
+    asyncio.run(scenario())
+
+
+def test_malformed_frames_get_an_error_reply():
+    async def scenario():
+        server = MatchServer(_fast_game, tick_ms=5)
+        port = await server.start()
+        match = server.create_match()
+
+        client = await LoopbackClient.connect(port=port)
+        for body in (b"[1]", b"\x01\x02binary"):
+            client.writer.write(struct.pack(">I", len(body)) + body)
+            reply = await client.wait_for(lambda m: isinstance(m, dict))
+            assert reply == {"type": "error", "reason": "expected a JSON object"}
+
+        # unhashable ids are refused, not looked up
+        for msg in ({"type": "join", "match": [1]}, {"type": "watch", "match": {"id": 1}}):
+            await client.send(msg)
+            assert (await client.wait_for(lambda m: True))["type"] == "error"
+        assert (await client.join(match.id, "W"))["type"] == "joined"
+        await client.send({"type": "command", "piece_id": [1], "cmd": "move", "params": []})
+        assert (await client.wait_for(lambda m: m["type"] == "error"))["reason"] == "bad piece_id [1]"
+
+        # the connection survived
+        assert (await client.join(match.id, "W"))["type"] == "joined"
+        await client.close()
+        await server.close()
+
+    asyncio.run(scenario())
+
+
+def test_finished_match_is_removed_and_its_clients_let_go():
+    async def scenario():
+        server = MatchServer(_fast_game, tick_ms=5)
+        port = await server.start()
+        match = server.create_match()
+
+        player = await LoopbackClient.connect(port=port)
+        spectator = await LoopbackClient.connect(port=port)
+        await player.join(match.id, "W")
+        await spectator.watch(match.id)
+
+        game = match.game
+        white_king, black_king = sorted((p for p in game.pieces if p.desc.royal), key=lambda p: p.desc.color)
+        game._capture(white_king, black_king, black_king.current_cell())
+        final = await player.wait_for(lambda m: m["type"] == "state" and m["winner"] is not None)
+        assert final["winner"] == "White"
+        # the server hangs up on everyone once the match is over
+        await asyncio.wait_for(player.reader.read(), 5)
+        await asyncio.wait_for(spectator.reader.read(), 5)
+        assert player.reader.at_eof() and spectator.reader.at_eof()
+
+        await match.task
+        assert match.id not in server.matches and not match.clients
+        assert not game.pubsub.subscribers                     # broadcaster and match unsubscribed
+        await player.close()
+        await spectator.close()
+        await server.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,53 @@
+import os, pathlib, shutil
+import numpy as np
+import pytest
+
+from GraphicsFactory import ImgFactory
+from SpriteDiskCache import SpriteDiskCache
+from img import Img
+
+SPRITE = pathlib.Path(__file__).parent.parent.parent / "pieces" / "PW" / "states" / "idle" / "sprites" / "1.png"
+
+
+@pytest.fixture
+def sprite(tmp_path):
+    dst = tmp_path / "src" / "1.png"
+    dst.parent.mkdir()
+    shutil.copy(SPRITE, dst)
+    return dst
+
+
+def _no_decode(*_, **__):
+    raise AssertionError("sprite should come from the disk cache")
+
+
+def test_warm_start_skips_decoding(tmp_path, sprite, monkeypatch):
+    cache = SpriteDiskCache(tmp_path / "cache")
+
+    ImgFactory.clear_cache()
+    cold = ImgFactory(disk_cache=cache)(sprite, (32, 32))
+    assert cache.misses == 1 and len(list(cache.root.glob("*.npy"))) == 1
+
+    ImgFactory.clear_cache()                 # simulate a fresh process
+    monkeypatch.setattr(Img, "read", _no_decode)
+    warm = ImgFactory(disk_cache=tmp_path / "cache")(sprite, (32, 32))
+
+    assert np.array_equal(cold.img, warm.img)
+    assert warm.img.shape[:2] == (32, 32)
+
+
+def test_changed_source_invalidates_entry(tmp_path, sprite):
+    cache = SpriteDiskCache(tmp_path / "cache")
+    interp = ImgFactory.interpolation
+    pixels = Img().read(sprite, (16, 16)).img
+
+    cache.put(sprite, (16, 16), False, interp, pixels)
+    assert cache.get(sprite, (16, 16), False, interp) is not None
+    assert cache.get(sprite, (32, 32), False, interp) is None   # size is part of the key
+
+    st = os.stat(sprite)
+    os.utime(sprite, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert cache.get(sprite, (16, 16), False, interp) is None
+
+    cache.put(sprite, (16, 16), False, interp, pixels)
+    assert len(list(cache.root.glob("*.npy"))) == 1              # stale entry dropped
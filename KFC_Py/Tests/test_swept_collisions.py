@@ -0,0 +1,87 @@
+from unittest.mock import Mock
+
+from Board import Board
+from Collisions import Presence, SweptCollisions
+from Command import Command
+from Game import Game
+from Graphics import Graphics
+from Moves import Moves
+from Physics import IdlePhysics, MovePhysics
+from Piece import Piece
+from State import State
+from img import Img
+
+
+def _board():
+    return Board(64, 64, 8, 8, Mock(spec=Img))
+
+
+def _piece(board, piece_id, t_ms, src, dst=None):
+    graphics = Mock(spec=Graphics)
+    physics = IdlePhysics(board) if dst is None else MovePhysics(board, 1.0)
+    state = State(Mock(spec=Moves), graphics, physics)
+    state.name = "idle" if dst is None else "move"
+    piece = Piece(piece_id, state)
+    piece.state.reset(Command(t_ms, piece_id, state.name, [src] if dst is None else [src, dst]))
+    return piece
+
+
+def _swapping_rooks():
+    """White rook (0,0)->(0,3) at t=0, black rook (0,3)->(0,0) 1 ms later."""
+    board = _board()
+    white = _piece(board, "RW_1", 0, (0, 0), (0, 3))
+    black = _piece(board, "RB_1", 1, (0, 3), (0, 0))
+    return Game([white, black], board, skip_validation=True), white, black
+
+
+def _tick(game, now_ms):
+    game._resolve_collisions(game._update_pieces(now_ms), now_ms)
+
+
+def test_contacts_report_first_shared_cell_in_time_order():
+    board = _board()
+    a = Presence.of(_piece(board, "RW_1", 0, (0, 0), (0, 3)))
+    b = Presence.of(_piece(board, "RB_1", 1, (0, 3), (0, 0)))
+    hashed = SweptCollisions()
+    for pr in (a, b):
+        for cell, t_in, t_out in pr.piece.state.physics.cell_intervals(0, 2900):
+            hashed.add_segment(pr, cell, t_in, t_out)
+
+    contacts = hashed.contacts(0, 2900)
+    assert [(c.t_ms, c.cell) for c in contacts] == [(1500, (0, 2))]
+    assert {pr.piece for pr in contacts[0].group} == {a.piece, b.piece}
+
+
+def test_pieces_passing_within_one_tick_still_collide():
+    game, white, black = _swapping_rooks()
+    # both movers are past each other by now – a per-tick snapshot sees no overlap
+    assert white.state.physics.cell_at(2900) == (0, 3)
+    assert black.state.physics.cell_at(2900) == (0, 0)
+
+    _tick(game, 2900)
+    # the later mover wins, at the first cell they shared
+    assert game.pieces == [black]
+    assert game.pos.cell_of(white) is None and white not in game.movers
+
+
+def test_outcome_does_not_depend_on_tick_length():
+    coarse, *_ = _swapping_rooks()
+    _tick(coarse, 2900)
+
+    fine, *_ = _swapping_rooks()
+    for now in range(16, 2900, 16):
+        _tick(fine, now)
+    _tick(fine, 2900)
+
+    assert [p.id for p in fine.pieces] == [p.id for p in coarse.pieces] == ["RB_1"]
+
+
+def test_mover_sweeping_over_a_standing_enemy_captures_it():
+    board = _board()
+    rook = _piece(board, "RW_1", 0, (0, 0), (0, 3))
+    pawn = _piece(board, "PB_1", 0, (0, 2))
+    game = Game([rook, pawn], board, skip_validation=True)
+
+    _tick(game, 2900)
+    # the moving rook is the winner whenever it shares the pawn's cell
+    assert game.pieces == [rook]
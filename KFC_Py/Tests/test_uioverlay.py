@@ -11,3 +11,19 @@ def test_draw_overlay_runs():
     logger.log_move("black", "Pawn2", "e7", "e5")
     output = overlay.draw_overlay(frame)
     assert output.shape == frame.shape
+
+
+def test_overlay_panels_are_cached_until_invalidated():
+    logger = MoveLogger()
+    scoreboard = Scoreboard()
+    overlay = UIOverlay(logger, scoreboard)
+    frame = np.zeros((720, 1280, 3), dtype=np.uint8)
+
+    first = overlay.draw_overlay(frame.copy())
+    logger.log_move("white", "P", (6, 0), (4, 0))
+    assert np.array_equal(overlay.draw_overlay(frame.copy()), first)   # no event yet
+
+    overlay.invalidate({"piece": "P"})
+    changed = overlay.draw_overlay(frame.copy())
+    assert not np.array_equal(changed, first)
+    assert np.array_equal(changed[301:], frame[301:])                  # only the panels are touched
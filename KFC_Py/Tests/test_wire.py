@@ -0,0 +1,99 @@
+import pytest
+
+from Clock import VirtualClock
+from Command import Command
+from GameFactory import create_game
+from GraphicsFactory import MockImgFactory
+from Wire import (DELTA, KEYFRAME, WIRE_VERSION, PieceRecord, SnapshotDecoder, SnapshotEncoder,
+                  WireError, decode_command, encode_command, message_kind)
+
+
+def _game():
+    return create_game("../pieces", MockImgFactory(), headless=True, clock=VirtualClock())
+
+
+def _board(game):
+    return {p.id: PieceRecord.of(p) for p in game.pieces}
+
+
+def _step(game, ms=20):
+    game.clock.advance(ms)
+    game.tick()
+
+
+def test_command_roundtrip_is_compact():
+    for cmd in (Command(123456, "PW_(6, 0)", "move", [(6, 0), (4, 0)]),
+                Command(7, "KB_(0, 4)", "jump", [(0, 4)]),
+                Command(0, "QW_(7, 3)", "castle", [])):
+        buf = encode_command(cmd)
+        assert message_kind(buf) == 1
+        back = decode_command(buf)
+        assert (back.timestamp, back.piece_id, back.type) == (cmd.timestamp, cmd.piece_id, cmd.type)
+        assert [tuple(c) for c in back.params] == [tuple(c) for c in cmd.params]
+    assert len(encode_command(Command(123456, "PW_(6, 0)", "move", [(6, 0), (4, 0)]))) < 24
+
+
+def test_rejects_other_versions_and_bad_params():
+    buf = bytearray(encode_command(Command(1, "PW_1", "move", [(6, 0), (5, 0)])))
+    buf[0] = WIRE_VERSION + 1
+    with pytest.raises(WireError):
+        decode_command(bytes(buf))
+    with pytest.raises(WireError):
+        encode_command(Command(1, "PW_1", "move", ["e2", "e4"]))
+
+
+def test_keyframe_then_deltas_rebuild_the_board():
+    game = _game()
+    enc, dec = SnapshotEncoder(), SnapshotDecoder()
+
+    first = enc.encode(game.pieces, game.game_time_ms())
+    assert message_kind(first) == KEYFRAME                # nothing acknowledged yet
+    frame = dec.decode(first)
+    assert frame.keyframe and frame.pieces == _board(game)
+    enc.ack(frame.seq)
+
+    game.user_input_queue.put(Command(game.game_time_ms(), "PW_(6, 4)", "move", [(6, 4), (4, 4)]))
+    _step(game)
+    buf = enc.encode(game.pieces, game.game_time_ms())
+    assert message_kind(buf) == DELTA
+    assert len(buf) < 40                                    # one piece changed, not the whole board
+    frame = dec.decode(buf)
+    assert frame.pieces == _board(game) and frame.pieces["PW_(6, 4)"].state == "move"
+    enc.ack(frame.seq)
+
+    # once that is acknowledged, a tick in which nothing changed costs only the delta header
+    _step(game)
+    assert len(enc.encode(game.pieces, game.game_time_ms())) < 20
+
+
+def test_unacknowledged_deltas_stay_relative_to_the_last_ack():
+    game = _game()
+    enc, dec = SnapshotEncoder(), SnapshotDecoder()
+    enc.ack(dec.decode(enc.encode(game.pieces, 0)).seq)
+
+    game.user_input_queue.put(Command(game.game_time_ms(), "PW_(6, 0)", "move", [(6, 0), (5, 0)]))
+    _step(game)
+    lost = enc.encode(game.pieces, game.game_time_ms())      # never reaches the client
+    _step(game)
+    frame = dec.decode(enc.encode(game.pieces, game.game_time_ms()))
+    assert frame.seq == enc.seq and frame.pieces == _board(game)
+    assert message_kind(lost) == DELTA
+
+
+def test_captured_pieces_are_removed_from_the_decoded_board():
+    game = _game()
+    enc, dec = SnapshotEncoder(), SnapshotDecoder()
+    enc.ack(dec.decode(enc.encode(game.pieces, 0)).seq)
+
+    pawn = game.piece_by_id["PB_(1, 0)"]
+    game.pieces.remove(pawn)
+    frame = dec.decode(enc.encode(game.pieces, 0))
+    assert "PB_(1, 0)" not in frame.pieces and frame.pieces == _board(game)
+
+
+def test_delta_on_a_frame_the_decoder_never_saw_is_refused():
+    game = _game()
+    enc = SnapshotEncoder()
+    enc.ack(SnapshotDecoder().decode(enc.encode(game.pieces, 0)).seq)
+    with pytest.raises(WireError):
+        SnapshotDecoder().decode(enc.encode(game.pieces, 0))
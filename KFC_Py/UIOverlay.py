@@ -1,36 +1,71 @@
 import cv2
+import numpy as np
+
+PANEL_W, PANEL_H = 200, 300
+
 
 class UIOverlay:
+    """Side panels with each player's last moves and points.
+
+    The panels are rasterised once into cached images and only re-rendered
+    after ``invalidate`` – subscribed to the ``move``/``capture``/``game_over``
+    events by *Game* – so a normal frame is just two array copies.
+    """
+
     def __init__(self, logger, board_score):
         self.scoreboard = board_score
         self.logger = logger
         self.font = cv2.FONT_HERSHEY_SIMPLEX
-    def draw_overlay(self, frame):
+        self._panels = None      # (left, right) cached layers
+        self._panels_key = None  # frame geometry they were rendered for
+
+    def invalidate(self, data=None):
+        """Pubsub callback: content changed, re-render on the next frame."""
+        self._panels = None
+
+    def _render_panels(self, frame):
+        H, W = frame.shape[:2]
+        h = min(PANEL_H + 1, H)
+        x2 = W - PANEL_W
+        extra = frame.shape[2:]
+
         white_moves = self.logger.get_moves("white")[-10:]
         black_moves = self.logger.get_moves("black")[-10:]
         white_pts = self.scoreboard.get_points("white")
         black_pts = self.scoreboard.get_points("black")
 
         # רקע לפאנל הלבן
-        cv2.rectangle(frame, (0, 0), (200, 300), (50, 50, 50), -1)
+        left = np.zeros((h, min(PANEL_W + 1, W)) + extra, dtype=frame.dtype)
+        cv2.rectangle(left, (0, 0), (PANEL_W, PANEL_H), (50, 50, 50), -1)
 
         # פאנל הלבן (שמאל)
         x, y = 10, 30
-        cv2.putText(frame, f"White Points: {white_pts}", (x, y + 220), self.font, 0.6, (255,255,255), 2)
+        cv2.putText(left, f"White Points: {white_pts}", (x, y + 220), self.font, 0.6, (255,255,255), 2)
         for i, move in enumerate(white_moves):
-            cv2.putText(frame, move, (x, y + i*20), self.font, 0.5, (255,255,255), 1)
-        
+            cv2.putText(left, move, (x, y + i*20), self.font, 0.5, (255,255,255), 1)
+
         # רקע לפאנל השחור
-        x2 = frame.shape[1] - 200
-        cv2.rectangle(frame, (x2, 0), (frame.shape[1], 300), (200, 200, 200), -1)
+        right = np.zeros((h, W - x2) + extra, dtype=frame.dtype)
+        cv2.rectangle(right, (0, 0), (PANEL_W, PANEL_H), (200, 200, 200), -1)
 
         # פאנל השחור (ימין)
         y2 = 30
-        cv2.putText(frame, f"Black Points: {black_pts}", (x2 + 10, y2 + 220), self.font, 0.6, (0,0,0), 2)
+        cv2.putText(right, f"Black Points: {black_pts}", (10, y2 + 220), self.font, 0.6, (0,0,0), 2)
 
         for i, move in enumerate(black_moves):
-            cv2.putText(frame, move, (x2 + 10, y2 + i*20), self.font, 0.5, (0,0,0), 1)
-        
+            cv2.putText(right, move, (10, y2 + i*20), self.font, 0.5, (0,0,0), 1)
+
+        return left, right
+
+    def draw_overlay(self, frame):
+        key = (frame.shape, frame.dtype)
+        if self._panels is None or self._panels_key != key:
+            self._panels = self._render_panels(frame)
+            self._panels_key = key
+
+        left, right = self._panels
+        frame[:left.shape[0], :left.shape[1]] = left
+        frame[:right.shape[0], frame.shape[1] - right.shape[1]:] = right
         return frame
 
     # def draw_overlay(self, frame):
@@ -0,0 +1,406 @@
+# Wire.py
+"""Compact, versioned binary encoding for commands and board snapshots.
+
+Every message starts with two bytes: the wire version and the message kind.
+Integers are big-endian; cells are one byte per coordinate (``0xFF`` for
+"no cell"); times are unsigned 32-bit game milliseconds.
+
+COMMAND    timestamp, command type, piece id, cells
+KEYFRAME   the whole board: every piece's slot, id, descriptor, state id,
+           start time and start/end cells, plus the state-name table
+DELTA      only the pieces that differ from an earlier frame the receiver
+           acknowledged (``base``): changed, added and removed slots
+
+Piece ids and state names travel once, in a keyframe or when a piece is
+added; afterwards a piece is its two-byte slot and a state is one byte, so
+a tick in which one piece started moving costs a few tens of bytes instead
+of the whole board.  Slots and state ids are never reused within a stream,
+which keeps a delta valid against any acknowledged frame.
+"""
+from __future__ import annotations
+
+import struct
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from Command import Command
+from Piece import Piece, PieceDescriptor, descriptor_of
+
+WIRE_VERSION = 1
+
+# message kinds
+COMMAND = 1
+KEYFRAME = 2
+DELTA = 3
+
+Cell = Tuple[int, int]
+
+COMMAND_TYPES = ("move", "jump", "idle", "done")   # everything else is sent inline
+_INLINE = 0xFF
+_NO_CELL = 0xFF
+_ADDED = 0xFE       # delta entry tags, in place of a state id
+_REMOVED = 0xFF
+MAX_STATES = 0xFE
+
+_HEAD = struct.Struct(">BB")             # version, kind
+_CMD = struct.Struct(">IBB")             # timestamp, type id, cell count
+_KEY = struct.Struct(">IIBH")            # seq, t_ms, state names, pieces
+_DELTA = struct.Struct(">IIIH")          # seq, base seq, t_ms, entries
+_SLOT = struct.Struct(">HB")             # slot, state id or tag
+_DESC = struct.Struct(">BBB")            # color, kind, flags
+_RUNTIME = struct.Struct(">IBBBB")       # start_ms, start cell, end cell
+_CELL = struct.Struct(">BB")
+_U8 = struct.Struct(">B")
+
+
+class WireError(ValueError):
+    """A message that is malformed, of another version, or refers to
+    slots / state ids the receiver never saw."""
+
+
+@dataclass(frozen=True)
+class PieceRecord:
+    """A piece as it travels on the wire."""
+    id: str
+    desc: PieceDescriptor
+    state: str
+    start_ms: int
+    start_cell: Optional[Cell]
+    end_cell: Optional[Cell]
+
+    @classmethod
+    def of(cls, piece: Piece) -> "PieceRecord":
+        rt = piece.snapshot()
+        return cls(piece.id, descriptor_of(piece), rt.state, int(rt.start_ms), rt.start_cell, rt.end_cell)
+
+
+@dataclass(frozen=True)
+class Frame:
+    """A decoded keyframe or delta: the whole board as the sender saw it."""
+    seq: int
+    t_ms: int
+    pieces: Dict[str, PieceRecord]
+    keyframe: bool
+
+
+# ---------------------------------------------------------------------------
+#                               PRIMITIVES
+# ---------------------------------------------------------------------------
+
+def _pack_str(s: str) -> bytes:
+    raw = s.encode("utf-8")
+    if len(raw) > 0xFF:
+        raise WireError(f"string of {len(raw)} bytes is too long: {s[:20]!r}...")
+    return _U8.pack(len(raw)) + raw
+
+
+def _unpack_str(buf: bytes, off: int) -> Tuple[str, int]:
+    (n,) = _U8.unpack_from(buf, off)
+    off += 1
+    if off + n > len(buf):
+        raise WireError("truncated string")
+    return buf[off:off + n].decode("utf-8"), off + n
+
+
+def _cell(cell: Optional[Cell]) -> Cell:
+    if cell is None:
+        return _NO_CELL, _NO_CELL
+    r, c = cell
+    if not (0 <= r < _NO_CELL and 0 <= c < _NO_CELL):
+        raise WireError(f"cell {cell} does not fit the wire format")
+    return r, c
+
+
+def _uncell(r: int, c: int) -> Optional[Cell]:
+    return None if r == _NO_CELL else (r, c)
+
+
+def _check_head(buf: bytes, kind: int):
+    if len(buf) < _HEAD.size:
+        raise WireError("empty message")
+    version, got = _HEAD.unpack_from(buf)
+    if version != WIRE_VERSION:
+        raise WireError(f"wire version {version} is not supported (expected {WIRE_VERSION})")
+    if got != kind:
+        raise WireError(f"expected message kind {kind}, got {got}")
+
+
+def message_kind(buf: bytes) -> int:
+    """COMMAND, KEYFRAME or DELTA – for routing a message before decoding it."""
+    if len(buf) < _HEAD.size:
+        raise WireError("empty message")
+    version, kind = _HEAD.unpack_from(buf)
+    if version != WIRE_VERSION:
+        raise WireError(f"wire version {version} is not supported (expected {WIRE_VERSION})")
+    return kind
+
+
+def is_empty_delta(buf: bytes) -> bool:
+    """A delta in which nothing changed – the receiver may as well skip it."""
+    return message_kind(buf) == DELTA and _DELTA.unpack_from(buf, _HEAD.size)[3] == 0
+
+
+# ---------------------------------------------------------------------------
+#                               COMMANDS
+# ---------------------------------------------------------------------------
+
+def encode_command(cmd: Command) -> bytes:
+    try:
+        type_id = COMMAND_TYPES.index(cmd.type)
+    except ValueError:
+        type_id = _INLINE
+    parts = [_HEAD.pack(WIRE_VERSION, COMMAND), _CMD.pack(int(cmd.timestamp), type_id, len(cmd.params))]
+    if type_id == _INLINE:
+        parts.append(_pack_str(cmd.type))
+    parts.append(_pack_str(cmd.piece_id))
+    for cell in cmd.params:
+        try:
+            parts.append(_CELL.pack(*_cell(tuple(cell))))
+        except (TypeError, ValueError, struct.error):
+            raise WireError(f"command param {cell!r} is not a cell") from None
+    return b"".join(parts)
+
+
+def decode_command(buf: bytes) -> Command:
+    _check_head(buf, COMMAND)
+    try:
+        timestamp, type_id, n = _CMD.unpack_from(buf, _HEAD.size)
+        off = _HEAD.size + _CMD.size
+        if type_id == _INLINE:
+            cmd_type, off = _unpack_str(buf, off)
+        elif type_id < len(COMMAND_TYPES):
+            cmd_type = COMMAND_TYPES[type_id]
+        else:
+            raise WireError(f"unknown command type id {type_id}")
+        piece_id, off = _unpack_str(buf, off)
+        params = []
+        for _ in range(n):
+            params.append(_CELL.unpack_from(buf, off))
+            off += _CELL.size
+    except struct.error as e:
+        raise WireError(f"truncated command: {e}") from None
+    return Command(timestamp, piece_id, cmd_type, params)
+
+
+# ---------------------------------------------------------------------------
+#                               SNAPSHOTS
+# ---------------------------------------------------------------------------
+
+Runtime = Tuple[str, int, Optional[Cell], Optional[Cell]]     # state, start_ms, start cell, end cell
+
+
+def _pack_runtime(rt: Runtime) -> bytes:
+    return _RUNTIME.pack(rt[1], *_cell(rt[2]), *_cell(rt[3]))
+
+
+def _pack_full(slot: int, state_id: int, piece_id: str, desc: PieceDescriptor, rt: Runtime,
+               tag: Optional[int] = None) -> bytes:
+    # a piece the receiver may not know yet: id and descriptor travel along
+    head = _SLOT.pack(slot, state_id) if tag is None else _SLOT.pack(slot, tag) + _U8.pack(state_id)
+    return b"".join((head, _pack_str(piece_id), _DESC.pack(desc.color, ord(desc.kind), desc.flags),
+                     _pack_runtime(rt)))
+
+
+class SnapshotEncoder:
+    """Server side of one snapshot stream (one per receiver).
+
+    ``encode`` returns a delta against the newest frame the receiver
+    acknowledged with ``ack``, or a keyframe when there is no usable base
+    yet.  Frames sent but not acknowledged are kept (up to *history*) so an
+    ack for any of them can become the next base.  Boards are kept as plain
+    runtime tuples per slot, so an unchanged piece costs one comparison.
+    """
+
+    def __init__(self, history: int = 64):
+        self.seq = 0
+        self.history = history
+        self._slots: Dict[str, int] = {}                    # piece id -> slot, never reused
+        self._roster: List[Tuple[str, PieceDescriptor]] = []    # slot -> (piece id, descriptor)
+        self._state_ids: Dict[str, int] = {}                # state name -> id, never reused
+        self._sent: Dict[int, Tuple[Dict[int, Runtime], int, int]] = {}   # seq -> (board, state names known, t_ms)
+        self._base: Optional[int] = None
+
+    @property
+    def acked(self) -> Optional[int]:
+        return self._base
+
+    def ack(self, seq: int):
+        """The receiver decoded frame *seq*; later deltas may build on it."""
+        if seq not in self._sent or (self._base is not None and seq <= self._base):
+            return
+        self._base = seq
+        for old in [s for s in self._sent if s < seq]:
+            del self._sent[old]
+
+    # ---------------- encoding ----------------------------------------
+    def _new_slot(self, piece: Piece) -> int:
+        slot = self._slots[piece.id] = len(self._roster)
+        if slot > 0xFFFF:
+            raise WireError("too many pieces for one stream")
+        self._roster.append((piece.id, descriptor_of(piece)))
+        # name every state the piece can reach now, so deltas rarely need a new one
+        for name in sorted(piece.states):
+            self._state_id(name)
+        return slot
+
+    def _board(self, pieces: Iterable[Piece]) -> Dict[int, Runtime]:
+        board, slots = {}, self._slots
+        for p in pieces:
+            slot = slots.get(p.id)
+            if slot is None:
+                slot = self._new_slot(p)
+            st = p.state
+            phys = st.physics
+            board[slot] = (st.name, int(phys.get_start_ms()), phys.get_start_cell(), phys.get_end_cell())
+        return board
+
+    def _state_id(self, name: str) -> int:
+        sid = self._state_ids.get(name)
+        if sid is None:
+            if len(self._state_ids) >= MAX_STATES:
+                raise WireError("too many state names for one stream")
+            sid = self._state_ids[name] = len(self._state_ids)
+        return sid
+
+    def _remember(self, board: Dict[int, Runtime], t_ms: int) -> int:
+        self.seq += 1
+        self._sent[self.seq] = (board, len(self._state_ids), int(t_ms))
+        if len(self._sent) > self.history:
+            # drop the oldest unacknowledged frame, never the base
+            for old in sorted(self._sent):
+                if old != self._base:
+                    del self._sent[old]
+                    break
+        return self.seq
+
+    def keyframe(self, pieces: Iterable[Piece], t_ms: int) -> bytes:
+        board = self._board(pieces)
+        for rt in board.values():
+            self._state_id(rt[0])
+        return self._keyframe_of(self._remember(board, t_ms))
+
+    def current_keyframe(self) -> bytes:
+        """The newest frame again, as a keyframe under the same seq – a
+        receiver that joins late (or was cut off) picks the stream up from
+        it and can apply the deltas that follow."""
+        if not self._sent:
+            raise WireError("nothing encoded yet")
+        return self._keyframe_of(self.seq)
+
+    def _keyframe_of(self, seq: int) -> bytes:
+        board, _, t_ms = self._sent[seq]
+        names = sorted(self._state_ids, key=self._state_ids.get)
+        parts = [_HEAD.pack(WIRE_VERSION, KEYFRAME), _KEY.pack(seq, t_ms, len(names), len(board))]
+        parts.extend(_pack_str(name) for name in names)
+        parts.extend(_pack_full(slot, self._state_ids[rt[0]], *self._roster[slot], rt)
+                     for slot, rt in board.items())
+        return b"".join(parts)
+
+    def encode(self, pieces: Iterable[Piece], t_ms: int) -> bytes:
+        """Delta against the acknowledged base, or a keyframe if there is none."""
+        if self._base is None:
+            return self.keyframe(pieces, t_ms)
+        base, names_known, _ = self._sent[self._base]
+        board = self._board(pieces)
+        entries = []
+        for slot, rt in board.items():
+            old = base.get(slot)
+            if old == rt:
+                continue
+            sid = self._state_id(rt[0])
+            if sid >= names_known:
+                # the receiver has not acknowledged this state's name yet;
+                # a keyframe resends the whole (append-only) table
+                return self.keyframe(pieces, t_ms)
+            if old is None:
+                entries.append(_pack_full(slot, sid, *self._roster[slot], rt, tag=_ADDED))
+            else:
+                entries.append(_SLOT.pack(slot, sid) + _pack_runtime(rt))
+        entries.extend(_SLOT.pack(slot, _REMOVED) for slot in base if slot not in board)
+        seq = self._remember(board, t_ms)
+        return b"".join([_HEAD.pack(WIRE_VERSION, DELTA), _DELTA.pack(seq, self._base, int(t_ms), len(entries)),
+                         *entries])
+
+
+class SnapshotDecoder:
+    """Client side of a snapshot stream: turns keyframes and deltas back
+    into whole boards.  Acknowledge ``frame.seq`` to the sender after each
+    ``decode``; boards older than the base of the newest delta are dropped.
+    """
+
+    def __init__(self, history: int = 64):
+        self.history = history
+        self._names: List[str] = []
+        self._descs: Dict[Tuple[int, int, int], PieceDescriptor] = {}
+        self._boards: Dict[int, Dict[int, PieceRecord]] = {}
+
+    def decode(self, buf: bytes) -> Frame:
+        kind = message_kind(buf)
+        try:
+            if kind == KEYFRAME:
+                return self._keyframe(buf)
+            if kind == DELTA:
+                return self._delta(buf)
+        except (struct.error, IndexError, UnicodeDecodeError) as e:
+            raise WireError(f"malformed frame: {e}") from None
+        raise WireError(f"not a snapshot message (kind {kind})")
+
+    def _full(self, buf: bytes, off: int, state_id: int) -> Tuple[PieceRecord, int]:
+        piece_id, off = _unpack_str(buf, off)
+        key = _DESC.unpack_from(buf, off)
+        desc = self._descs.get(key)
+        if desc is None:
+            desc = self._descs[key] = PieceDescriptor(key[0], chr(key[1]), key[2])
+        return self._runtime(buf, off + _DESC.size, piece_id, desc, state_id)
+
+    def _runtime(self, buf: bytes, off: int, piece_id: str, desc: PieceDescriptor,
+                 state_id: int) -> Tuple[PieceRecord, int]:
+        start_ms, sr, sc, er, ec = _RUNTIME.unpack_from(buf, off)
+        if state_id >= len(self._names):
+            raise WireError(f"unknown state id {state_id}")
+        rec = PieceRecord(piece_id, desc, self._names[state_id], start_ms, _uncell(sr, sc), _uncell(er, ec))
+        return rec, off + _RUNTIME.size
+
+    def _keep(self, seq: int, t_ms: int, board: Dict[int, PieceRecord], keyframe: bool) -> Frame:
+        self._boards[seq] = board
+        while len(self._boards) > self.history:
+            del self._boards[min(self._boards)]
+        return Frame(seq, t_ms, {rec.id: rec for rec in board.values()}, keyframe)
+
+    def _keyframe(self, buf: bytes) -> Frame:
+        seq, t_ms, n_names, n_pieces = _KEY.unpack_from(buf, _HEAD.size)
+        off = _HEAD.size + _KEY.size
+        names = []
+        for _ in range(n_names):
+            name, off = _unpack_str(buf, off)
+            names.append(name)
+        self._names = names
+        board = {}
+        for _ in range(n_pieces):
+            slot, state_id = _SLOT.unpack_from(buf, off)
+            board[slot], off = self._full(buf, off + _SLOT.size, state_id)
+        return self._keep(seq, t_ms, board, keyframe=True)
+
+    def _delta(self, buf: bytes) -> Frame:
+        seq, base_seq, t_ms, n = _DELTA.unpack_from(buf, _HEAD.size)
+        base = self._boards.get(base_seq)
+        if base is None:
+            raise WireError(f"delta {seq} builds on frame {base_seq}, which this decoder does not have")
+        board = dict(base)
+        off = _HEAD.size + _DELTA.size
+        for _ in range(n):
+            slot, tag = _SLOT.unpack_from(buf, off)
+            off += _SLOT.size
+            if tag == _REMOVED:
+                board.pop(slot, None)
+            elif tag == _ADDED:
+                (state_id,) = _U8.unpack_from(buf, off)
+                board[slot], off = self._full(buf, off + 1, state_id)
+            else:
+                old = board.get(slot)
+                if old is None:
+                    raise WireError(f"delta {seq} changes unknown slot {slot}")
+                board[slot], off = self._runtime(buf, off, old.id, old.desc, tag)
+        for old in [s for s in self._boards if s < base_seq]:
+            del self._boards[old]
+        return self._keep(seq, t_ms, board, keyframe=False)
@@ -1,17 +1,23 @@
 import pathlib
 
-import cv2
 import numpy as np
 
+# OpenCV is imported inside the methods that decode or draw pixels, so the
+# simulation core (which never does either) runs without it installed.
+INTER_AREA = 3  # == cv2.INTER_AREA
+
 
 class Img:
     def __init__(self):
         self.img = None
+        # channels of destination -> (pixels, inverse alpha | None), see _blit_data
+        self._blit: dict[int, tuple[np.ndarray, np.ndarray | None]] = {}
+        self._blit_src = None
 
     def read(self, path: str | pathlib.Path,
              size: tuple[int, int] | None = None,
              keep_aspect: bool = False,
-             interpolation: int = cv2.INTER_AREA):
+             interpolation: int = INTER_AREA):
         """
         Load `path` into self.img and **optionally resize**.
 
@@ -33,6 +39,7 @@ class Img:
         Img
             `self`, so you can chain:  `sprite = Img().read("foo.png", (64,64))`
         """
+        import cv2
         path = str(path)
         self.img = cv2.imread(path, cv2.IMREAD_UNCHANGED)
         if self.img is None:
@@ -55,8 +62,47 @@ class Img:
 
             #print(f"[DEBUG] Resized {path} to {self.img.shape}")
 
+        # boards are BGR, so prepare that blit path once at load time
+        self._blit_data(3)
         return self
 
+    def _blit_data(self, channels: int) -> tuple[np.ndarray, np.ndarray | None]:
+        """Premultiplied-alpha pixels for drawing onto a *channels*-deep image.
+
+        Returns ``(pixels, inv_alpha)``: *pixels* are the colour channels
+        multiplied by alpha (plus alpha itself for 4-channel targets) and
+        *inv_alpha* is ``255 - alpha`` replicated per channel, or ``None``
+        when the sprite is fully opaque and can simply be copied.
+
+        A 3-channel target always gets a plain copy of the colour channels –
+        alpha is dropped there, as draw_on always did for BGR boards.
+        """
+        if self._blit_src is not self.img:  # pixels were replaced – rebuild
+            self._blit = {}
+            self._blit_src = self.img
+        data = self._blit.get(channels)
+        if data is not None:
+            return data
+
+        import cv2
+        src = self.img
+        if src.ndim == 2:
+            src = cv2.cvtColor(src, cv2.COLOR_GRAY2BGR)
+        color = src[..., :3]
+        alpha = src[..., 3] if src.shape[2] == 4 else None
+        if alpha is None or channels == 3 or alpha.min() == 255:
+            pixels = color if channels == 3 else cv2.cvtColor(color, cv2.COLOR_BGR2BGRA)
+            data = (np.ascontiguousarray(pixels), None)
+        else:
+            a = alpha[..., None].astype(np.uint16)
+            premul = ((color.astype(np.uint16) * a + 127) // 255).astype(np.uint8)
+            if channels == 4:
+                premul = np.concatenate([premul, alpha[..., None]], axis=2)
+            inv_alpha = np.repeat(255 - alpha[..., None], channels, axis=2)
+            data = (np.ascontiguousarray(premul), np.ascontiguousarray(inv_alpha))
+        self._blit[channels] = data
+        return data
+
     def copy(self):
         new_img = Img()
         new_img.img = self.img.copy()
@@ -66,13 +112,6 @@ class Img:
         if self.img is None or other_img.img is None:
             raise ValueError("Both images must be loaded before drawing.")
 
-        # Convert to match other_img's channel count BEFORE slicing
-        if self.img.shape[2] != other_img.img.shape[2]:
-            if self.img.shape[2] == 3 and other_img.img.shape[2] == 4:
-                self.img = cv2.cvtColor(self.img, cv2.COLOR_BGR2BGRA)
-            elif self.img.shape[2] == 4 and other_img.img.shape[2] == 3:
-                self.img = cv2.cvtColor(self.img, cv2.COLOR_BGRA2BGR)
-
         h, w = self.img.shape[:2]
         H, W = other_img.img.shape[:2]
 
@@ -85,18 +124,19 @@ class Img:
             return
 
         roi = other_img.img[y:y + h, x:x + w]
-
-        if self.img.shape[2] == 4:
-            b, g, r, a = cv2.split(self.img)
-            mask = a / 255.0
-            for c in range(3):
-                roi[..., c] = (1 - mask) * roi[..., c] + mask * self.img[..., c]
+        pixels, inv_alpha = self._blit_data(roi.shape[2])
+        if inv_alpha is None:
+            roi[...] = pixels
         else:
-            other_img.img[y:y + h, x:x + w] = self.img
+            # premultiplied "over": dst = src*a + dst*(255-a)/255, in place
+            import cv2
+            cv2.multiply(roi, inv_alpha, dst=roi, scale=1 / 255)
+            cv2.add(roi, pixels, dst=roi)
 
     def put_text(self, txt, x, y, font_size, color=(255, 255, 255, 255), thickness=1):
         if self.img is None:
             raise ValueError("Image not loaded.")
+        import cv2
         cv2.putText(self.img, txt, (x, y),
                     cv2.FONT_HERSHEY_SIMPLEX, font_size,
                     color, thickness, cv2.LINE_AA)
@@ -104,6 +144,7 @@ class Img:
     def show(self):
         if self.img is None:
             raise ValueError("Image not loaded.")
+        import cv2
         cv2.imshow("Image", self.img)
         
         # Check for ESC key to exit gracefully
@@ -112,4 +153,5 @@ class Img:
             raise KeyboardInterrupt("ESC pressed - exiting game")
 
     def draw_rect(self, x1, y1, x2, y2, color):
+        import cv2
         cv2.rectangle(self.img, (x1, y1), (x2, y2), color, 2)
@@ -1,13 +1,17 @@
-
 import logging
 from GameFactory import create_game
 from GraphicsFactory import ImgFactory
+from AssetBundle import load_current_bundle
 
 if __name__ == "__main__":
     logging.basicConfig(
         level=logging.DEBUG,
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
-    game = create_game("../pieces", ImgFactory())
+    # use the precompiled bundle when `python AssetBundle.py` has been run and
+    # nothing under ../pieces changed since; otherwise load the tree
+    bundle = load_current_bundle("../pieces")
+    # without a bundle, decoded sprites are persisted so warm restarts skip PNG decoding
+    img_factory = ImgFactory(disk_cache="../.sprite_cache")
+    game = create_game("../pieces", img_factory, bundle=bundle)
     game.run()
-
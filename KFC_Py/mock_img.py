@@ -1,6 +1,6 @@
 # mock_img.py
-import pathlib, cv2
-from img import Img
+import pathlib
+from img import INTER_AREA, Img
 
 
 class MockImg(Img):
@@ -15,7 +15,7 @@ class MockImg(Img):
     def read(self, path: str | pathlib.Path,
              size: tuple[int, int] | None = None,
              keep_aspect: bool = False,
-             interpolation: int = cv2.INTER_AREA):
+             interpolation: int = INTER_AREA):
         
         self.W = self.H = size[0], size[1]
         return self  # chain-call compatible
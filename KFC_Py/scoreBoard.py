@@ -1,5 +1,4 @@
 # Scoreboard.py
-from PubSub import pubsub
 
 class Scoreboard:
     def __init__(self):